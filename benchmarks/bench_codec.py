@@ -0,0 +1,99 @@
+"""Benchmark for the codecs available to ``JsonRPCProtocol``.
+
+Measures the time taken to encode and decode typical large payloads, a
+completion list and a set of semantic tokens, with each available codec.
+
+Usage::
+
+   python benchmarks/bench_codec.py [--repeat N]
+"""
+import argparse
+import time
+
+from lsprotocol import types
+
+from pygls.protocol import (
+    JsonCodec,
+    LanguageServerProtocol,
+    OrjsonCodec,
+    default_converter,
+)
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="benchmark message codecs.")
+cli.add_argument("--repeat", type=int, default=5)
+
+
+def completion_list() -> types.CompletionList:
+    return types.CompletionList(
+        is_incomplete=False,
+        items=[
+            types.CompletionItem(
+                label=f"item_{i}",
+                kind=types.CompletionItemKind.Function,
+                detail=f"def item_{i}(a: int, b: str) -> None",
+                documentation=types.MarkupContent(
+                    kind=types.MarkupKind.Markdown, value=f"Docs for *item_{i}*"
+                ),
+                sort_text=f"{i:06}",
+            )
+            for i in range(10_000)
+        ],
+    )
+
+
+def semantic_tokens() -> types.SemanticTokens:
+    return types.SemanticTokens(data=[i % 97 for i in range(500_000)])
+
+
+PAYLOADS = [
+    ("completion", types.TEXT_DOCUMENT_COMPLETION, completion_list),
+    ("semantic tokens", types.TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL, semantic_tokens),
+]
+
+
+def codecs():
+    yield JsonCodec()
+    try:
+        yield OrjsonCodec()
+    except ImportError:
+        print("orjson not installed, skipping")
+
+
+def best_of(repeat, fn):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main():
+    args = cli.parse_args()
+    server = LanguageServer("bench", "v1")
+    protocol = LanguageServerProtocol(server, default_converter())
+
+    print(
+        f"{'payload':>16}  {'codec':>8}  {'size (KiB)':>10}  "
+        f"{'dumps (s)':>10}  {'loads (s)':>10}"
+    )
+    for name, method, factory in PAYLOADS:
+        response_type = protocol.get_result_type(method)
+        message = response_type(id=1, result=factory())
+        # Unstructuring is common to every codec, so do it once up front.
+        obj = protocol._serialize_message(message)
+
+        for codec in codecs():
+            data = codec.dumps(obj)
+            dumps = best_of(args.repeat, lambda: codec.dumps(obj))
+            loads = best_of(args.repeat, lambda: codec.loads(data))
+            print(
+                f"{name:>16}  {codec.name:>8}  {len(data) / 1024:>10.0f}"
+                f"  {dumps:>10.4f}  {loads:>10.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Measure the effect of compressing typical large messages.
+
+For each payload and compression level, reports the compressed size as a
+fraction of the original and the CPU time spent compressing and decompressing
+each message.
+
+Usage::
+
+   python benchmarks/bench_compression.py [--number N]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from pygls.protocol.compression import compress, decompress
+
+cli = argparse.ArgumentParser(description="benchmark message compression.")
+cli.add_argument("--number", type=int, default=20)
+
+
+def did_open():
+    lines = [
+        f"def function_{i}(arg_{i}, *args, **kwargs):\n"
+        f"    return arg_{i} + {i}  # some comment about {i}\n"
+        for i in range(5_000)
+    ]
+    return {
+        "jsonrpc": "2.0",
+        "method": "textDocument/didOpen",
+        "params": {
+            "textDocument": {
+                "uri": "file:///example.py",
+                "languageId": "python",
+                "version": 1,
+                "text": "".join(lines),
+            }
+        },
+    }
+
+
+def semantic_tokens():
+    rng = random.Random(0)
+    data = []
+    for _ in range(50_000):
+        data.extend([rng.randint(0, 3), rng.randint(0, 40), rng.randint(1, 20)])
+        data.extend([rng.randint(0, 10), 0])
+
+    return {"jsonrpc": "2.0", "id": 1, "result": {"data": data}}
+
+
+def workspace_symbols():
+    return {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "result": [
+            {
+                "name": f"symbol_{i}",
+                "kind": 12,
+                "location": {
+                    "uri": f"file:///project/module_{i // 100}.py",
+                    "range": {
+                        "start": {"line": i % 100, "character": 0},
+                        "end": {"line": i % 100, "character": 20},
+                    },
+                },
+            }
+            for i in range(10_000)
+        ],
+    }
+
+
+def cpu_time(fn, number):
+    start = time.thread_time()
+    for _ in range(number):
+        fn()
+
+    return (time.thread_time() - start) / number
+
+
+def main():
+    args = cli.parse_args()
+
+    for name, payload in [
+        ("didOpen", did_open()),
+        ("semanticTokens", semantic_tokens()),
+        ("workspaceSymbols", workspace_symbols()),
+    ]:
+        data = json.dumps(payload).encode("utf-8")
+        print(f"{name} ({len(data) / 1024:.0f} KiB)")
+
+        for encoding in ["gzip", "deflate"]:
+            for level in [1, 6, 9]:
+                compressed = compress(data, encoding, level)
+                ratio = len(compressed) / len(data)
+                encode = cpu_time(lambda: compress(data, encoding, level), args.number)
+                decode = cpu_time(lambda: decompress(compressed, encoding), args.number)
+                print(
+                    f"  {encoding:>7} level {level}: ratio {ratio:5.3f}, "
+                    f"compress {encode * 1000:6.2f} ms, "
+                    f"decompress {decode * 1000:5.2f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Measure the work saved by debouncing validation while the user is typing.
+
+Sends ``--keystrokes`` changes to a document, ``--interval`` seconds apart, to a
+server validating the document on every change, which takes ``--work`` seconds of
+CPU time. Reports how many times the document was validated, how long after the
+last keystroke the final validation finished and how much CPU time was spent
+validating, without debouncing and with a ``--delay`` second debounce.
+
+Usage::
+
+   python benchmarks/bench_debounce.py [--keystrokes N] [--interval S] [--delay S]
+"""
+
+import argparse
+import asyncio
+import time
+
+from lsprotocol import types
+
+from pygls.lsp.client import BaseLanguageClient
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="benchmark debounced notifications.")
+cli.add_argument("--keystrokes", type=int, default=50)
+cli.add_argument("--interval", type=float, default=0.03)
+cli.add_argument("--work", type=float, default=0.02)
+cli.add_argument("--delay", type=float, default=0.1)
+
+URI = "file:///bench.json"
+
+
+def create_server(args, delay, validated):
+    server = LanguageServer("bench-server", "v1", loop=asyncio.get_running_loop())
+
+    @server.feature(types.TEXT_DOCUMENT_DID_CHANGE, debounce=delay)
+    def did_change(ls, params):
+        end = time.process_time() + args.work
+        while time.process_time() < end:
+            pass
+
+        validated.append((params.text_document.version, time.perf_counter()))
+
+    return server
+
+
+async def run(args, delay):
+    validated = []
+    server = create_server(args, delay, validated)
+    client = BaseLanguageClient("bench-client", "v1")
+    await client.start_in_process(server)
+    await client.initialize_async(
+        types.InitializeParams(capabilities=types.ClientCapabilities())
+    )
+    client.text_document_did_open(
+        types.DidOpenTextDocumentParams(
+            text_document=types.TextDocumentItem(
+                uri=URI, language_id="json", version=0, text=""
+            )
+        )
+    )
+
+    cpu_start = time.process_time()
+    for version in range(1, args.keystrokes + 1):
+        client.text_document_did_change(
+            types.DidChangeTextDocumentParams(
+                text_document=types.VersionedTextDocumentIdentifier(
+                    uri=URI, version=version
+                ),
+                content_changes=[
+                    types.TextDocumentContentChangeEvent_Type2(text="x" * version)
+                ],
+            )
+        )
+        await asyncio.sleep(args.interval)
+
+    last_keystroke = time.perf_counter()
+    while not validated or validated[-1][0] != args.keystrokes:
+        await asyncio.sleep(0.001)
+
+    finished = validated[-1][1] - last_keystroke
+    cpu = time.process_time() - cpu_start
+    (session,) = server.sessions
+    stats = session.debouncer.stats().get(types.TEXT_DOCUMENT_DID_CHANGE)
+    saved = stats.saved if stats else 0
+
+    await client.stop()
+    server.shutdown()
+    return len(validated), finished, cpu, saved
+
+
+def main():
+    args = cli.parse_args()
+
+    for name, delay in [("every change", None), ("debounced", args.delay)]:
+        runs, finished, cpu, saved = asyncio.run(run(args, delay))
+        print(
+            f"{name:>12}: {runs:3d} validations ({saved} saved), "
+            f"final one {max(finished, 0) * 1000:6.1f} ms after the last keystroke, "
+            f"{cpu:5.2f} s CPU"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark for the deserialization of incoming messages.
+
+Compares structuring only the message envelope (as ``JsonRPCProtocol`` does)
+with running the deserialization hook on every nested JSON object, using large
+``textDocument/didChange`` notifications and ``workspace/symbol`` responses.
+
+Usage::
+
+   python benchmarks/bench_deserialize.py [--repeat N]
+"""
+import argparse
+import json
+import time
+
+from lsprotocol import types
+
+from pygls.protocol import LanguageServerProtocol, default_converter
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="benchmark message deserialization.")
+cli.add_argument("--repeat", type=int, default=5)
+
+
+def range_(line: int):
+    return {
+        "start": {"line": line, "character": 0},
+        "end": {"line": line, "character": 10},
+    }
+
+
+def did_change() -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "method": types.TEXT_DOCUMENT_DID_CHANGE,
+        "params": {
+            "textDocument": {"uri": "file:///example.py", "version": 2},
+            "contentChanges": [
+                {"range": range_(i), "text": f"change_{i}"} for i in range(20_000)
+            ],
+        },
+    }
+
+
+def workspace_symbol() -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": "1",
+        "result": [
+            {
+                "name": f"symbol_{i}",
+                "kind": types.SymbolKind.Function.value,
+                "location": {"uri": f"file:///file_{i % 100}.py", "range": range_(i)},
+            }
+            for i in range(20_000)
+        ],
+    }
+
+
+def best_of(repeat, fn):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main():
+    args = cli.parse_args()
+    server = LanguageServer("bench", "v1")
+    protocol = LanguageServerProtocol(server, default_converter())
+
+    payloads = [
+        ("didChange", did_change(), None),
+        ("workspace/symbol", workspace_symbol(), types.WORKSPACE_SYMBOL),
+    ]
+
+    print(f"{'message':>18}  {'object_hook (s)':>16}  {'envelope (s)':>13}")
+    for name, message, result_method in payloads:
+        body = json.dumps(message).encode("utf-8")
+
+        def object_hook():
+            if result_method:
+                protocol._result_types["1"] = protocol.get_result_type(result_method)
+            json.loads(body, object_hook=protocol._deserialize_message)
+
+        def envelope():
+            if result_method:
+                protocol._result_types["1"] = protocol.get_result_type(result_method)
+            protocol._decode_message(body)
+
+        print(
+            f"{name:>18}  {best_of(args.repeat, object_hook):>16.4f}"
+            f"  {best_of(args.repeat, envelope):>13.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
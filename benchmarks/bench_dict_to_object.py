@@ -0,0 +1,57 @@
+"""Microbenchmark for ``pygls.protocol._dict_to_object``.
+
+``_dict_to_object`` converts the params of messages for unknown methods (e.g.
+custom notifications) into objects supporting attribute access. This compares
+the current implementation with the previous one, which round-tripped the data
+through JSON and created a new ``namedtuple`` class for every object.
+
+Usage::
+
+   python benchmarks/bench_dict_to_object.py [--number N]
+"""
+import argparse
+import json
+import timeit
+from collections import namedtuple
+
+from pygls.protocol import _dict_to_object
+
+cli = argparse.ArgumentParser(description="benchmark _dict_to_object.")
+cli.add_argument("--number", type=int, default=2_000)
+
+
+def previous_dict_to_object(d):
+    if d is None:
+        return None
+
+    if not isinstance(d, dict):
+        return d
+
+    type_name = d.pop("type_name", "Object")
+    return json.loads(
+        json.dumps(d),
+        object_hook=lambda p: namedtuple(type_name, p.keys(), rename=True)(*p.values()),
+    )
+
+
+def params():
+    return {
+        "uri": "file:///example.py",
+        "status": {"state": "busy", "progress": 42, "detail": {"phase": "indexing"}},
+        "items": [{"id": i, "name": f"item_{i}"} for i in range(5)],
+    }
+
+
+def main():
+    args = cli.parse_args()
+
+    for name, fn in [
+        ("previous", previous_dict_to_object),
+        ("current", _dict_to_object),
+    ]:
+        total = min(timeit.repeat(lambda: fn(params()), number=args.number, repeat=3))
+        print(f"{name:>10}: {total / args.number * 1e6:8.1f} us per message")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Measure the throughput of handlers working on many documents at once.
+
+Opens ``--documents`` documents and sends each of them ``--changes`` changes, each
+followed by a hover request whose handler spends ``--work`` seconds outside of the
+GIL (e.g. waiting on an external linter). Reports how long it takes to answer all
+hover requests when the handler runs on the event loop, which keeps it in order
+with the changes, and when it runs in a thread with ``ordered_documents=True``.
+
+Usage::
+
+   python benchmarks/bench_document_actors.py [--documents N] [--changes N] [--work S]
+"""
+
+import argparse
+import asyncio
+import time
+
+from lsprotocol import types
+
+from pygls.lsp.client import BaseLanguageClient
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="benchmark per document ordering.")
+cli.add_argument("--documents", type=int, default=8)
+cli.add_argument("--changes", type=int, default=10)
+cli.add_argument("--work", type=float, default=0.01)
+
+
+def create_server(args, ordered):
+    server = LanguageServer(
+        "bench-server",
+        "v1",
+        loop=asyncio.get_running_loop(),
+        ordered_documents=ordered,
+    )
+
+    def hover(ls, params):
+        document = ls.workspace.get_text_document(params.text_document.uri)
+        version = document.version
+        time.sleep(args.work)
+
+        # The document must not have changed while the handler was running
+        assert document.version == version
+        return types.Hover(contents=str(version))
+
+    if ordered:
+        hover = server.thread()(hover)
+
+    server.feature(types.TEXT_DOCUMENT_HOVER)(hover)
+    return server
+
+
+async def run(args, ordered):
+    server = create_server(args, ordered)
+    client = BaseLanguageClient("bench-client", "v1")
+    await client.start_in_process(server)
+    await client.initialize_async(
+        types.InitializeParams(capabilities=types.ClientCapabilities())
+    )
+
+    uris = [f"file:///bench_{n}.py" for n in range(args.documents)]
+    for uri in uris:
+        client.text_document_did_open(
+            types.DidOpenTextDocumentParams(
+                text_document=types.TextDocumentItem(
+                    uri=uri, language_id="python", version=0, text=""
+                )
+            )
+        )
+
+    start = time.perf_counter()
+    requests = []
+    for version in range(1, args.changes + 1):
+        for uri in uris:
+            client.text_document_did_change(
+                types.DidChangeTextDocumentParams(
+                    text_document=types.VersionedTextDocumentIdentifier(
+                        uri=uri, version=version
+                    ),
+                    content_changes=[
+                        types.TextDocumentContentChangeEvent_Type2(text=str(version))
+                    ],
+                )
+            )
+            requests.append(
+                client.protocol.send_request_async(
+                    types.TEXT_DOCUMENT_HOVER,
+                    types.HoverParams(
+                        text_document=types.TextDocumentIdentifier(uri=uri),
+                        position=types.Position(line=0, character=0),
+                    ),
+                )
+            )
+
+    results = await asyncio.gather(*requests)
+    elapsed = time.perf_counter() - start
+
+    # Each hover saw the version sent just before it
+    expected = [str(v) for v in range(1, args.changes + 1) for _ in uris]
+    assert [result.contents for result in results] == expected
+
+    await client.stop()
+    server.shutdown()
+    return elapsed
+
+
+def main():
+    args = cli.parse_args()
+    total = args.documents * args.changes
+
+    for name, ordered in [("event loop", False), ("ordered documents", True)]:
+        elapsed = asyncio.run(run(args, ordered))
+        print(
+            f"{name:>17}: {total} requests answered in {elapsed:6.2f} s "
+            f"({total / elapsed:7.1f} requests/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compare the round-trip latency and throughput of requests with each event loop
+implementation.
+
+Starts a server over stdio on each loop (``asyncio``, and ``uvloop`` if installed),
+with the client on the same loop implementation. Sends ``--requests`` requests one
+at a time, reporting the median and 99th percentile latency, then the same number
+of requests ``--concurrency`` at a time, reporting the number of requests answered
+per second.
+
+Usage::
+
+   python benchmarks/bench_event_loop.py [--requests N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import pygls.loop
+from pygls.client import JsonRPCClient
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="compare event loop implementations.")
+cli.add_argument("--requests", type=int, default=5_000)
+cli.add_argument("--concurrency", type=int, default=100)
+cli.add_argument("--server", help=argparse.SUPPRESS)
+
+
+def make_server(loop_factory):
+    server = LanguageServer("bench-event-loop", "v1", loop_factory=loop_factory)
+
+    @server.feature("bench/echo")
+    def echo(ls, params):
+        return {"value": params.value}
+
+    return server
+
+
+async def run(args, loop_factory):
+    client = JsonRPCClient()
+    await client.start_io(sys.executable, __file__, "--server", loop_factory)
+    send = client.protocol.send_request_async
+
+    latencies = []
+    for n in range(args.requests):
+        start = time.perf_counter()
+        await send("bench/echo", {"value": n})
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for first in range(0, args.requests, args.concurrency):
+        last = min(first + args.concurrency, args.requests)
+        await asyncio.gather(
+            *[send("bench/echo", {"value": n}) for n in range(first, last)]
+        )
+    elapsed = time.perf_counter() - start
+
+    await client.stop()
+    return latencies, args.requests / elapsed
+
+
+def main():
+    args = cli.parse_args()
+    if args.server:
+        make_server(args.server).start_io()
+        return
+
+    loop_factories = ["asyncio"]
+    try:
+        import uvloop  # noqa: F401
+
+        loop_factories.append("uvloop")
+    except ImportError:
+        print("uvloop is not installed, only measuring asyncio")
+
+    for loop_factory in loop_factories:
+        latencies, throughput = pygls.loop.run(run(args, loop_factory), loop_factory)
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(
+            f"{loop_factory:>8}: median {statistics.median(latencies) * 1e6:7.1f} us, "
+            f"p99 {p99 * 1e6:7.1f} us, {throughput:8.0f} requests/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
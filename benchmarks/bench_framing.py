@@ -0,0 +1,59 @@
+"""Benchmark for the incremental message framing in ``JsonRPCProtocol``.
+
+Feeds large messages to the protocol in small fragments, as they would arrive
+over a socket, and reports the time taken to frame and parse each message.
+The time per MiB should stay roughly constant as the message size grows.
+
+Usage::
+
+   python benchmarks/bench_framing.py [--chunk-size BYTES] [--repeat N]
+"""
+import argparse
+import json
+import time
+
+from pygls.protocol import JsonRPCProtocol, default_converter
+
+cli = argparse.ArgumentParser(description="benchmark incremental message framing.")
+cli.add_argument("--chunk-size", type=int, default=64 * 1024)
+cli.add_argument("--repeat", type=int, default=5)
+
+SIZES_MIB = [1, 4, 16, 32]
+
+
+def make_message(size: int) -> bytes:
+    body = json.dumps(
+        {
+            "jsonrpc": "2.0",
+            "method": "textDocument/didOpen",
+            "params": {"text": "x" * size},
+        }
+    ).encode("utf-8")
+    header = f"Content-Length: {len(body)}\r\n\r\n".encode("utf-8")
+    return header + body
+
+
+def run(data: bytes, chunk_size: int) -> float:
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol._procedure_handler = lambda message: None  # type: ignore
+
+    start = time.perf_counter()
+    for idx in range(0, len(data), chunk_size):
+        protocol.data_received(data[idx : idx + chunk_size])
+
+    return time.perf_counter() - start
+
+
+def main():
+    args = cli.parse_args()
+
+    print(f"{'size (MiB)':>10}  {'chunks':>8}  {'best (s)':>10}  {'s/MiB':>8}")
+    for size_mib in SIZES_MIB:
+        data = make_message(size_mib * 1024 * 1024)
+        best = min(run(data, args.chunk_size) for _ in range(args.repeat))
+        chunks = -(-len(data) // args.chunk_size)
+        print(f"{size_mib:>10}  {chunks:>8}  {best:>10.4f}  {best / size_mib:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
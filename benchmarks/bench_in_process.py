@@ -0,0 +1,91 @@
+"""Compare the round-trip time of requests to a server in the same process with
+requests to a server over stdio.
+
+Each request returns a completion list of ``--items`` items.
+
+Usage::
+
+   python benchmarks/bench_in_process.py [--requests N] [--items N]
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from lsprotocol import types
+
+from pygls.lsp.client import BaseLanguageClient
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="benchmark the in-process transport.")
+cli.add_argument("--requests", type=int, default=200)
+cli.add_argument("--items", type=int, default=1_000)
+cli.add_argument("--server", action="store_true", help=argparse.SUPPRESS)
+
+PARAMS = types.CompletionParams(
+    text_document=types.TextDocumentIdentifier(uri="file:///example.py"),
+    position=types.Position(line=0, character=0),
+)
+
+
+def make_server(items, loop=None):
+    server = LanguageServer("bench-in-process", "v1", loop=loop)
+    result = types.CompletionList(
+        is_incomplete=False,
+        items=[
+            types.CompletionItem(
+                label=f"item_{i}",
+                kind=types.CompletionItemKind.Function,
+                detail=f"def item_{i}(a, b)",
+            )
+            for i in range(items)
+        ],
+    )
+
+    @server.feature(types.TEXT_DOCUMENT_COMPLETION)
+    def completion(ls, params):
+        return result
+
+    return server
+
+
+async def measure(client, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        await client.text_document_completion_async(PARAMS)
+
+    return (time.perf_counter() - start) / count
+
+
+async def run(args):
+    client = BaseLanguageClient("bench-in-process", "v1")
+    await client.start_io(
+        sys.executable, __file__, "--server", "--items", str(args.items)
+    )
+    stdio = await measure(client, args.requests)
+    await client.stop()
+
+    results = [("stdio", stdio)]
+    for deep_copy in [False, True]:
+        server = make_server(args.items, loop=asyncio.get_running_loop())
+        client = BaseLanguageClient("bench-in-process", "v1")
+        await client.start_in_process(server, deep_copy=deep_copy)
+        name = "in-process" + (" (deep copy)" if deep_copy else "")
+        results.append((name, await measure(client, args.requests)))
+        await client.stop()
+
+    for name, elapsed in results:
+        print(f"{name:>24}: {elapsed * 1000:7.2f} ms per request")
+
+
+def main():
+    args = cli.parse_args()
+    if args.server:
+        make_server(args.items).start_io()
+        return
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Measure the peak memory used to send a very large response.
+
+Sends a ``workspace/symbol`` response with many results through the stdio
+transport (writing to ``os.devnull``), once unstructuring and encoding the whole
+message in one go (as pygls used to) and once a chunk at a time (see
+``Codec.iterdumps``). Each variant runs in a separate process and reports its peak
+RSS, both in total and on top of the memory used to hold the response itself.
+
+Usage::
+
+   python benchmarks/bench_large_response.py [--symbols N]
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from lsprotocol import types
+
+from pygls.protocol import Codec, JsonCodec, JsonRPCProtocol, default_converter
+from pygls.server import StdOutTransportAdapter
+
+cli = argparse.ArgumentParser(description="measure peak memory of large responses.")
+cli.add_argument("--symbols", type=int, default=500_000)
+cli.add_argument("--mode", choices=["dumps", "stream"], help=argparse.SUPPRESS)
+
+
+class OneShotJsonCodec(JsonCodec):
+    """Encode the whole body in one go."""
+
+    iterdumps = Codec.iterdumps
+
+
+def one_shot_envelope(data):
+    """Unstructure the whole message in one go."""
+    return data
+
+
+def max_rss():
+    """Return the peak RSS of this process, in MiB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, KiB elsewhere
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def symbols(count):
+    return [
+        types.SymbolInformation(
+            name=f"symbol_{i}",
+            kind=types.SymbolKind.Function,
+            location=types.Location(
+                uri=f"file:///project/module_{i // 100}.py",
+                range=types.Range(
+                    start=types.Position(line=i % 100, character=0),
+                    end=types.Position(line=i % 100, character=20),
+                ),
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def run(mode, count):
+    protocol = JsonRPCProtocol(None, default_converter())
+    if mode == "dumps":
+        protocol.codec = OneShotJsonCodec()
+        protocol._envelope = one_shot_envelope  # type: ignore[method-assign]
+    transport = StdOutTransportAdapter(
+        io.BytesIO(), open(os.devnull, "wb"), protocol=protocol
+    )
+    protocol.connection_made(transport)  # type: ignore[arg-type]
+
+    result = symbols(count)
+    baseline = max_rss()
+
+    start = time.perf_counter()
+    protocol._result_types["1"] = types.WorkspaceSymbolResponse
+    protocol._send_response("1", result=result)
+    while transport.stats.messages_written < 1:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    print(
+        json.dumps(
+            {
+                "size": transport.stats.bytes_written / 1024 / 1024,
+                "baseline": baseline,
+                "peak": max_rss(),
+                "time": elapsed,
+            }
+        )
+    )
+
+
+def main():
+    args = cli.parse_args()
+    if args.mode is not None:
+        run(args.mode, args.symbols)
+        return
+
+    for mode in ["dumps", "stream"]:
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--symbols", str(args.symbols)],
+            check=True,
+            capture_output=True,
+        ).stdout
+        stats = json.loads(output)
+        print(
+            f"{mode:>6}: {stats['size']:6.1f} MiB sent in {stats['time']:5.2f}s, "
+            f"peak RSS {stats['peak']:7.1f} MiB "
+            f"(+{stats['peak'] - stats['baseline']:6.1f} MiB for sending)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Measure how long it takes until a client sees the first results of a slow
+request, with and without partial results.
+
+The server handles ``workspace/symbol`` requests with an async generator that
+yields a batch of symbols per (simulated) file it scans. Reports the time until
+the first batch of symbols reaches the client and until the request completes.
+
+Usage::
+
+   python benchmarks/bench_partial_results.py [--files N] [--scan-time SECONDS]
+"""
+import argparse
+import asyncio
+import time
+
+from lsprotocol import types
+
+from pygls.lsp.client import BaseLanguageClient
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="benchmark partial results.")
+cli.add_argument("--files", type=int, default=50)
+cli.add_argument("--scan-time", type=float, default=0.01)
+
+
+def create_server(args):
+    server = LanguageServer("bench-server", "v1", loop=asyncio.get_running_loop())
+
+    @server.feature(types.WORKSPACE_SYMBOL)
+    async def symbols(ls, params):
+        for i in range(args.files):
+            await asyncio.sleep(args.scan_time)
+            yield [
+                types.WorkspaceSymbol(
+                    name=f"symbol_{i}_{j}",
+                    kind=types.SymbolKind.Function,
+                    location=types.Location(
+                        uri=f"file:///project/module_{i}.py",
+                        range=types.Range(
+                            start=types.Position(line=j, character=0),
+                            end=types.Position(line=j, character=10),
+                        ),
+                    ),
+                )
+                for j in range(100)
+            ]
+
+    return server
+
+
+async def run(args, token):
+    client = BaseLanguageClient("bench-client", "v1")
+    first_result = None
+
+    @client.feature(types.PROGRESS)
+    def progress(ls, params):
+        nonlocal first_result
+        if first_result is None:
+            first_result = time.perf_counter()
+
+    await client.start_in_process(create_server(args))
+
+    start = time.perf_counter()
+    result = await client.workspace_symbol_async(
+        types.WorkspaceSymbolParams(query="", partial_result_token=token)
+    )
+    end = time.perf_counter()
+    await client.stop()
+
+    if first_result is None and result:
+        first_result = end
+
+    return first_result - start, end - start
+
+
+def main():
+    args = cli.parse_args()
+
+    for name, token in [("final result only", None), ("partial results", "token")]:
+        first, total = asyncio.run(run(args, token))
+        print(
+            f"{name:>17}: first results after {first * 1000:7.1f} ms, "
+            f"complete after {total * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Measure the latency of an interactive request queued behind background work.
+
+Starts a server with ``--workers`` threads, sends ``--background`` workspace
+diagnostic requests each taking ``--work`` seconds, then a completion request.
+Reports how long the completion takes when both features have the same priority
+and when completion is ``interactive`` and workspace diagnostics ``background``,
+along with the time requests of each priority class spent waiting for a thread.
+
+Usage::
+
+   python benchmarks/bench_priority.py [--workers N] [--background N] [--work SECONDS]
+"""
+
+import argparse
+import asyncio
+import time
+
+from lsprotocol import types
+
+from pygls.constants import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from pygls.lsp.client import BaseLanguageClient
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="benchmark priority scheduling.")
+cli.add_argument("--workers", type=int, default=2)
+cli.add_argument("--background", type=int, default=20)
+cli.add_argument("--work", type=float, default=0.05)
+
+
+def create_server(args, prioritize):
+    server = LanguageServer(
+        "bench-server",
+        "v1",
+        loop=asyncio.get_running_loop(),
+        max_workers=args.workers,
+    )
+
+    @server.feature(
+        types.WORKSPACE_DIAGNOSTIC,
+        priority=PRIORITY_BACKGROUND if prioritize else None,
+    )
+    @server.thread()
+    def diagnostic(ls, params):
+        time.sleep(args.work)
+        return types.WorkspaceDiagnosticReport(items=[])
+
+    @server.feature(
+        types.TEXT_DOCUMENT_COMPLETION,
+        priority=PRIORITY_INTERACTIVE if prioritize else None,
+    )
+    @server.thread()
+    def completion(ls, params):
+        return []
+
+    return server
+
+
+async def run(args, prioritize):
+    server = create_server(args, prioritize)
+    client = BaseLanguageClient("bench-client", "v1")
+    await client.start_in_process(server)
+
+    sweep = [
+        asyncio.ensure_future(
+            client.workspace_diagnostic_async(
+                types.WorkspaceDiagnosticParams(previous_result_ids=[])
+            )
+        )
+        for _ in range(args.background)
+    ]
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await client.text_document_completion_async(
+        types.CompletionParams(
+            text_document=types.TextDocumentIdentifier(uri="file:///bench.py"),
+            position=types.Position(line=0, character=0),
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    await asyncio.gather(*sweep)
+    stats = server.thread_pool.stats()
+
+    await client.stop()
+    server.shutdown()
+    return elapsed, stats
+
+
+def main():
+    args = cli.parse_args()
+
+    for name, prioritize in [("same priority", False), ("prioritized", True)]:
+        elapsed, stats = asyncio.run(run(args, prioritize))
+        print(f"{name}: completion answered after {elapsed * 1000:7.1f} ms")
+        for priority, priority_stats in stats.items():
+            if priority_stats.started:
+                print(
+                    f"  {priority:>11}: {priority_stats.started:3d} started, "
+                    f"mean wait {priority_stats.mean_wait * 1000:7.1f} ms, "
+                    f"max wait {priority_stats.max_wait * 1000:7.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compare the throughput of CPU bound handlers run in threads vs. processes.
+
+Sends ``--requests`` concurrent requests, each counting the words of a document
+with ``--lines`` lines a few times over, to handlers marked with ``thread`` and ``process`` and reports
+how long it takes to answer all of them.
+
+Usage::
+
+   python benchmarks/bench_process_pool.py [--requests N] [--lines N] [--workers N]
+"""
+
+import argparse
+import asyncio
+import time
+
+from lsprotocol import types
+
+from pygls.lsp.client import BaseLanguageClient
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="benchmark threaded vs. process handlers.")
+cli.add_argument("--requests", type=int, default=16)
+cli.add_argument("--lines", type=int, default=20000)
+cli.add_argument("--workers", type=int, default=4)
+
+URI = "file:///bench.txt"
+
+
+def count_words(ls, params):
+    document = ls.workspace.get_text_document(params.text_document.uri)
+    count = 0
+    for _ in range(10):
+        count = sum(1 for word in document.source.split() if word.isalpha())
+
+    return types.Hover(contents=str(count))
+
+
+def thread_count_words(ls, params):
+    return count_words(ls, params)
+
+
+def process_count_words(ls, params):
+    return count_words(ls, params)
+
+
+async def run(args, mode):
+    server = LanguageServer(
+        "bench-server",
+        "v1",
+        loop=asyncio.get_running_loop(),
+        max_workers=args.workers,
+        max_processes=args.workers,
+    )
+    if mode == "thread":
+        server.feature(types.TEXT_DOCUMENT_HOVER)(server.thread()(thread_count_words))
+    else:
+        server.feature(types.TEXT_DOCUMENT_HOVER)(server.process()(process_count_words))
+
+    client = BaseLanguageClient("bench-client", "v1")
+    await client.start_in_process(server)
+    await client.initialize_async(
+        types.InitializeParams(capabilities=types.ClientCapabilities())
+    )
+    client.text_document_did_open(
+        types.DidOpenTextDocumentParams(
+            text_document=types.TextDocumentItem(
+                uri=URI,
+                language_id="plaintext",
+                version=1,
+                text="lorem ipsum dolor sit amet\n" * args.lines,
+            )
+        )
+    )
+    params = types.HoverParams(
+        text_document=types.TextDocumentIdentifier(uri=URI),
+        position=types.Position(line=0, character=0),
+    )
+
+    # Start the worker processes outside of the measurement
+    await asyncio.gather(
+        *[client.text_document_hover_async(params) for _ in range(args.workers)]
+    )
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[client.text_document_hover_async(params) for _ in range(args.requests)]
+    )
+    elapsed = time.perf_counter() - start
+
+    await client.stop()
+    server.shutdown()
+    return elapsed
+
+
+def main():
+    args = cli.parse_args()
+
+    for mode in ["thread", "process"]:
+        elapsed = asyncio.run(run(args, mode))
+        print(f"{mode:>7}: {args.requests} requests answered in {elapsed:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
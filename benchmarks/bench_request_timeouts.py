@@ -0,0 +1,84 @@
+"""Measure the book keeping left behind by requests a client never answers.
+
+Sends ``--requests`` ``workspace/configuration`` requests to a client that drops
+them, without a timeout and with a ``--timeout`` second timeout. Reports how many
+requests are still outstanding and how much memory the server holds on to for them
+once the timeout has passed, along with the time taken to send each request. Some
+of the memory held with a timeout is the space the book keeping dictionaries keep
+after growing.
+
+Usage::
+
+   python benchmarks/bench_request_timeouts.py [--requests N] [--timeout S]
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import time
+import tracemalloc
+
+from lsprotocol import types
+
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="benchmark request timeouts.")
+cli.add_argument("--requests", type=int, default=20000)
+cli.add_argument("--timeout", type=float, default=0.5)
+
+
+class NullTransport:
+    """A transport to a client that never answers."""
+
+    def write(self, data):
+        pass
+
+    def is_closing(self):
+        return False
+
+
+async def run(args, timeout, trace):
+    server = LanguageServer("bench-server", "v1", loop=asyncio.get_running_loop())
+    protocol = server.lsp
+    protocol.connection_made(NullTransport())
+    params = types.ConfigurationParams(items=[types.ConfigurationItem(section="bench")])
+
+    if trace:
+        gc.collect()
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        protocol.send_request(types.WORKSPACE_CONFIGURATION, params, timeout=timeout)
+    elapsed = time.perf_counter() - start
+
+    await asyncio.sleep(args.timeout * 1.5)
+
+    held = 0
+    if trace:
+        gc.collect()
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+    return protocol.request_stats(), held, elapsed / args.requests
+
+
+def main():
+    args = cli.parse_args()
+    logging.disable(logging.WARNING)
+
+    for name, timeout in [("no timeout", None), ("timeout", args.timeout)]:
+        # Tracing memory allocations slows everything down, so time a separate run
+        _, _, per_request = asyncio.run(run(args, timeout, trace=False))
+        stats, held, _ = asyncio.run(run(args, timeout, trace=True))
+        print(
+            f"{name:>10}: {stats.outstanding:6d} outstanding "
+            f"(peak {stats.peak}, {stats.timed_out} timed out), "
+            f"{held / 1024:8.1f} KiB held, "
+            f"{per_request * 1e6:5.1f} us per request"
+        )
+
+
+if __name__ == "__main__":
+    main()
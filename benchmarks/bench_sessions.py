@@ -0,0 +1,76 @@
+"""Measure the memory used by each client session when serving many clients.
+
+Opens a number of sessions (as ``start_tcp(..., multi_client=True)`` would for
+each connection), initializes them and opens a document in each, then reports
+the memory allocated per session using :mod:`tracemalloc`.
+
+Usage::
+
+   python benchmarks/bench_sessions.py [--sessions N] [--document-size BYTES]
+"""
+import argparse
+import gc
+import tracemalloc
+
+from lsprotocol import types
+
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="measure memory per client session.")
+cli.add_argument("--sessions", type=int, default=50)
+cli.add_argument("--document-size", type=int, default=10_000)
+
+
+def open_session(server, index, text):
+    session = server._create_session()
+    session.lsp_initialize(
+        types.InitializeParams(
+            process_id=None,
+            root_uri=f"file:///project-{index}",
+            capabilities=types.ClientCapabilities(),
+        )
+    )
+    session.workspace.put_text_document(
+        types.TextDocumentItem(
+            uri=f"file:///project-{index}/main.py",
+            language_id="python",
+            version=1,
+            text=f"# {index}\n{text}",
+        )
+    )
+    return session
+
+
+def main():
+    args = cli.parse_args()
+    server = LanguageServer("bench-sessions", "v1")
+
+    @server.feature(types.TEXT_DOCUMENT_COMPLETION)
+    def completion(ls, params):
+        return None
+
+    text = "x" * args.document_size
+
+    # Create a session up front, so one-off costs are not attributed to sessions.
+    server._close_session(open_session(server, -1, text))
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    for index in range(args.sessions):
+        open_session(server, index, text)
+
+    gc.collect()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_session = (after - before) / args.sessions
+    print(f"sessions: {len(server.sessions)}")
+    print(f"document size: {args.document_size} bytes")
+    print(f"memory per session: {per_session / 1024:.1f} KiB")
+    print(f"peak: {peak / 1024 / 1024:.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
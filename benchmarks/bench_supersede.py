@@ -0,0 +1,83 @@
+"""Measure how long a user waits for completions while typing quickly.
+
+Sends a ``textDocument/completion`` request every ``--interval`` seconds for the
+same document, each taking ``--work`` seconds of (cooperatively cancellable) work
+in a single worker thread. Reports how long the last request takes to be answered,
+with and without superseding older requests.
+
+Usage::
+
+   python benchmarks/bench_supersede.py [--requests N] [--interval S] [--work S]
+"""
+import argparse
+import asyncio
+import time
+
+from lsprotocol import types
+
+from pygls.constants import SUPERSEDE_CANCEL
+from pygls.exceptions import JsonRpcRequestCancelled
+from pygls.lsp.client import BaseLanguageClient
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="benchmark superseding stale requests.")
+cli.add_argument("--requests", type=int, default=20)
+cli.add_argument("--interval", type=float, default=0.02)
+cli.add_argument("--work", type=float, default=0.1)
+
+
+def create_server(args, supersede):
+    server = LanguageServer(
+        "bench-server", "v1", loop=asyncio.get_running_loop(), max_workers=1
+    )
+
+    @server.feature(types.TEXT_DOCUMENT_COMPLETION, supersede=supersede)
+    @server.thread()
+    def completion(ls, params):
+        end = time.perf_counter() + args.work
+        while time.perf_counter() < end:
+            ls.cancellation_token.raise_if_cancelled()
+            time.sleep(0.002)
+
+        return [types.CompletionItem(label="example")]
+
+    return server
+
+
+async def run(args, supersede):
+    client = BaseLanguageClient("bench-client", "v1")
+    await client.start_in_process(create_server(args, supersede))
+
+    requests = []
+    for i in range(args.requests):
+        params = types.CompletionParams(
+            text_document=types.TextDocumentIdentifier(uri="file:///example.py"),
+            position=types.Position(line=0, character=i),
+        )
+        start = time.perf_counter()
+        requests.append(
+            asyncio.ensure_future(client.text_document_completion_async(params))
+        )
+        await asyncio.sleep(args.interval)
+
+    results = await asyncio.gather(*requests, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    await client.stop()
+
+    superseded = sum(isinstance(r, JsonRpcRequestCancelled) for r in results)
+    return elapsed, superseded
+
+
+def main():
+    args = cli.parse_args()
+
+    for name, supersede in [("all requests", None), ("superseding", SUPERSEDE_CANCEL)]:
+        elapsed, superseded = asyncio.run(run(args, supersede))
+        print(
+            f"{name:>12}: last request answered after {elapsed * 1000:7.1f} ms, "
+            f"{superseded} of {args.requests} requests superseded"
+        )
+
+
+if __name__ == "__main__":
+    main()
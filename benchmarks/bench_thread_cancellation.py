@@ -0,0 +1,79 @@
+"""Measure how quickly a thread is freed when a long running request is cancelled.
+
+Starts a server with a single worker thread, sends a request whose handler runs for
+``--work`` seconds, cancels it shortly after and immediately sends a quick request.
+Reports how long the quick request takes when the long running handler ignores the
+cancellation and when it checks its cancellation token.
+
+Usage::
+
+   python benchmarks/bench_thread_cancellation.py [--work SECONDS]
+"""
+import argparse
+import asyncio
+import time
+
+from lsprotocol import types
+
+from pygls.client import JsonRPCClient
+from pygls.exceptions import JsonRpcRequestCancelled
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="benchmark cancelling threaded handlers.")
+cli.add_argument("--work", type=float, default=2.0)
+
+
+def create_server(args, check_token):
+    server = LanguageServer(
+        "bench-server", "v1", loop=asyncio.get_running_loop(), max_workers=1
+    )
+
+    @server.feature("bench/slow")
+    @server.thread()
+    def slow(ls, params):
+        end = time.perf_counter() + args.work
+        while time.perf_counter() < end:
+            if check_token:
+                ls.cancellation_token.raise_if_cancelled()
+
+            time.sleep(0.005)
+
+    @server.feature("bench/quick")
+    @server.thread()
+    def quick(ls, params):
+        return "done"
+
+    return server
+
+
+async def run(args, check_token):
+    client = JsonRPCClient()
+    await client.start_in_process(create_server(args, check_token))
+
+    slow = client.protocol.send_request_async("bench/slow", {}, msg_id="slow")
+    await asyncio.sleep(0.05)
+    client.protocol.notify(types.CANCEL_REQUEST, types.CancelParams(id="slow"))
+
+    start = time.perf_counter()
+    await client.protocol.send_request_async("bench/quick", {})
+    elapsed = time.perf_counter() - start
+
+    try:
+        await slow
+    except JsonRpcRequestCancelled:
+        pass
+
+    await client.stop()
+    return elapsed
+
+
+def main():
+    args = cli.parse_args()
+
+    for name, check_token in [("ignoring token", False), ("checking token", True)]:
+        elapsed = asyncio.run(run(args, check_token))
+        print(f"{name}: quick request answered after {elapsed * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Compare the round-trip latency of requests over the available transports.
+
+Starts a server in a background thread for each transport, then sends a small
+request and waits for its response, one at a time, reporting the median and
+99th percentile latency.
+
+Usage::
+
+   python benchmarks/bench_transports.py [--requests N]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from threading import Thread
+
+from pygls import IS_WIN
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="compare request latency per transport.")
+cli.add_argument("--requests", type=int, default=5_000)
+
+
+def start_server(start, *args):
+    server = LanguageServer("bench-transports", "v1", loop=asyncio.new_event_loop())
+
+    @server.feature("bench/echo")
+    def echo(ls, params):
+        return params
+
+    # Serve each connection as a session, so disconnecting doesn't stop the server.
+    thread = Thread(
+        target=getattr(server, start),
+        args=args,
+        kwargs={"multi_client": True},
+        daemon=True,
+    )
+    thread.start()
+
+    while server._server is None:
+        time.sleep(0.01)
+
+    return server, thread
+
+
+def stop_server(server, thread):
+    server.loop.call_soon_threadsafe(server.loop.stop)
+    thread.join()
+
+
+async def read_message(reader):
+    content_length = 0
+    while True:
+        header = await reader.readline()
+        if header == b"\r\n":
+            break
+
+        name, _, value = header.decode("ascii").partition(":")
+        if name.lower() == "content-length":
+            content_length = int(value)
+
+    return await reader.readexactly(content_length)
+
+
+async def measure(connect, count):
+    reader, writer = await connect()
+    latencies = []
+
+    for i in range(count):
+        body = json.dumps(
+            {"jsonrpc": "2.0", "id": i, "method": "bench/echo", "params": {"i": i}}
+        ).encode("utf-8")
+
+        start = time.perf_counter()
+        writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+        await read_message(reader)
+        latencies.append(time.perf_counter() - start)
+
+    writer.close()
+    return latencies
+
+
+def report(name, latencies):
+    latencies.sort()
+    median = statistics.median(latencies) * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f"{name:>6}: median {median:7.1f} us, p99 {p99:7.1f} us")
+
+
+def main():
+    args = cli.parse_args()
+
+    server, thread = start_server("start_tcp", "127.0.0.1", 0)
+    port = server._server.sockets[0].getsockname()[1]
+    latencies = asyncio.run(
+        measure(lambda: asyncio.open_connection("127.0.0.1", port), args.requests)
+    )
+    stop_server(server, thread)
+    report("tcp", latencies)
+
+    if IS_WIN:
+        print("  unix: not available on Windows")
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "pygls.sock")
+        server, thread = start_server("start_unix", path)
+        latencies = asyncio.run(
+            measure(lambda: asyncio.open_unix_connection(path), args.requests)
+        )
+        stop_server(server, thread)
+        report("unix", latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Compare the size and encoding speed of messages sent as JSON and as MessagePack.
+
+For each payload, reports the size of the encoded message and the CPU time spent
+encoding and decoding it with the *json* module, the ``msgpack`` package (if
+installed) and pygls' pure Python MessagePack implementation.
+
+Usage::
+
+   python benchmarks/bench_wire_format.py [--number N]
+"""
+
+import argparse
+import random
+import time
+
+from pygls.protocol import JsonCodec, MessagePackCodec, _msgpack
+
+cli = argparse.ArgumentParser(description="benchmark message wire formats.")
+cli.add_argument("--number", type=int, default=20)
+
+
+def semantic_tokens():
+    rng = random.Random(0)
+    data = []
+    for _ in range(50_000):
+        data.extend([rng.randint(0, 3), rng.randint(0, 40), rng.randint(1, 20)])
+        data.extend([rng.randint(0, 10), 0])
+
+    return {"jsonrpc": "2.0", "id": 1, "result": {"data": data}}
+
+
+def completion_items():
+    return {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "result": {
+            "isIncomplete": False,
+            "items": [
+                {
+                    "label": f"item_{i}",
+                    "kind": 3,
+                    "detail": f"def item_{i}(arg: int) -> str",
+                    "sortText": f"{i:05d}",
+                    "textEdit": {
+                        "range": {
+                            "start": {"line": 10, "character": 4},
+                            "end": {"line": 10, "character": 8},
+                        },
+                        "newText": f"item_{i}",
+                    },
+                }
+                for i in range(10_000)
+            ],
+        },
+    }
+
+
+def pure_msgpack_codec():
+    codec = MessagePackCodec()
+    codec._packb = _msgpack.packb
+    codec._unpackb = _msgpack.unpackb
+    return codec
+
+
+def cpu_time(fn, number):
+    start = time.thread_time()
+    for _ in range(number):
+        fn()
+
+    return (time.thread_time() - start) / number
+
+
+def main():
+    args = cli.parse_args()
+
+    codecs = [("json", JsonCodec())]
+    try:
+        import msgpack  # noqa: F401
+
+        codecs.append(("msgpack", MessagePackCodec()))
+    except ImportError:
+        pass
+
+    codecs.append(("pure python", pure_msgpack_codec()))
+
+    for name, payload in [
+        ("semanticTokens", semantic_tokens()),
+        ("completion", completion_items()),
+    ]:
+        print(name)
+        for codec_name, codec in codecs:
+            data = codec.dumps(payload)
+            encode = cpu_time(lambda: codec.dumps(payload), args.number)
+            decode = cpu_time(lambda: codec.loads(data), args.number)
+            print(
+                f"  {codec_name:>11}: {len(data) / 1024:5.0f} KiB, "
+                f"encode {encode * 1000:6.2f} ms, "
+                f"decode {decode * 1000:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
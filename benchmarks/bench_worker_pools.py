@@ -0,0 +1,102 @@
+"""Measure the latency of quick requests while slow requests keep threads busy.
+
+Sends ``--slow`` requests that each block a thread for ``--work`` seconds, along
+with ``--quick`` hover requests. Reports the hover latency when all handlers share
+the default pool, and when the slow handler runs in its own ``indexing`` pool,
+together with the live statistics of each pool.
+
+Usage::
+
+   python benchmarks/bench_worker_pools.py [--slow N] [--quick N] [--work SECONDS]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from lsprotocol import types
+
+from pygls.constants import POOL_DEFAULT
+from pygls.lsp.client import BaseLanguageClient
+from pygls.server import LanguageServer
+
+cli = argparse.ArgumentParser(description="benchmark named thread pools.")
+cli.add_argument("--slow", type=int, default=8)
+cli.add_argument("--quick", type=int, default=20)
+cli.add_argument("--work", type=float, default=0.1)
+cli.add_argument("--workers", type=int, default=2)
+
+
+def create_server(args, pool):
+    server = LanguageServer(
+        "bench-server",
+        "v1",
+        loop=asyncio.get_running_loop(),
+        max_workers=args.workers,
+        pools={"indexing": args.workers},
+    )
+
+    @server.feature("bench/index")
+    @server.thread(pool=pool)
+    def index(ls, params):
+        time.sleep(args.work)
+
+    @server.feature(types.TEXT_DOCUMENT_HOVER)
+    @server.thread()
+    def hover(ls, params):
+        return None
+
+    return server
+
+
+async def hover(client):
+    start = time.perf_counter()
+    await client.text_document_hover_async(
+        types.HoverParams(
+            text_document=types.TextDocumentIdentifier(uri="file:///bench.py"),
+            position=types.Position(line=0, character=0),
+        )
+    )
+    return time.perf_counter() - start
+
+
+async def run(args, pool):
+    server = create_server(args, pool)
+    client = BaseLanguageClient("bench-client", "v1")
+    await client.start_in_process(server)
+
+    slow = [
+        client.protocol.send_request_async("bench/index", {}) for _ in range(args.slow)
+    ]
+    latencies = []
+    for _ in range(args.quick):
+        latencies.append(await hover(client))
+        await asyncio.sleep(0.01)
+
+    stats = server.pools.stats()
+    await asyncio.gather(*slow)
+    await client.stop()
+    server.shutdown()
+    return latencies, stats
+
+
+def main():
+    args = cli.parse_args()
+
+    for name, pool in [("shared pool", POOL_DEFAULT), ("separate pool", "indexing")]:
+        latencies, stats = asyncio.run(run(args, pool))
+        print(
+            f"{name}: hover mean {statistics.mean(latencies) * 1000:7.1f} ms, "
+            f"max {max(latencies) * 1000:7.1f} ms"
+        )
+        for pool_name, pool_stats in stats.items():
+            print(
+                f"  {pool_name:>8}: {pool_stats.active} active, "
+                f"{pool_stats.queued} queued, "
+                f"mean wait {pool_stats.mean_wait * 1000:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Simulate a burst of notifications sent to a slow WebSocket client.
+
+Compares sending each message from its own task (as the WebSocket adapter used
+to) with the single writer task used by
+:class:`~pygls.server.WebSocketTransportAdapter`, reporting the peak memory
+used, the number of tasks created and whether messages arrived in order.
+
+Usage::
+
+   python benchmarks/bench_ws_writer.py [--messages N] [--size BYTES]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from pygls.server import WebSocketTransportAdapter
+
+cli = argparse.ArgumentParser(description="benchmark the WebSocket writer.")
+cli.add_argument("--messages", type=int, default=20_000)
+cli.add_argument("--size", type=int, default=500)
+
+
+class SlowWebSocket:
+    """A WebSocket whose client takes a little while to read each frame."""
+
+    def __init__(self, expected):
+        self.expected = expected
+        self.received = []
+        self.done = asyncio.Event()
+
+    async def send(self, data):
+        await asyncio.sleep(0)
+        self.received.append(data)
+        if len(self.received) == self.expected:
+            self.done.set()
+
+    async def close(self):
+        pass
+
+
+class TaskPerMessage:
+    def __init__(self, ws):
+        self._ws = ws
+
+    def write(self, data):
+        asyncio.ensure_future(self._ws.send(data))
+
+
+async def run(make_adapter, args):
+    ws = SlowWebSocket(args.messages)
+    adapter = make_adapter(ws)
+    tasks_before = len(asyncio.all_tasks())
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(args.messages):
+        adapter.write(f'{{"id":{i:08d},"data":"' + "x" * args.size + '"}')
+
+    tasks = len(asyncio.all_tasks()) - tasks_before
+    await ws.done.wait()
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    in_order = ws.received == sorted(ws.received)
+    return elapsed, peak, tasks, in_order
+
+
+def main():
+    args = cli.parse_args()
+
+    for name, make_adapter in [
+        ("task per message", TaskPerMessage),
+        (
+            "writer task",
+            lambda ws: WebSocketTransportAdapter(ws, asyncio.get_running_loop()),
+        ),
+    ]:
+        elapsed, peak, tasks, in_order = asyncio.run(run(make_adapter, args))
+        print(
+            f"{name:>16}: {elapsed * 1000:7.1f} ms, peak {peak / 1024 / 1024:6.2f} MiB, "
+            f"{tasks:6d} tasks, in order: {in_order}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,7 @@ from pygls.server import LanguageServer
 
 COUNT_DOWN_START_IN_SECONDS = 10
 COUNT_DOWN_SLEEP_IN_SECONDS = 1
+VALIDATE_DEBOUNCE_IN_SECONDS = 0.3
 
 
 class JsonLanguageServer(LanguageServer):
@@ -169,9 +170,12 @@ async def count_down_10_seconds_non_blocking(ls, *args):
         await asyncio.sleep(COUNT_DOWN_SLEEP_IN_SECONDS)
 
 
-@json_server.feature(lsp.TEXT_DOCUMENT_DID_CHANGE)
+@json_server.feature(
+    lsp.TEXT_DOCUMENT_DID_CHANGE, debounce=VALIDATE_DEBOUNCE_IN_SECONDS
+)
 def did_change(ls, params: lsp.DidChangeTextDocumentParams):
-    """Text document did change notification."""
+    """Text document did change notification, validates the document once the user
+    has stopped typing."""
     _validate(ls, params)
 
 
@@ -18,6 +18,7 @@ import asyncio
 import logging
 import re
 from threading import Event
+from typing import TYPE_CHECKING
 from typing import Any
 from typing import Callable
 from typing import List
@@ -28,7 +29,16 @@ from typing import Union
 from cattrs import Converter
 
 from pygls.exceptions import PyglsError, JsonRpcException
-from pygls.protocol import JsonRPCProtocol, default_converter
+from pygls.protocol import (
+    Codec,
+    Compression,
+    JsonRPCProtocol,
+    connect_in_process,
+    default_converter,
+)
+
+if TYPE_CHECKING:
+    from pygls.server import Server
 
 
 logger = logging.getLogger(__name__)
@@ -78,13 +88,23 @@ class JsonRPCClient:
         self,
         protocol_cls: Type[JsonRPCProtocol] = JsonRPCProtocol,
         converter_factory: Callable[[], Converter] = default_converter,
+        codec: Optional[Codec] = None,
+        preferred_codec: Optional[Codec] = None,
+        compression: Optional[Compression] = None,
     ):
         # Strictly speaking `JsonRPCProtocol` wants a `LanguageServer`, not a
         # `JsonRPCClient`. However there similar enough for our purposes, which is
         # that this client will mostly be used in testing contexts.
         self.protocol = protocol_cls(self, converter_factory())  # type: ignore
+        if codec is not None:
+            self.protocol.codec = codec
+
+        self.protocol.preferred_codec = preferred_codec
+        self.protocol.compression = compression
 
         self._server: Optional[asyncio.subprocess.Process] = None
+        self._transport: Optional[Any] = None
+        self._session: Optional[JsonRPCProtocol] = None
         self._stop_event = Event()
         self._async_tasks: List[asyncio.Task] = []
 
@@ -137,6 +157,39 @@ class JsonRPCClient:
         self._server = server
         self._async_tasks.extend([connection, notify_exit])
 
+    async def start_unix(self, path: str):
+        """Connect to a server listening on the Unix domain socket at the given
+        path."""
+
+        logger.debug("Connecting to server at: %s", path)
+        reader, writer = await asyncio.open_unix_connection(path)
+
+        self.protocol.connection_made(writer)  # type: ignore
+        connection = asyncio.create_task(
+            aio_readline(self._stop_event, reader, self.protocol.data_received)
+        )
+
+        self._transport = writer
+        self._async_tasks.append(connection)
+
+    async def start_in_process(self, server: "Server", deep_copy: bool = False):
+        """Connect to the given server running in the same process.
+
+        Messages are passed between the client and the server without being
+        serialized, where possible. The server does not need to be started, but its
+        event loop must be running, e.g. the server may share the client's event
+        loop. See :class:`~pygls.protocol.InProcessTransport` for details.
+        """
+        session = server._create_session()
+        self._transport, _ = connect_in_process(
+            self.protocol,
+            session,
+            asyncio.get_running_loop(),
+            server.loop,
+            deep_copy=deep_copy,
+        )
+        self._session = session
+
     async def _server_exit(self):
         if self._server is not None:
             await self._server.wait()
@@ -172,5 +225,11 @@ class JsonRPCClient:
             logger.debug("Terminating server process: %s", self._server.pid)
             self._server.terminate()
 
+        if self._transport is not None:
+            self._transport.close()
+
+        if self._session is not None:
+            self._session._server._close_session(self._session)
+
         if len(self._async_tasks) > 0:
             await asyncio.gather(*self._async_tasks)
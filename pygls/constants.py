@@ -17,6 +17,8 @@
 
 # Dynamically assigned attributes
 ATTR_EXECUTE_IN_THREAD = "execute_in_thread"
+ATTR_EXECUTE_IN_PROCESS = "execute_in_process"
+ATTR_MAX_CONCURRENCY = "max_concurrency"
 ATTR_COMMAND_TYPE = "command"
 ATTR_FEATURE_TYPE = "feature"
 ATTR_REGISTERED_NAME = "reg_name"
@@ -24,3 +26,19 @@ ATTR_REGISTERED_TYPE = "reg_type"
 
 # Parameters
 PARAM_LS = "ls"
+
+# Supersession policies, see `FeatureManager.feature`
+SUPERSEDE_CANCEL = "cancel"
+SUPERSEDE_CONTENT_MODIFIED = "contentModified"
+
+# Priority classes, see `FeatureManager.feature`
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_NORMAL = "normal"
+PRIORITY_BACKGROUND = "background"
+
+# Name of the thread pool handlers marked with `thread` run in by default
+POOL_DEFAULT = "default"
+
+# Event loop implementations, see `pygls.loop.create_event_loop`
+LOOP_ASYNCIO = "asyncio"
+LOOP_UVLOOP = "uvloop"
@@ -156,6 +156,7 @@ def _is_server_error_code(code):
 
 
 _EXCEPTIONS: Set[Type[JsonRpcException]] = {
+    JsonRpcContentModified,
     JsonRpcInternalError,
     JsonRpcInvalidParams,
     JsonRpcInvalidRequest,
@@ -190,6 +191,21 @@ class FeatureRequestError(PyglsError):
     pass
 
 
+class RequestTimeoutError(PyglsError, TimeoutError):
+    """Raised when the other side does not answer a request in time, see
+    :meth:`JsonRPCProtocol.send_request <pygls.protocol.JsonRPCProtocol.send_request>`.
+    """
+
+    def __init__(self, method, msg_id, timeout):
+        super().__init__(
+            f'No response to "{method}" request with id "{msg_id}" '
+            f"within {timeout}s"
+        )
+        self.method = method
+        self.msg_id = msg_id
+        self.timeout = timeout
+
+
 class FeatureNotificationError(PyglsError):
     pass
 
@@ -206,6 +222,10 @@ class ThreadDecoratorError(PyglsError):
     pass
 
 
+class ProcessDecoratorError(PyglsError):
+    pass
+
+
 class ValidationError(PyglsError):
     def __init__(self, errors=None):
         self.errors = errors or []
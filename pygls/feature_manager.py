@@ -23,19 +23,29 @@ from typing import Any, Callable, Dict, Optional, get_type_hints
 
 from pygls.constants import (
     ATTR_COMMAND_TYPE,
+    ATTR_EXECUTE_IN_PROCESS,
     ATTR_EXECUTE_IN_THREAD,
     ATTR_FEATURE_TYPE,
+    ATTR_MAX_CONCURRENCY,
     ATTR_REGISTERED_NAME,
     ATTR_REGISTERED_TYPE,
     PARAM_LS,
+    POOL_DEFAULT,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_NORMAL,
+    SUPERSEDE_CANCEL,
+    SUPERSEDE_CONTENT_MODIFIED,
 )
 from pygls.exceptions import (
     CommandAlreadyRegisteredError,
     FeatureAlreadyRegisteredError,
+    MethodTypeNotRegisteredError,
+    ProcessDecoratorError,
     ThreadDecoratorError,
     ValidationError,
 )
-from pygls.lsp import get_method_options_type, is_instance
+from pygls.lsp import get_method_options_type, get_method_return_type, is_instance
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +55,13 @@ def assign_help_attrs(f, reg_name, reg_type):
     setattr(f, ATTR_REGISTERED_TYPE, reg_type)
 
 
-def assign_thread_attr(f):
-    setattr(f, ATTR_EXECUTE_IN_THREAD, True)
+def assign_thread_attr(f, pool=POOL_DEFAULT, max_concurrency=None):
+    setattr(f, ATTR_EXECUTE_IN_THREAD, pool)
+    setattr(f, ATTR_MAX_CONCURRENCY, max_concurrency)
+
+
+def assign_process_attr(f):
+    setattr(f, ATTR_EXECUTE_IN_PROCESS, True)
 
 
 def get_help_attrs(f):
@@ -70,6 +85,28 @@ def is_thread_function(f):
     return getattr(f, ATTR_EXECUTE_IN_THREAD, False)
 
 
+def get_thread_attrs(f):
+    """Returns the name of the pool a threaded function runs in and the maximum
+    number of calls to it that may run at once."""
+    pool = getattr(f, ATTR_EXECUTE_IN_THREAD, None)
+    if pool is True:
+        pool = POOL_DEFAULT
+
+    return pool, getattr(f, ATTR_MAX_CONCURRENCY, None)
+
+
+def is_process_function(f):
+    return getattr(f, ATTR_EXECUTE_IN_PROCESS, False)
+
+
+def _is_request(method_name):
+    """Returns true if the given method is a known LSP request."""
+    try:
+        return get_method_return_type(method_name) is not None
+    except MethodTypeNotRegisteredError:
+        return False
+
+
 def wrap_with_server(f, server):
     """Returns a new callable/coroutine with server as first argument."""
     if not has_ls_param_or_annotation(f, type(server)):
@@ -83,7 +120,14 @@ def wrap_with_server(f, server):
     else:
         wrapped = functools.partial(f, server)
         if is_thread_function(f):
-            assign_thread_attr(wrapped)
+            assign_thread_attr(
+                wrapped,
+                getattr(f, ATTR_EXECUTE_IN_THREAD),
+                getattr(f, ATTR_MAX_CONCURRENCY, None),
+            )
+
+        if is_process_function(f):
+            assign_process_attr(wrapped)
 
     return wrapped
 
@@ -107,6 +151,9 @@ class FeatureManager:
         self._builtin_features = {}
         self._feature_options = {}
         self._features = {}
+        self._supersede_policies: Dict[str, str] = {}
+        self._priorities: Dict[str, str] = {}
+        self._debounce_delays: Dict[str, float] = {}
         self._commands = {}
         self.server = server
         self.converter = converter
@@ -162,9 +209,27 @@ class FeatureManager:
         self,
         feature_name: str,
         options: Optional[Any] = None,
+        supersede: Optional[str] = None,
+        priority: Optional[str] = None,
+        debounce: Optional[float] = None,
     ) -> Callable:
         """Decorator used to register LSP features.
 
+        If a ``supersede`` policy is given, a request still being handled is
+        superseded when a newer request for the same method and document arrives,
+        or the document is changed. Its handler is cancelled and the request is
+        answered straight away with a ``RequestCancelled`` error for
+        ``SUPERSEDE_CANCEL`` or a ``ContentModified`` error for
+        ``SUPERSEDE_CONTENT_MODIFIED``.
+
+        The ``priority`` (``PRIORITY_INTERACTIVE``, ``PRIORITY_NORMAL`` or
+        ``PRIORITY_BACKGROUND``) decides the order in which threaded handlers waiting
+        for a free thread are started, defaults to ``PRIORITY_NORMAL``.
+
+        Notification handlers may be debounced by ``debounce`` seconds, a burst of
+        notifications about the same document results in a single call with the
+        params of the latest one.
+
         Example:
             @ls.feature('textDocument/completion', CompletionItems(trigger_characters=['.']))
         """
@@ -175,6 +240,26 @@ class FeatureManager:
                 logger.error("Missing feature name.")
                 raise ValidationError("Feature name is required.")
 
+            if supersede not in {None, SUPERSEDE_CANCEL, SUPERSEDE_CONTENT_MODIFIED}:
+                raise ValidationError(f'Unknown supersede policy "{supersede}".')
+
+            if priority not in {
+                None,
+                PRIORITY_INTERACTIVE,
+                PRIORITY_NORMAL,
+                PRIORITY_BACKGROUND,
+            }:
+                raise ValidationError(f'Unknown priority "{priority}".')
+
+            if debounce is not None:
+                if debounce < 0:
+                    raise ValidationError("Debounce delay cannot be negative.")
+
+                if _is_request(feature_name):
+                    raise ValidationError(
+                        f'Cannot debounce "{feature_name}", it is a request.'
+                    )
+
             # Add feature if not exists
             if feature_name in self._features:
                 logger.error('Feature "%s" is already registered.', feature_name)
@@ -187,6 +272,14 @@ class FeatureManager:
             assign_help_attrs(wrapped, feature_name, ATTR_FEATURE_TYPE)
 
             self._features[feature_name] = wrapped
+            if supersede is not None:
+                self._supersede_policies[feature_name] = supersede
+
+            if priority is not None:
+                self._priorities[feature_name] = priority
+
+            if debounce is not None:
+                self._debounce_delays[feature_name] = debounce
 
             if options:
                 options_type = get_method_options_type(feature_name)
@@ -217,8 +310,42 @@ class FeatureManager:
         """Returns registered features"""
         return self._features
 
-    def thread(self) -> Callable:
-        """Decorator that mark function to execute it in a thread."""
+    @property
+    def supersede_policies(self) -> Dict[str, str]:
+        """Returns the supersede policies of registered features."""
+        return self._supersede_policies
+
+    @property
+    def debounce_delays(self) -> Dict[str, float]:
+        """Returns the debounce delays of registered features."""
+        return self._debounce_delays
+
+    @property
+    def priorities(self) -> Dict[str, str]:
+        """Returns the priorities of registered features."""
+        return self._priorities
+
+    def share_features(self, other: "FeatureManager") -> None:
+        """Use the features, feature options and commands registered with another
+        feature manager, including any registered later on.
+
+        Builtin features are not shared.
+        """
+        self._features = other._features
+        self._feature_options = other._feature_options
+        self._supersede_policies = other._supersede_policies
+        self._priorities = other._priorities
+        self._debounce_delays = other._debounce_delays
+        self._commands = other._commands
+
+    def thread(
+        self, pool: str = POOL_DEFAULT, max_concurrency: Optional[int] = None
+    ) -> Callable:
+        """Decorator that mark function to execute it in a thread.
+
+        The function runs in the named ``pool`` and, if given, no more than
+        ``max_concurrency`` calls to it run at once.
+        """
 
         def decorator(f):
             if asyncio.iscoroutinefunction(f):
@@ -226,19 +353,53 @@ class FeatureManager:
                     f'Thread decorator cannot be used with async functions "{f.__name__}"'
                 )
 
+            if max_concurrency is not None and max_concurrency < 1:
+                raise ThreadDecoratorError(
+                    f'Maximum concurrency of "{f.__name__}" should be at least 1'
+                )
+
             # Allow any decorator order
             try:
                 reg_name = getattr(f, ATTR_REGISTERED_NAME)
                 reg_type = getattr(f, ATTR_REGISTERED_TYPE)
 
                 if reg_type is ATTR_FEATURE_TYPE:
-                    assign_thread_attr(self.features[reg_name])
+                    assign_thread_attr(self.features[reg_name], pool, max_concurrency)
                 elif reg_type is ATTR_COMMAND_TYPE:
-                    assign_thread_attr(self.commands[reg_name])
+                    assign_thread_attr(self.commands[reg_name], pool, max_concurrency)
 
             except AttributeError:
-                assign_thread_attr(f)
+                assign_thread_attr(f, pool, max_concurrency)
+
+            return f
+
+        return decorator
+
+    def process(self) -> Callable:
+        """Decorator that mark function to execute it in a separate process."""
+
+        def decorator(f):
+            if asyncio.iscoroutinefunction(f) or inspect.isgeneratorfunction(f):
+                raise ProcessDecoratorError(
+                    "Process decorator can only be used with regular functions "
+                    f'"{f.__name__}"'
+                )
+
+            # Allow any decorator order
+            try:
+                reg_name = getattr(f, ATTR_REGISTERED_NAME)
+                reg_type = getattr(f, ATTR_REGISTERED_TYPE)
+
+                if reg_type is ATTR_FEATURE_TYPE:
+                    assign_process_attr(self.features[reg_name])
+                elif reg_type is ATTR_COMMAND_TYPE:
+                    assign_process_attr(self.commands[reg_name])
+
+            except (AttributeError, KeyError):
+                # Not registered yet, or registered with another server
+                pass
 
+            assign_process_attr(f)
             return f
 
         return decorator
@@ -0,0 +1,126 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Support for running servers and clients on an alternative event loop
+implementation, such as `uvloop <https://github.com/MagicStack/uvloop>`__."""
+import asyncio
+import logging
+from typing import Any, Callable, Coroutine, Optional, TypeVar, Union
+
+from pygls.constants import LOOP_ASYNCIO, LOOP_UVLOOP
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LoopFactory = Union[
+    str,
+    Callable[[], Union[asyncio.AbstractEventLoop, asyncio.AbstractEventLoopPolicy]],
+]
+"""Either the name of an event loop implementation (``"asyncio"`` or ``"uvloop"``),
+or a callable returning a new event loop or an event loop policy, e.g.
+``uvloop.EventLoopPolicy``."""
+
+
+def _uvloop_factory() -> Callable[[], asyncio.AbstractEventLoop]:
+    try:
+        import uvloop  # type: ignore
+    except ImportError:
+        logger.warning(
+            "Run `pip install uvloop` to use it, falling back to the asyncio event loop"
+        )
+        return asyncio.new_event_loop
+
+    return uvloop.new_event_loop
+
+
+def create_event_loop(
+    loop_factory: Optional[LoopFactory] = None,
+) -> asyncio.AbstractEventLoop:
+    """Create a new event loop using the given factory.
+
+    ``"uvloop"`` uses *uvloop* if it is installed, otherwise it falls back to the
+    default *asyncio* event loop, as does ``None``.
+    """
+    if loop_factory is None or loop_factory == LOOP_ASYNCIO:
+        factory: Callable[[], Any] = asyncio.new_event_loop
+    elif loop_factory == LOOP_UVLOOP:
+        factory = _uvloop_factory()
+    elif callable(loop_factory):
+        factory = loop_factory
+    else:
+        raise ValueError(f"Unknown event loop implementation: {loop_factory!r}")
+
+    loop = factory()
+    if isinstance(loop, asyncio.AbstractEventLoopPolicy):
+        loop = loop.new_event_loop()
+
+    if not isinstance(loop, asyncio.AbstractEventLoop):
+        raise TypeError(f"Expected an event loop, got: {loop!r}")
+
+    logger.debug("Created %s event loop", type(loop).__module__)
+    return loop
+
+
+def run(main: Coroutine[Any, Any, T], loop_factory: Optional[LoopFactory] = None) -> T:
+    """Run the given coroutine on a new event loop created by the given factory,
+    like :func:`asyncio.run`. Useful to run a :class:`~pygls.client.JsonRPCClient`
+    on an alternative event loop implementation.
+
+    Example
+    -------
+    ::
+
+       async def main():
+           client = JsonRPCClient()
+           await client.start_io("my-server")
+           ...
+
+       pygls.loop.run(main(), loop_factory="uvloop")
+    """
+    loop = create_event_loop(loop_factory)
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            _cancel_all_tasks(loop)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+def _cancel_all_tasks(loop: asyncio.AbstractEventLoop):
+    """Cancel the tasks still running on the given loop, as :func:`asyncio.run`
+    does."""
+    tasks = [task for task in asyncio.all_tasks(loop) if not task.done()]
+    if not tasks:
+        return
+
+    for task in tasks:
+        task.cancel()
+
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+    for task in tasks:
+        if not task.cancelled() and task.exception() is not None:
+            loop.call_exception_handler(
+                {
+                    "message": "Unhandled exception during pygls.loop.run() shutdown",
+                    "exception": task.exception(),
+                    "task": task,
+                }
+            )
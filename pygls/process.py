@@ -0,0 +1,102 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Support for running handlers in a separate process, see
+:meth:`LanguageServer.process <pygls.server.LanguageServer.process>`."""
+import copy
+from typing import Any, Callable, Dict, Iterable
+
+from pygls.workspace import TextDocument
+
+
+class WorkspaceSnapshot:
+    """A copy of the text documents a handler running in a separate process has
+    been given.
+
+    Documents that are not part of the snapshot are read from disk, just as
+    :meth:`Workspace.get_text_document <pygls.workspace.Workspace.get_text_document>`
+    would for documents that are not open in the client.
+    """
+
+    def __init__(self, text_documents: Dict[str, TextDocument]):
+        self._text_documents = text_documents
+
+    @classmethod
+    def of(cls, documents: Iterable[TextDocument]) -> "WorkspaceSnapshot":
+        """Take a snapshot of the given documents, so later changes are not seen."""
+        snapshots = {}
+        for document in documents:
+            snapshot = copy.copy(document)
+            snapshot._source = document.source
+            snapshots[document.uri] = snapshot
+
+        return cls(snapshots)
+
+    @property
+    def text_documents(self) -> Dict[str, TextDocument]:
+        return self._text_documents
+
+    def get_text_document(self, doc_uri: str) -> TextDocument:
+        """Return the snapshot of the given document, or read it from disk."""
+        document = self._text_documents.get(doc_uri)
+        if document is None:
+            document = TextDocument(doc_uri)
+
+        return document
+
+
+class ServerSnapshot:
+    """Passed to handlers running in a separate process in place of the language
+    server, which can't be sent to another process.
+
+    Only provides access to a :class:`WorkspaceSnapshot`, the handler's result is
+    sent back to the client once it returns.
+    """
+
+    def __init__(self, workspace: WorkspaceSnapshot):
+        self.workspace = workspace
+
+
+def record_to_dict(obj: Any) -> Any:
+    """Convert the records params of custom methods are structured into (see
+    :func:`pygls.protocol._dict_to_object`) back to dicts, since the record types are
+    created on the fly and can't be pickled."""
+    if isinstance(obj, tuple) and hasattr(obj, "_asdict"):
+        return {key: record_to_dict(value) for key, value in obj._asdict().items()}
+
+    if isinstance(obj, list):
+        return [record_to_dict(item) for item in obj]
+
+    return obj
+
+
+def run_in_process(
+    handler: Callable,
+    pass_server: bool,
+    workspace: WorkspaceSnapshot,
+    params: Any,
+    is_record: bool = False,
+) -> Any:
+    """Run the given handler, called in the worker process."""
+    if is_record:
+        from pygls.protocol import _dict_to_object
+
+        params = _dict_to_object(params)
+
+    if pass_server:
+        return handler(ServerSnapshot(workspace), params)
+
+    return handler(params)
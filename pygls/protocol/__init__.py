@@ -1,18 +1,55 @@
-import json
-from typing import Any
-
 from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Tuple
 
 from lsprotocol import converters
 
+from pygls.protocol.codec import (
+    Codec,
+    JsonCodec,
+    MessagePackCodec,
+    OrjsonCodec,
+    fast_json_codec,
+)
+from pygls.protocol.compression import Compression, CompressionStats
+from pygls.protocol.in_process import InProcessTransport, connect_in_process
 from pygls.protocol.json_rpc import (
+    CancellationToken,
     JsonRPCNotification,
     JsonRPCProtocol,
     JsonRPCRequestMessage,
     JsonRPCResponseMessage,
+    RequestStats,
 )
 from pygls.protocol.language_server import LanguageServerProtocol, lsp_method
 from pygls.protocol.lsp_meta import LSPMeta, call_user_feature
+from pygls.protocol.scheduler import (
+    DebounceStats,
+    Debouncer,
+    DocumentActors,
+    PoolFuture,
+    PoolStats,
+    PriorityStats,
+    PriorityThreadPool,
+    WorkerPools,
+)
+
+
+@lru_cache(maxsize=1024)
+def _record_type(type_name: str, fields: Tuple[str, ...]):
+    """Return the (cached) namedtuple class with the given name and fields."""
+    return namedtuple(type_name, fields, rename=True)  # type: ignore[misc]
+
+
+def _to_record(obj: Any, type_name: str):
+    if isinstance(obj, dict):
+        record_type = _record_type(type_name, tuple(obj.keys()))
+        return record_type(*[_to_record(v, type_name) for v in obj.values()])
+
+    if isinstance(obj, list):
+        return [_to_record(item, type_name) for item in obj]
+
+    return obj
 
 
 def _dict_to_object(d: Any):
@@ -25,10 +62,7 @@ def _dict_to_object(d: Any):
         return d
 
     type_name = d.pop("type_name", "Object")
-    return json.loads(
-        json.dumps(d),
-        object_hook=lambda p: namedtuple(type_name, p.keys(), rename=True)(*p.values()),
-    )
+    return _to_record(d, type_name)
 
 
 def _params_field_structure_hook(obj, cls):
@@ -63,6 +97,17 @@ def default_converter():
 
 
 __all__ = (
+    "Codec",
+    "JsonCodec",
+    "MessagePackCodec",
+    "OrjsonCodec",
+    "fast_json_codec",
+    "Compression",
+    "CompressionStats",
+    "InProcessTransport",
+    "connect_in_process",
+    "CancellationToken",
+    "RequestStats",
     "JsonRPCProtocol",
     "LanguageServerProtocol",
     "JsonRPCRequestMessage",
@@ -70,6 +115,14 @@ __all__ = (
     "JsonRPCNotification",
     "LSPMeta",
     "call_user_feature",
+    "DebounceStats",
+    "Debouncer",
+    "DocumentActors",
+    "PoolFuture",
+    "PoolStats",
+    "PriorityStats",
+    "PriorityThreadPool",
+    "WorkerPools",
     "_dict_to_object",
     "_params_field_structure_hook",
     "_result_field_structure_hook",
@@ -0,0 +1,283 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""A pure Python implementation of the subset of `MessagePack
+<https://msgpack.org/>`__ needed to encode JSON-RPC messages, used when the
+``msgpack`` package is not installed."""
+import struct
+from typing import Any, Callable, List, Optional, Tuple
+
+Hook = Callable[[Any], Any]
+
+_INTS_ONLY = {int}
+_CHUNK_SIZE = 64
+
+
+def packb(obj: Any, default: Optional[Hook] = None) -> bytes:
+    buf = bytearray()
+    _pack(obj, buf, default)
+    return bytes(buf)
+
+
+def _pack(obj: Any, buf: bytearray, default: Optional[Hook]):
+    t = type(obj)
+
+    if t is str:
+        _pack_str(obj, buf)
+    elif t is int:
+        _pack_int(obj, buf)
+    elif obj is None:
+        buf.append(0xC0)
+    elif obj is True:
+        buf.append(0xC3)
+    elif obj is False:
+        buf.append(0xC2)
+    elif t is float:
+        buf.append(0xCB)
+        buf += struct.pack(">d", obj)
+    elif t is dict:
+        _pack_header(len(obj), buf, 0x80, 0xDE)
+        for key, value in obj.items():
+            _pack(key, buf, default)
+            _pack(value, buf, default)
+    elif t is list or t is tuple:
+        _pack_array(obj, buf, default)
+    elif t is bytes or t is bytearray:
+        _pack_length(len(obj), buf, 0xC4)
+        buf += obj
+    # Subclasses, e.g. enums
+    elif isinstance(obj, str):
+        _pack_str(obj, buf)
+    elif isinstance(obj, int):
+        _pack_int(int(obj), buf)
+    elif isinstance(obj, float):
+        _pack(float(obj), buf, default)
+    else:
+        value = obj if default is None else default(obj)
+        if value is obj:
+            raise TypeError(f"Object of type {t.__name__} is not serializable")
+
+        _pack(value, buf, default)
+
+
+def _pack_array(obj: Any, buf: bytearray, default: Optional[Hook]):
+    _pack_header(len(obj), buf, 0x90, 0xDC)
+
+    # Arrays of mostly small, positive integers (e.g. semantic tokens) are common
+    # enough to be worth encoding a chunk at a time.
+    if len(obj) > 0 and set(map(type, obj)) == _INTS_ONLY:
+        for start in range(0, len(obj), _CHUNK_SIZE):
+            chunk = obj[start : start + _CHUNK_SIZE]
+            try:
+                data = bytes(chunk)
+                if max(data) < 0x80:
+                    buf += data
+                    continue
+            except ValueError:
+                pass
+
+            for item in chunk:
+                _pack_int(item, buf)
+
+        return
+
+    for item in obj:
+        _pack(item, buf, default)
+
+
+def _pack_str(obj: str, buf: bytearray):
+    data = obj.encode("utf-8")
+    n = len(data)
+    if n < 32:
+        buf.append(0xA0 | n)
+    else:
+        _pack_length(n, buf, 0xD9)
+
+    buf += data
+
+
+def _pack_int(obj: int, buf: bytearray):
+    if 0 <= obj < 0x80:
+        buf.append(obj)
+    elif -32 <= obj < 0:
+        buf.append(obj & 0xFF)
+    elif obj >= 0:
+        for code, fmt, limit in _UINTS:
+            if obj <= limit:
+                buf += struct.pack(fmt, code, obj)
+                return
+
+        raise OverflowError("Integer out of range")
+    else:
+        for code, fmt, limit in _INTS:
+            if obj >= limit:
+                buf += struct.pack(fmt, code, obj)
+                return
+
+        raise OverflowError("Integer out of range")
+
+
+_UINTS = [
+    (0xCC, ">BB", 0xFF),
+    (0xCD, ">BH", 0xFFFF),
+    (0xCE, ">BI", 0xFFFFFFFF),
+    (0xCF, ">BQ", 0xFFFFFFFFFFFFFFFF),
+]
+_INTS = [
+    (0xD0, ">Bb", -0x80),
+    (0xD1, ">Bh", -0x8000),
+    (0xD2, ">Bi", -0x80000000),
+    (0xD3, ">Bq", -0x8000000000000000),
+]
+
+
+def _pack_header(n: int, buf: bytearray, fix: int, code: int):
+    """Pack the header of an array or map with ``n`` items."""
+    if n < 16:
+        buf.append(fix | n)
+    elif n < 0x10000:
+        buf += struct.pack(">BH", code, n)
+    else:
+        buf += struct.pack(">BI", code + 1, n)
+
+
+def _pack_length(n: int, buf: bytearray, code: int):
+    """Pack the length of a str or bin, using the given 8 bit type code."""
+    if n < 0x100:
+        buf += struct.pack(">BB", code, n)
+    elif n < 0x10000:
+        buf += struct.pack(">BH", code + 1, n)
+    else:
+        buf += struct.pack(">BI", code + 2, n)
+
+
+def unpackb(data: bytes, object_hook: Optional[Hook] = None) -> Any:
+    view = memoryview(data)
+    obj, pos = _unpack(view, 0, object_hook)
+    if pos != len(view):
+        raise ValueError("Extra data after the end of the message")
+
+    return obj
+
+
+_SIZES = {
+    0xCC: ">B",
+    0xCD: ">H",
+    0xCE: ">I",
+    0xCF: ">Q",
+    0xD0: ">b",
+    0xD1: ">h",
+    0xD2: ">i",
+    0xD3: ">q",
+    0xCA: ">f",
+    0xCB: ">d",
+}
+
+
+def _unpack(view: memoryview, pos: int, hook: Optional[Hook]) -> Tuple[Any, int]:
+    code = view[pos]
+    pos += 1
+
+    if code < 0x80:
+        return code, pos
+
+    if code >= 0xE0:
+        return code - 0x100, pos
+
+    if 0xA0 <= code <= 0xBF:
+        end = pos + (code & 0x1F)
+        return str(view[pos:end], "utf-8"), end
+
+    if 0x90 <= code <= 0x9F:
+        return _unpack_array(view, pos, code & 0x0F, hook)
+
+    if 0x80 <= code <= 0x8F:
+        return _unpack_map(view, pos, code & 0x0F, hook)
+
+    if code == 0xC0:
+        return None, pos
+
+    if code == 0xC2:
+        return False, pos
+
+    if code == 0xC3:
+        return True, pos
+
+    fmt = _SIZES.get(code)
+    if fmt is not None:
+        end = pos + struct.calcsize(fmt)
+        return struct.unpack(fmt, view[pos:end])[0], end
+
+    if 0xD9 <= code <= 0xDB:
+        start, end = _unpack_length(view, pos, code - 0xD9)
+        return str(view[start:end], "utf-8"), end
+
+    if 0xC4 <= code <= 0xC6:
+        start, end = _unpack_length(view, pos, code - 0xC4)
+        return bytes(view[start:end]), end
+
+    if code in (0xDC, 0xDE):
+        n = struct.unpack(">H", view[pos : pos + 2])[0]
+        unpack = _unpack_array if code == 0xDC else _unpack_map
+        return unpack(view, pos + 2, n, hook)
+
+    if code in (0xDD, 0xDF):
+        n = struct.unpack(">I", view[pos : pos + 4])[0]
+        unpack = _unpack_array if code == 0xDD else _unpack_map
+        return unpack(view, pos + 4, n, hook)
+
+    raise ValueError(f"Unsupported MessagePack type: 0x{code:02x}")
+
+
+def _unpack_length(view: memoryview, pos: int, size: int) -> Tuple[int, int]:
+    """Return the start and end of a str or bin, whose length is encoded using 1, 2
+    or 4 bytes for a ``size`` of 0, 1 or 2 respectively."""
+    fmt = (">B", ">H", ">I")[size]
+    start = pos + (1, 2, 4)[size]
+    return start, start + struct.unpack(fmt, view[pos:start])[0]
+
+
+def _unpack_array(
+    view: memoryview, pos: int, n: int, hook: Optional[Hook]
+) -> Tuple[Any, int]:
+    items: List[Any] = []
+    while len(items) < n:
+        # See `_pack_array`
+        size = min(n - len(items), _CHUNK_SIZE)
+        if view[pos] < 0x80 and max(view[pos : pos + size]) < 0x80:
+            items.extend(view[pos : pos + size])
+            pos += size
+            continue
+
+        for _ in range(size):
+            item, pos = _unpack(view, pos, hook)
+            items.append(item)
+
+    return items, pos
+
+
+def _unpack_map(
+    view: memoryview, pos: int, n: int, hook: Optional[Hook]
+) -> Tuple[Any, int]:
+    obj = {}
+    for _ in range(n):
+        key, pos = _unpack(view, pos, hook)
+        obj[key], pos = _unpack(view, pos, hook)
+
+    if hook is not None:
+        return hook(obj), pos
+
+    return obj, pos
@@ -0,0 +1,275 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import abc
+import json
+import logging
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Hook = Callable[[Any], Any]
+
+
+class Codec(abc.ABC):
+    """Base class for the codecs used by :class:`~pygls.protocol.JsonRPCProtocol`
+    to convert messages to and from bytes.
+
+    Subclasses must implement :meth:`dumps` and :meth:`loads`.
+    """
+
+    name = ""
+    """The name of the codec."""
+
+    content_type = "application/vscode-jsonrpc; charset=utf-8"
+    """The value of the ``Content-Type`` header sent with messages encoded by this
+    codec."""
+
+    @abc.abstractmethod
+    def dumps(self, obj: Any, default: Optional[Hook] = None) -> bytes:
+        """Encode the given object.
+
+        Parameters
+        ----------
+        obj
+           The object to encode.
+
+        default
+           Called for any object the codec is unable to encode natively, should
+           return an encodable version of the object.
+        """
+
+    def iterdumps(self, obj: Any, default: Optional[Hook] = None) -> Iterator[bytes]:
+        """Encode the given object, a chunk at a time.
+
+        Joining the chunks gives the same result as :meth:`dumps`. This
+        implementation returns a single chunk, codecs able to encode an object
+        incrementally override it to reduce the memory needed to send very large
+        messages.
+        """
+        yield self.dumps(obj, default)
+
+    @abc.abstractmethod
+    def loads(
+        self, data: Union[bytes, bytearray, str], object_hook: Optional[Hook] = None
+    ) -> Any:
+        """Decode the given data.
+
+        Parameters
+        ----------
+        data
+           The data to decode.
+
+        object_hook
+           If given, called with every decoded object (``dict``) and its return value
+           used in place of the ``dict``.
+        """
+
+
+class JsonCodec(Codec):
+    """JSON codec based on the :mod:`json` module from the standard library."""
+
+    name = "json"
+
+    def dumps(self, obj: Any, default: Optional[Hook] = None) -> bytes:
+        return json.dumps(obj, default=default).encode("utf-8")
+
+    def iterdumps(self, obj: Any, default: Optional[Hook] = None) -> Iterator[bytes]:
+        pieces = _iter_json(obj, self.dumps, default, (b", ", b": "))
+        return _iter_chunks(pieces)
+
+    def loads(
+        self, data: Union[bytes, bytearray, str], object_hook: Optional[Hook] = None
+    ) -> Any:
+        return json.loads(data, object_hook=object_hook)
+
+
+class OrjsonCodec(Codec):
+    """JSON codec based on `orjson <https://github.com/ijl/orjson>`__.
+
+    Requires the ``orjson`` package to be installed.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, obj: Any, default: Optional[Hook] = None) -> bytes:
+        try:
+            return self._orjson.dumps(
+                obj, default=default, option=self._orjson.OPT_NON_STR_KEYS
+            )
+        except TypeError:
+            # orjson is unable to encode some valid messages, e.g. integers wider
+            # than 64 bits. Produce the same output as orjson would.
+            data = json.dumps(
+                obj, default=default, ensure_ascii=False, separators=(",", ":")
+            )
+            return data.encode("utf-8")
+
+    def iterdumps(self, obj: Any, default: Optional[Hook] = None) -> Iterator[bytes]:
+        return _iter_chunks(_iter_json(obj, self.dumps, default, (b",", b":")))
+
+    def loads(
+        self, data: Union[bytes, bytearray, str], object_hook: Optional[Hook] = None
+    ) -> Any:
+        obj = self._orjson.loads(data)
+        if object_hook is None:
+            return obj
+
+        return _apply_object_hook(obj, object_hook)
+
+
+class MessagePackCodec(Codec):
+    """Binary codec using `MessagePack <https://msgpack.org/>`__.
+
+    Uses the `msgpack <https://github.com/msgpack/msgpack-python>`__ package if it
+    is installed, falling back to an implementation in pure Python otherwise. Both
+    produce the same data, so each side of a connection may use either.
+
+    Since editors only understand JSON, this should only be used as a
+    :attr:`~pygls.protocol.JsonRPCProtocol.preferred_codec`, which is only used
+    once the other side has said it accepts it.
+    """
+
+    name = "msgpack"
+    content_type = "application/msgpack"
+
+    def __init__(self):
+        self._packb: Callable[..., bytes]
+        self._unpackb: Callable[..., Any]
+
+        try:
+            import msgpack  # type: ignore
+
+            self._packb = partial(msgpack.packb, use_bin_type=True)
+            self._unpackb = partial(msgpack.unpackb, raw=False, strict_map_key=False)
+        except ImportError:
+            logger.debug("msgpack is not available, using a pure Python version")
+            from pygls.protocol import _msgpack
+
+            self._packb = _msgpack.packb
+            self._unpackb = _msgpack.unpackb
+
+    def dumps(self, obj: Any, default: Optional[Hook] = None) -> bytes:
+        return self._packb(obj, default=default)
+
+    def loads(
+        self, data: Union[bytes, bytearray, str], object_hook: Optional[Hook] = None
+    ) -> Any:
+        return self._unpackb(data, object_hook=object_hook)
+
+
+CHUNK_SIZE = 64 * 1024
+"""The (minimum) size of the chunks returned by :meth:`Codec.iterdumps`, apart from
+the last one."""
+
+# Lists longer than this are encoded a slice at a time, see `_iter_json`
+_SLICE_SIZE = 1024
+
+# How many levels of nested objects are encoded a member at a time
+_MAX_DEPTH = 3
+
+_JSON_TYPES = (dict, list, tuple, str, int, float, bool, type(None))
+
+
+def _iter_json(
+    obj: Any,
+    dumps: Callable[..., bytes],
+    default: Optional[Hook],
+    separators: Tuple[bytes, bytes],
+    depth: int = _MAX_DEPTH,
+) -> Iterator[bytes]:
+    """Encode the given object as JSON, a piece at a time.
+
+    Only the objects near the top of a message (e.g. its envelope and ``result``)
+    are encoded a member at a time and long lists a slice at a time. Everything
+    else is handed to ``dumps`` as is, so most of the work is still done by the
+    codec's (fast) encoder.
+    """
+    item_separator, key_separator = separators
+    if default is not None and not isinstance(obj, _JSON_TYPES):
+        obj = default(obj)
+
+    if isinstance(obj, dict) and depth > 0 and all(type(key) is str for key in obj):
+        yield b"{"
+        for idx, (key, value) in enumerate(obj.items()):
+            if idx > 0:
+                yield item_separator
+
+            yield dumps(key)
+            yield key_separator
+            yield from _iter_json(value, dumps, default, separators, depth - 1)
+
+        yield b"}"
+
+    elif isinstance(obj, (list, tuple)) and len(obj) > _SLICE_SIZE:
+        yield b"["
+        for start in range(0, len(obj), _SLICE_SIZE):
+            if start > 0:
+                yield item_separator
+
+            # Strip the brackets from the encoded slice
+            yield dumps(obj[start : start + _SLICE_SIZE], default)[1:-1]
+
+        yield b"]"
+
+    else:
+        yield dumps(obj, default)
+
+
+def _iter_chunks(pieces: Iterable[bytes], size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Join the given pieces into chunks of at least ``size`` bytes."""
+    chunk = []
+    length = 0
+    for piece in pieces:
+        chunk.append(piece)
+        length += len(piece)
+
+        if length >= size:
+            yield b"".join(chunk)
+            chunk = []
+            length = 0
+
+    if chunk:
+        yield b"".join(chunk)
+
+
+def _apply_object_hook(obj: Any, object_hook: Hook) -> Any:
+    """Apply the given hook to every ``dict``, innermost first, in the same way
+    :func:`json.loads` would."""
+    if isinstance(obj, dict):
+        return object_hook(
+            {key: _apply_object_hook(value, object_hook) for key, value in obj.items()}
+        )
+
+    if isinstance(obj, list):
+        return [_apply_object_hook(item, object_hook) for item in obj]
+
+    return obj
+
+
+def fast_json_codec() -> Codec:
+    """Return the fastest JSON codec available, falling back to :class:`JsonCodec`."""
+    try:
+        return OrjsonCodec()
+    except ImportError:
+        logger.debug("orjson is not available, using the json module instead")
+        return JsonCodec()
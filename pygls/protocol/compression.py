@@ -0,0 +1,176 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, Optional
+
+import attrs
+
+# The ``wbits`` values used by zlib for each supported ``Content-Encoding``.
+# As in HTTP, ``deflate`` is the zlib format, rather than raw deflate data.
+WBITS: Dict[str, int] = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+
+def compress(data: bytes, encoding: str, level: int = -1) -> bytes:
+    """Compress the given data using the given ``Content-Encoding``."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _wbits(encoding))
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    """Decompress the given data, encoded using the given ``Content-Encoding``."""
+    return zlib.decompress(data, _wbits(encoding))
+
+
+def _wbits(encoding: str) -> int:
+    try:
+        return WBITS[encoding]
+    except KeyError:
+        raise ValueError(f"Unsupported content encoding: {encoding!r}") from None
+
+
+def _quality(params: str) -> float:
+    """Return the quality value (``q=``) in the given header parameters."""
+    name, _, value = params.partition("=")
+    if name.strip() != "q":
+        return 1.0
+
+    try:
+        return float(value)
+    except ValueError:
+        return 1.0
+
+
+@attrs.define
+class CompressionStats:
+    """Counters describing the activity of a :class:`Compression` instance."""
+
+    messages_compressed: int = 0
+    """Number of messages compressed."""
+
+    bytes_in: int = 0
+    """Total size of the messages before they were compressed."""
+
+    bytes_out: int = 0
+    """Total size of the messages after they were compressed."""
+
+    compress_time: float = 0.0
+    """Total CPU time (in seconds) spent compressing messages."""
+
+    messages_decompressed: int = 0
+    """Number of messages decompressed."""
+
+    decompress_time: float = 0.0
+    """Total CPU time (in seconds) spent decompressing messages."""
+
+    @property
+    def ratio(self) -> float:
+        """The compressed size of messages, as a fraction of their original size."""
+        if self.bytes_in == 0:
+            return 1.0
+
+        return self.bytes_out / self.bytes_in
+
+
+class Compression:
+    """Compression of message bodies sent with ``Content-Length`` headers.
+
+    Each side advertises the encodings it accepts using an ``Accept-Encoding``
+    header. Messages larger than ``threshold`` bytes are only compressed once the
+    other side has advertised an encoding it shares with ``encodings``, so both
+    the client and the server must opt in.
+
+    Parameters
+    ----------
+    encodings
+       The supported encodings, in order of preference. Either ``gzip`` or
+       ``deflate``.
+
+    threshold
+       Messages smaller than this (in bytes) are never compressed.
+
+    level
+       The zlib compression level, from ``0`` to ``9``. Higher levels rarely make
+       messages much smaller, but can take many times longer to compress them.
+    """
+
+    def __init__(
+        self,
+        encodings: Iterable[str] = ("gzip", "deflate"),
+        threshold: int = 1024,
+        level: int = 1,
+    ):
+        self.encodings = list(encodings)
+        for encoding in self.encodings:
+            _wbits(encoding)
+
+        self.threshold = threshold
+        self.level = level
+        self.stats = CompressionStats()
+        self._lock = threading.Lock()
+
+    @property
+    def accept_encoding(self) -> str:
+        """The value of the ``Accept-Encoding`` header to send."""
+        return ", ".join(self.encodings)
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        """Return the encoding to use when sending messages to a peer that sent the
+        given ``Accept-Encoding`` header, if any."""
+        accepted = set()
+        for item in accept_encoding.split(","):
+            name, _, params = item.partition(";")
+            if _quality(params) == 0:
+                continue
+
+            accepted.add(name.strip().lower())
+
+        for encoding in self.encodings:
+            if encoding in accepted:
+                return encoding
+
+        return None
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        """Compress the given data, updating :attr:`stats`."""
+        start = time.thread_time()
+        result = compress(data, encoding, self.level)
+        elapsed = time.thread_time() - start
+
+        with self._lock:
+            self.stats.messages_compressed += 1
+            self.stats.bytes_in += len(data)
+            self.stats.bytes_out += len(result)
+            self.stats.compress_time += elapsed
+
+        return result
+
+    def decompress(self, data: bytes, encoding: str) -> bytes:
+        """Decompress the given data, updating :attr:`stats`."""
+        start = time.thread_time()
+        result = decompress(data, encoding)
+        elapsed = time.thread_time() - start
+
+        with self._lock:
+            self.stats.messages_decompressed += 1
+            self.stats.decompress_time += elapsed
+
+        return result
@@ -0,0 +1,201 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+
+from lsprotocol.types import ResponseErrorMessage
+
+from pygls.exceptions import JsonRpcInternalError
+from pygls.protocol.json_rpc import JsonRPCResponseMessage
+
+if TYPE_CHECKING:
+    from pygls.protocol.json_rpc import JsonRPCProtocol
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessTransport:
+    """Transport which passes messages from one protocol to another in the same
+    process, without serializing them.
+
+    A message is passed through as is, when it already has the type the receiving
+    protocol would have given it after parsing it, e.g. the ``lsprotocol`` type
+    registered for its method. Any other message (e.g. for a custom method, or with
+    ``params`` given as a ``dict``) is converted using the sending protocol's codec,
+    so the receiver sees exactly what it would have seen over any other transport.
+
+    Messages are handed over on the receiver's event loop, in the order they were
+    written.
+
+    Parameters
+    ----------
+    sender
+       The protocol writing to this transport.
+
+    receiver
+       The protocol receiving the messages.
+
+    loop
+       The event loop the receiving protocol runs on.
+
+    deep_copy
+       If ``True``, pass a copy of each message to the receiver, so that neither
+       side can observe changes the other makes to shared objects. The copy is
+       made by unstructuring and structuring the message again, skipping only the
+       encoding and decoding of the message body.
+    """
+
+    def __init__(
+        self,
+        sender: JsonRPCProtocol,
+        receiver: JsonRPCProtocol,
+        loop: asyncio.AbstractEventLoop,
+        deep_copy: bool = False,
+    ):
+        self._sender = sender
+        self._receiver = receiver
+        self._loop = loop
+        self._deep_copy = deep_copy
+        self._closed = False
+        self._peer: Optional[InProcessTransport] = None
+
+    def close(self):
+        """Close both ends of the connection."""
+        self._closed = True
+        if self._peer is not None:
+            self._peer._closed = True
+
+    def is_closing(self) -> bool:
+        return self._closed
+
+    def write_message(self, message: Any):
+        """Hand the given message (or batch of messages) over to the receiver."""
+        if self._closed:
+            logger.error("Unable to send message, the connection has been closed")
+            return
+
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+
+        if on_loop:
+            self._loop.call_soon(self._deliver, message)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver, message)
+
+    def _deliver(self, message: Any):
+        receiver = self._receiver
+        try:
+            if isinstance(message, list):
+                message = [self._convert(item) for item in message]
+            else:
+                message = self._convert(message)
+        except Exception as error:
+            logger.exception("Error receiving message", exc_info=True)
+            receiver._server._report_server_error(error, JsonRpcInternalError)
+            return
+
+        receiver._procedure_handler(message)
+
+    def _convert(self, message: Any) -> Any:
+        """Return the message as the receiver would have parsed it."""
+        receiver = self._receiver
+        expected_type = self._expected_type(message)
+
+        if expected_type is not None and _is_structured(message):
+            if type(message) is expected_type:
+                converted = message
+            elif type(message) is JsonRPCResponseMessage:
+                # Results are sent using the generic response type.
+                converted = expected_type(
+                    id=message.id, result=message.result, jsonrpc=message.jsonrpc
+                )
+            else:
+                converted = None
+
+            if converted is not None:
+                if hasattr(message, "result"):
+                    receiver._result_types.pop(message.id, None)
+
+                if self._deep_copy:
+                    # Faster than `copy.deepcopy`, and just as strict as parsing.
+                    data = self._sender._converter.unstructure(converted)
+                    converted = receiver._converter.structure(data, expected_type)
+
+                return converted
+
+        sender = self._sender
+        data = sender.codec.dumps(message, default=sender._serialize_message)
+        return receiver._deserialize_message(receiver.codec.loads(data))
+
+    def _expected_type(self, message: Any) -> Optional[type]:
+        """Return the type the receiver would parse the given message into, if it
+        is one that can be passed through as is."""
+        receiver = self._receiver
+
+        if isinstance(message, ResponseErrorMessage):
+            return ResponseErrorMessage
+
+        method = getattr(message, "method", None)
+        if method is not None:
+            return receiver.get_message_type(method)
+
+        response_type = receiver._result_types.get(message.id)
+        if response_type is JsonRPCResponseMessage:
+            return None
+
+        return response_type
+
+
+def _is_structured(message: Any) -> bool:
+    """Return ``False`` if the message's payload looks like it has not been
+    structured into its type, e.g. it is a ``dict``."""
+    for field in ("params", "result"):
+        value = getattr(message, field, None)
+        if isinstance(value, list) and len(value) > 0:
+            value = value[0]
+
+        if isinstance(value, dict):
+            return False
+
+    return True
+
+
+def connect_in_process(
+    client: JsonRPCProtocol,
+    server: JsonRPCProtocol,
+    client_loop: asyncio.AbstractEventLoop,
+    server_loop: asyncio.AbstractEventLoop,
+    deep_copy: bool = False,
+) -> Tuple[InProcessTransport, InProcessTransport]:
+    """Connect two protocols running in the same process.
+
+    Returns the transports used by the client and the server respectively. See
+    :class:`InProcessTransport` for details.
+    """
+    client_transport = InProcessTransport(client, server, server_loop, deep_copy)
+    server_transport = InProcessTransport(server, client, client_loop, deep_copy)
+    client_transport._peer = server_transport
+    server_transport._peer = client_transport
+
+    client.connection_made(client_transport)  # type: ignore[arg-type]
+    server.connection_made(server_transport)  # type: ignore[arg-type]
+    return client_transport, server_transport
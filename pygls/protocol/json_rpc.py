@@ -16,11 +16,14 @@
 ############################################################################
 from __future__ import annotations
 import asyncio
+import contextlib
+import contextvars
 import enum
-import json
+import inspect
 import logging
-import re
 import sys
+import tempfile
+import threading
 import uuid
 import traceback
 from concurrent.futures import Future
@@ -28,8 +31,11 @@ from functools import partial
 from typing import (
     Any,
     Dict,
+    Hashable,
     List,
     Optional,
+    Set,
+    Tuple,
     Type,
     Union,
     TYPE_CHECKING,
@@ -45,24 +51,63 @@ from cattrs.errors import ClassValidationError
 from lsprotocol.types import (
     CANCEL_REQUEST,
     EXIT,
+    PROGRESS,
     WORKSPACE_EXECUTE_COMMAND,
+    CancelParams,
+    ProgressParams,
     ResponseError,
     ResponseErrorMessage,
 )
 
+from pygls.constants import POOL_DEFAULT, PRIORITY_NORMAL, SUPERSEDE_CANCEL
 from pygls.exceptions import (
+    JsonRpcContentModified,
     JsonRpcException,
     JsonRpcInternalError,
     JsonRpcInvalidParams,
+    JsonRpcInvalidRequest,
     JsonRpcMethodNotFound,
     JsonRpcRequestCancelled,
     FeatureNotificationError,
     FeatureRequestError,
+    RequestTimeoutError,
 )
-from pygls.feature_manager import FeatureManager, is_thread_function
+from pygls.feature_manager import (
+    FeatureManager,
+    get_help_attrs,
+    get_thread_attrs,
+    is_process_function,
+    is_thread_function,
+)
+from pygls.process import WorkspaceSnapshot, record_to_dict, run_in_process
+from pygls.protocol.codec import CHUNK_SIZE, Codec, JsonCodec
+from pygls.protocol.compression import Compression, decompress
+from pygls.protocol.scheduler import Debouncer, DocumentActors
 
 logger = logging.getLogger(__name__)
 
+current_protocol: contextvars.ContextVar[
+    Optional[JsonRPCProtocol]
+] = contextvars.ContextVar("current_protocol", default=None)
+"""The protocol instance whose message is currently being handled."""
+
+current_cancellation_token: contextvars.ContextVar[
+    Optional[CancellationToken]
+] = contextvars.ContextVar("current_cancellation_token", default=None)
+"""The cancellation token of the request being handled by the current thread."""
+
+_ordered_work: contextvars.ContextVar[
+    Optional[List[asyncio.Future]]
+] = contextvars.ContextVar("ordered_work", default=None)
+"""The work started for the message being handled in order, see
+:meth:`JsonRPCProtocol._dispatch_in_order`."""
+
+_send_batch: contextvars.ContextVar[Optional[_SendBatch]] = contextvars.ContextVar(
+    "send_batch", default=None
+)
+"""The batch messages sent by the current thread or task are added to, see
+:meth:`JsonRPCProtocol.batch`."""
+
 
 @attrs.define
 class JsonRPCNotification:
@@ -98,6 +143,153 @@ class JsonRPCResponseMessage:
     result: Any
 
 
+def _media_type(content_type: Union[bytes, str]) -> bytes:
+    """Return the media type of the given ``Content-Type``, without parameters."""
+    if isinstance(content_type, str):
+        content_type = content_type.encode("ascii")
+
+    return content_type.partition(b";")[0].strip().lower()
+
+
+class _ResponseBatch:
+    """Collects the responses to the requests of a received batch, so that they can
+    be sent back to the client as a single batch."""
+
+    def __init__(self, msg_ids: List[Union[int, str]], responses: List[Any]):
+        self._pending = set(msg_ids)
+        self._responses = list(responses)
+        self._lock = threading.Lock()
+
+    def add(self, msg_id, response=None) -> Optional[List[Any]]:
+        """Record the response to the given request, returns all responses once the
+        batch is complete.
+
+        A ``response`` of ``None`` marks the request as complete without a response.
+        """
+        with self._lock:
+            self._pending.discard(msg_id)
+            if response is not None:
+                self._responses.append(response)
+
+            if self._pending:
+                return None
+
+            return self._responses
+
+
+class _SendBatch:
+    """The messages sent within :meth:`JsonRPCProtocol.batch`."""
+
+    def __init__(self, protocol: JsonRPCProtocol):
+        self.protocol = protocol
+        self.messages: List[Any] = []
+        self.closed = False
+
+
+class _InvalidMessage:
+    """A member of a received batch that is not a valid request, which the client
+    is sent an error for in place of a response, see
+    :meth:`JsonRPCProtocol._deserialize_batch_member`."""
+
+    def __init__(self, msg_id: Optional[Union[int, str]], error: JsonRpcException):
+        self.id = msg_id
+        self.error = error
+
+    def to_response(self) -> ResponseErrorMessage:
+        return ResponseErrorMessage(id=self.id, error=self.error.to_response_error())
+
+
+class CancellationToken:
+    """Set when the client cancels a request handled in a thread, see
+    :meth:`Server.cancellation_token <pygls.server.Server.cancellation_token>`.
+
+    Threads can't be interrupted, so long running handlers should check the token
+    from time to time and stop early once it is set, e.g. by calling
+    :meth:`raise_if_cancelled`.
+    """
+
+    def __init__(self, msg_id: Optional[Union[int, str]] = None):
+        self.msg_id = msg_id
+        self._event = threading.Event()
+
+    def cancel(self) -> bool:
+        """Cancel the request, returns ``False`` if it was already cancelled."""
+        if self._event.is_set():
+            return False
+
+        self._event.set()
+        return True
+
+    @property
+    def cancelled(self) -> bool:
+        """``True`` once the request has been cancelled."""
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the request is cancelled or the ``timeout`` expires, returns
+        ``True`` if the request was cancelled. Useful in place of
+        :func:`time.sleep`."""
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self):
+        """Raise :class:`~pygls.exceptions.JsonRpcRequestCancelled` if the request
+        has been cancelled, which replies to it with a ``RequestCancelled`` error."""
+        if self._event.is_set():
+            raise JsonRpcRequestCancelled(
+                f'Request with id "{self.msg_id}" is canceled'
+            )
+
+
+@attrs.define
+class RequestStats:
+    """Gauges and counters describing the requests sent to the other side, see
+    :meth:`JsonRPCProtocol.request_stats`."""
+
+    outstanding: int = 0
+    """Number of requests still waiting for a response."""
+
+    by_method: Dict[str, int] = attrs.field(factory=dict)
+    """Number of requests still waiting for a response, by method."""
+
+    peak: int = 0
+    """Largest number of requests that were waiting for a response at once."""
+
+    sent: int = 0
+    """Number of requests sent."""
+
+    timed_out: int = 0
+    """Number of requests given up on because they were not answered in time."""
+
+
+class _PartialResults:
+    """Sends the batches of results yielded by a generator handler as partial
+    results, if the request has a ``partialResultToken``. Otherwise the batches are
+    collected into the final result."""
+
+    def __init__(self, protocol: JsonRPCProtocol, method_name: Optional[str], params):
+        self._protocol = protocol
+        self._method_name = method_name
+        self._token = getattr(params, "partial_result_token", None)
+        self._items: List[Any] = []
+
+    def add(self, batch):
+        if self._token is None:
+            self._items.extend(batch)
+            return
+
+        value = self._protocol._partial_result(self._method_name, batch)
+        self._protocol.notify(PROGRESS, ProgressParams(token=self._token, value=value))
+
+    def result(self):
+        """Return the final result, which is empty if partial results were sent."""
+        return self._protocol._final_result(self._method_name, self._items)
+
+
+def _release_waiter(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
 class JsonRPCProtocol(asyncio.Protocol):
     """Json RPC protocol implementation using on top of `asyncio.Protocol`.
 
@@ -110,13 +302,7 @@ class JsonRPCProtocol(asyncio.Protocol):
     CHARSET = "utf-8"
     CONTENT_TYPE = "application/vscode-jsonrpc"
 
-    MESSAGE_PATTERN = re.compile(
-        rb"^(?:[^\r\n]+\r\n)*"
-        + rb"Content-Length: (?P<length>\d+)\r\n"
-        + rb"(?:[^\r\n]+\r\n)*\r\n"
-        + rb"(?P<body>{.*)",
-        re.DOTALL,
-    )
+    HEADER_SEPARATOR = b"\r\n\r\n"
 
     VERSION = "2.0"
 
@@ -124,31 +310,144 @@ class JsonRPCProtocol(asyncio.Protocol):
         self._server = server
         self._converter = converter
 
+        self.codec: Codec = JsonCodec()
+        """The codec used to encode and decode message bodies."""
+
+        self.preferred_codec: Optional[Codec] = None
+        """If set, a codec to use instead of :attr:`codec` once the other side has
+        said it accepts it, e.g. a binary codec for links between two *pygls*
+        instances. Not used for WebSocket connections."""
+
+        # The preferred codec, once the other side has accepted it
+        self._send_codec: Optional[Codec] = None
+
         self._shutdown = False
 
         # Book keeping for in-flight requests
         self._request_futures: Dict[str, Future[Any]] = {}
         self._result_types: Dict[str, Any] = {}
+        self._cancellation_tokens: Dict[Union[int, str], CancellationToken] = {}
+
+        self.request_timeout: Optional[float] = None
+        """If set, the number of seconds to wait for the response to a request sent
+        to the other side, before giving up on it. See :meth:`send_request`."""
+
+        self.request_timeouts: Dict[str, Optional[float]] = {}
+        """The number of seconds to wait for the responses to requests of the given
+        methods, in place of :attr:`request_timeout`."""
+
+        # Book keeping for requests sent to the other side, see `send_request`
+        self._sent_requests: Dict[Union[int, str], str] = {}
+        self._request_deadlines: Dict[Union[int, str], asyncio.TimerHandle] = {}
+        self._requests_sent = 0
+        self._requests_timed_out = 0
+        self._requests_peak = 0
+
+        # The event loop the connection is served on, see `connection_made`
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Supersession bookkeeping, see `_supersede_request`
+        self._latest_requests: Dict[Tuple[str, Optional[str]], Union[int, str]] = {}
+        self._request_keys: Dict[Union[int, str], Tuple[str, Optional[str]]] = {}
+        self._superseded: Set[Union[int, str]] = set()
+        self._supersede_lock = threading.Lock()
+
+        # Messages handled in order of arrival, see `_dispatch_in_order`
+        self.document_actors = DocumentActors()
+
+        # Notifications of debounced features, see `_execute_notification`
+        self.debouncer = Debouncer()
 
         self.fm = FeatureManager(server, converter)
         self.transport: Optional[
             Union[asyncio.WriteTransport, WebSocketTransportAdapter]
         ] = None
-        self._message_buf: List[bytes] = []
+
+        # Incremental message framing state, see `_data_received`
+        self._message_buf = bytearray()
+        self._message_pos = 0
+        self._content_length: Optional[int] = None
+        self._content_encoding: Optional[str] = None
+        self._content_codec: Optional[Codec] = None
+
+        self.compression: Optional[Compression] = None
+        """If set, compress large messages once the other side accepts it."""
+
+        # The encoding accepted by the other side, see `Compression.negotiate`
+        self._send_encoding: Optional[str] = None
 
         self._send_only_body = False
 
+        self.spool_size = 16 * 1024 * 1024
+        """Message bodies that take more than one chunk to encode (see
+        :meth:`Codec.iterdumps <pygls.protocol.Codec.iterdumps>`) are buffered in a
+        temporary file while they are being encoded, which is kept in memory until
+        it grows beyond this many bytes."""
+
+        # Held while a message is written to the transport, so that messages sent
+        # from other threads don't end up in the middle of one written in chunks
+        self._write_lock = threading.Lock()
+
+        # Set when this protocol instance serves one of many client connections,
+        # see `Server._create_session`
+        self._is_session = False
+
+        # Batch bookkeeping, see `batch` and `_handle_batch`
+        self._response_batches: Dict[Union[int, str], _ResponseBatch] = {}
+
+        # Flow control, see `pause_writing` and `resume_writing`
+        self._write_allowed = threading.Event()
+        self._write_allowed.set()
+        self._drain_waiters: List[asyncio.Future] = []
+        self._connection_lost = False
+
     def __call__(self):
         return self
 
     def _execute_notification(self, handler, *params):
-        """Executes notification message handler."""
+        """Executes notification message handler.
+
+        Calls to handlers of features registered with a ``debounce`` delay are
+        passed to the :attr:`debouncer` instead, keyed by
+        :meth:`get_debounce_key`.
+        """
+        method_name, _ = get_help_attrs(handler)
+        delay = self.fm.debounce_delays.get(method_name) if method_name else None
+
+        # Built-in features share the name of the user's feature, but are not
+        # debounced.
+        if delay is not None and handler is self.fm.features.get(method_name):
+            self.debouncer.call(
+                method_name,
+                self.get_debounce_key(method_name, *params),
+                delay,
+                partial(self._run_notification, handler, *params),
+            )
+            return
+
+        self._run_notification(handler, *params)
+
+    def _run_notification(self, handler, *params):
         if asyncio.iscoroutinefunction(handler):
             future = asyncio.ensure_future(handler(*params))
             future.add_done_callback(self._execute_notification_callback)
+            self._add_ordered_work(future)
+        elif is_process_function(handler):
+            future = self._submit_to_process(handler, *params)
+            future.add_done_callback(self._execute_notification_callback)
+            self._add_ordered_work(future)
         else:
             if is_thread_function(handler):
-                self._server.thread_pool.apply_async(handler, (*params,))
+                method_name, _ = get_help_attrs(handler)
+                pool, max_concurrency = get_thread_attrs(handler)
+                thread_future = self._server.pools[pool].apply_async(
+                    contextvars.copy_context().run,
+                    (handler, *params),
+                    priority=self.get_priority(method_name, *params),
+                    key=method_name,
+                    limit=max_concurrency,
+                )
+                self._add_ordered_work(thread_future)
             else:
                 handler(*params)
 
@@ -165,27 +464,149 @@ class JsonRPCProtocol(asyncio.Protocol):
             # https://stackoverflow.com/questions/31091376/json-rpc-2-0-allow-notifications-to-have-an-error-response
             # self._send_response(None, error=error)
 
-    def _execute_request(self, msg_id, handler, params):
-        """Executes request message handler."""
+    def _execute_request(self, msg_id, handler, params, method_name=None):
+        """Executes request message handler.
+
+        Handlers may also be (async) generators yielding batches of results, see
+        :meth:`_collect_results`.
+        """
 
         if asyncio.iscoroutinefunction(handler):
             future = asyncio.ensure_future(handler(params))
             self._request_futures[msg_id] = future
             future.add_done_callback(partial(self._execute_request_callback, msg_id))
+            self._add_ordered_work(future)
+        elif is_process_function(handler):
+            self._execute_in_process(msg_id, handler, params)
         else:
-            # Can't be canceled
+            # Threads can't be interrupted, instead handlers are given a token they
+            # can check to stop early.
             if is_thread_function(handler):
-                self._server.thread_pool.apply_async(
-                    handler,
-                    (params,),
-                    callback=partial(
-                        self._send_response,
-                        msg_id,
-                    ),
+                token = CancellationToken(msg_id)
+                self._cancellation_tokens[msg_id] = token
+                pool, max_concurrency = get_thread_attrs(handler)
+                # Commands are all run through the same method
+                registered_name, _ = get_help_attrs(handler)
+                thread_future = self._server.pools[pool].apply_async(
+                    contextvars.copy_context().run,
+                    (self._call_handler, method_name, handler, params, token),
+                    callback=partial(self._execute_thread_callback, msg_id),
                     error_callback=partial(self._execute_request_err_callback, msg_id),
+                    priority=self.get_priority(method_name, params),
+                    key=registered_name or method_name,
+                    limit=max_concurrency,
                 )
-            else:
-                self._send_response(msg_id, handler(params))
+                self._add_ordered_work(thread_future)
+                return
+
+            result = handler(params)
+            if inspect.isasyncgen(result):
+                task = asyncio.ensure_future(
+                    self._collect_results_async(method_name, params, result)
+                )
+                self._request_futures[msg_id] = task  # type: ignore[assignment]
+                task.add_done_callback(partial(self._execute_request_callback, msg_id))
+                self._add_ordered_work(task)
+                return
+
+            if inspect.isgenerator(result):
+                result = self._collect_results(method_name, params, result)
+
+            self._send_response(msg_id, result)
+
+    def _execute_in_process(self, msg_id, handler, params):
+        """Run the given handler in the server's process pool.
+
+        The handler is sent to the worker process along with its params and a
+        snapshot of the documents it needs (see :meth:`_workspace_snapshot`), in
+        place of the server. The request can only be cancelled before the worker
+        starts on it.
+        """
+        future = self._submit_to_process(handler, params)
+        self._request_futures[msg_id] = future  # type: ignore[assignment]
+        future.add_done_callback(partial(self._execute_request_callback, msg_id))
+        self._add_ordered_work(future)
+
+    def _submit_to_process(self, handler, params) -> asyncio.Future:
+        """Submit a call of the given handler to the server's process pool, see
+        :meth:`_execute_in_process`."""
+        pass_server = isinstance(handler, partial)
+        if pass_server:
+            handler = handler.func
+
+        is_record = isinstance(params, tuple) and hasattr(params, "_asdict")
+        concurrent_future = self._server.process_pool.submit(
+            run_in_process,
+            handler,
+            pass_server,
+            self._workspace_snapshot(params),
+            record_to_dict(params) if is_record else params,
+            is_record,
+        )
+        return asyncio.wrap_future(concurrent_future, loop=self._server.loop)
+
+    def _workspace_snapshot(self, params) -> WorkspaceSnapshot:
+        """Return the snapshot of the documents sent to a handler running in a
+        separate process."""
+        return WorkspaceSnapshot({})
+
+    def _call_handler(self, method_name, handler, params, token=None):
+        """Call the given request handler, collecting its results if it is a
+        generator.
+
+        If a cancellation token is given, it is made available to the handler and
+        the handler is not called at all if the request has already been cancelled.
+        """
+        if token is not None:
+            token.raise_if_cancelled()
+            current_cancellation_token.set(token)
+
+        result = handler(params)
+        if inspect.isgenerator(result):
+            return self._collect_results(method_name, params, result)
+
+        return result
+
+    def _collect_results(self, method_name, params, results):
+        """Run a generator handler to completion.
+
+        Each batch (``list``) of results the handler yields is sent to the client as
+        a partial result straight away if the request has a ``partialResultToken``,
+        in which case the final result is empty. Otherwise the batches are combined
+        into the final result.
+        """
+        partial_results = _PartialResults(self, method_name, params)
+        token = current_cancellation_token.get()
+        try:
+            for batch in results:
+                partial_results.add(batch)
+                if token is not None:
+                    token.raise_if_cancelled()
+        finally:
+            results.close()
+
+        return partial_results.result()
+
+    async def _collect_results_async(self, method_name, params, results):
+        """Run an async generator handler to completion, see
+        :meth:`_collect_results`."""
+        partial_results = _PartialResults(self, method_name, params)
+        try:
+            async for batch in results:
+                partial_results.add(batch)
+        finally:
+            await results.aclose()
+
+        return partial_results.result()
+
+    def _partial_result(self, method_name: Optional[str], items: List[Any]) -> Any:
+        """Return the value of the partial result for the given batch of items."""
+        return items
+
+    def _final_result(self, method_name: Optional[str], items: List[Any]) -> Any:
+        """Return the final result of a generator handler, given the items it
+        yielded that have not been sent as partial results."""
+        return items
 
     def _execute_request_callback(self, msg_id, future):
         """Success callback used for coroutine request message."""
@@ -205,8 +626,19 @@ class JsonRPCProtocol(asyncio.Protocol):
             logger.exception('Exception occurred for message "%s": %s', msg_id, error)
             self._send_response(msg_id, error=error.to_response_error())
 
+    def _execute_thread_callback(self, msg_id, result):
+        """Success callback used for threaded request message."""
+        self._cancellation_tokens.pop(msg_id, None)
+        self._send_response(msg_id, result)
+
     def _execute_request_err_callback(self, msg_id, exc):
-        """Error callback used for coroutine request message."""
+        """Error callback used for threaded request message."""
+        self._cancellation_tokens.pop(msg_id, None)
+        if isinstance(exc, JsonRpcRequestCancelled):
+            logger.info('Cancelled request with id "%s"', msg_id)
+            self._send_response(msg_id, error=exc.to_response_error())
+            return
+
         exc_info = (type(exc), exc, None)
         error = JsonRpcInternalError.of(exc_info)
         logger.exception('Exception occurred for message "%s": %s', msg_id, error)
@@ -224,6 +656,12 @@ class JsonRPCProtocol(asyncio.Protocol):
 
     def _handle_cancel_notification(self, msg_id):
         """Handles a cancel notification from the client."""
+        token = self._cancellation_tokens.get(msg_id)
+        if token is not None:
+            if token.cancel():
+                logger.info('Cancelling request with id "%s"', msg_id)
+            return
+
         future = self._request_futures.pop(msg_id, None)
 
         if not future:
@@ -259,11 +697,15 @@ class JsonRPCProtocol(asyncio.Protocol):
         try:
             handler = self._get_handler(method_name)
 
+            policy = self.fm.supersede_policies.get(method_name)
+            if policy is not None:
+                self._track_request(msg_id, method_name, params, policy)
+
             # workspace/executeCommand is a special case
             if method_name == WORKSPACE_EXECUTE_COMMAND:
                 handler(params, msg_id)
             else:
-                self._execute_request(msg_id, handler, params)
+                self._execute_request(msg_id, handler, params, method_name)
 
         except JsonRpcException as error:
             logger.exception(
@@ -306,13 +748,77 @@ class JsonRPCProtocol(asyncio.Protocol):
         """Function used to serialize data sent to the client."""
 
         if hasattr(data, "__attrs_attrs__"):
-            return self._converter.unstructure(data)
+            obj = self._converter.unstructure(data)
+            if isinstance(data, ResponseErrorMessage) and data.id is None:
+                # JSON-RPC requires the id, even when it is unknown.
+                obj["id"] = None
+
+            return obj
 
         if isinstance(data, enum.Enum):
             return data.value
 
         return data.__dict__
 
+    def _envelope(self, data):
+        """Return the envelope of a response with a list as its result as a
+        ``dict``, leaving the items as they are.
+
+        This way the items are unstructured as they are encoded, rather than all at
+        once, which matters when encoding a very large result a chunk at a time.
+        """
+        if not isinstance(getattr(data, "result", None), list):
+            return data
+
+        if not attrs.has(type(data)):
+            return data
+
+        fields = attrs.fields(type(data))
+        return {field.name: getattr(data, field.name) for field in fields}
+
+    def _decode_message(self, data: Union[bytes, str], codec: Optional[Codec] = None):
+        """Decode the given message body.
+
+        The body is decoded into plain Python objects in one pass and only the
+        top level message envelope is then structured into the type registered
+        for its method, which in turn structures its ``params`` or ``result``.
+        Batches are decoded into a list of messages.
+
+        The body is decoded using :attr:`codec`, unless another ``codec`` is given.
+        """
+        obj = (codec or self.codec).loads(data)
+        if isinstance(obj, list):
+            return [self._deserialize_batch_member(item) for item in obj]
+
+        return self._deserialize_message(obj)
+
+    def _deserialize_batch_member(self, data):
+        """Deserialize a member of a received batch.
+
+        Members that are not valid messages are returned as an
+        :class:`_InvalidMessage`, so the rest of the batch is still handled. Invalid
+        notifications and responses are dropped, since they can't be answered.
+        """
+        msg_id = data.get("id") if isinstance(data, dict) else None
+        if not isinstance(msg_id, (int, str)):
+            msg_id = None
+
+        if (
+            not isinstance(data, dict)
+            or "jsonrpc" not in data
+            or ("method" not in data and "id" not in data)
+        ):
+            logger.warning("Invalid message in batch: %s", data)
+            return _InvalidMessage(msg_id, JsonRpcInvalidRequest())
+
+        try:
+            return self._deserialize_message(data)
+        except JsonRpcException as error:
+            if "method" in data and "id" in data:
+                return _InvalidMessage(msg_id, error)
+
+            return None
+
     def _deserialize_message(self, data):
         """Function used to deserialize data recevied from the client."""
 
@@ -330,7 +836,8 @@ class JsonRPCProtocol(asyncio.Protocol):
                     return self._converter.structure(data, request_type)
                 else:
                     response_type = (
-                        self._result_types.pop(data["id"]) or JsonRPCResponseMessage
+                        self._result_types.pop(data["id"], None)
+                        or JsonRPCResponseMessage
                     )
                     return self._converter.structure(data, response_type)
 
@@ -347,18 +854,86 @@ class JsonRPCProtocol(asyncio.Protocol):
             logger.error("Unable to deserialize message\n%s", traceback.format_exc())
             raise JsonRpcInternalError() from exc
 
+    def _handle_batch(self, messages: List[Any]):
+        """Handles a batch of messages from the client.
+
+        All messages are dispatched immediately, the responses to any requests
+        are sent back as a single batch once every request has completed, along
+        with an error for each member that is not a valid request.
+        """
+        if len(messages) == 0:
+            error = JsonRpcInvalidRequest("Empty batch").to_response_error()
+            self._send_data(ResponseErrorMessage(id=None, error=error))
+            return
+
+        errors = [
+            message.to_response()
+            for message in messages
+            if isinstance(message, _InvalidMessage)
+        ]
+        messages = [
+            message
+            for message in messages
+            if message is not None and not isinstance(message, _InvalidMessage)
+        ]
+
+        msg_ids = [
+            message.id
+            for message in messages
+            if hasattr(message, "method") and hasattr(message, "id")
+        ]
+        if len(msg_ids) > 0:
+            batch = _ResponseBatch(msg_ids, errors)
+            for msg_id in msg_ids:
+                self._response_batches[msg_id] = batch
+        elif len(errors) > 0:
+            self._send_data(errors)
+
+        for message in messages:
+            self._procedure_handler(message)
+
+    def _discard_batched_response(self, message):
+        """Stop waiting for a response to the given message, if it was part of a
+        batch."""
+        msg_id = getattr(message, "id", None)
+        batch = self._response_batches.pop(msg_id, None)  # type: ignore[arg-type]
+        if batch is None:
+            return
+
+        responses = batch.add(msg_id)
+        if responses:
+            self._send_data(responses)
+
     def _procedure_handler(self, message):
         """Delegates message to handlers depending on message type."""
+        token = current_protocol.set(self)
+        try:
+            self._dispatch_message(message)
+        finally:
+            current_protocol.reset(token)
+
+    def _dispatch_message(self, message):
+        if isinstance(message, list):
+            logger.debug("Batch message received.")
+            self._handle_batch(message)
+            return
 
         if message.jsonrpc != JsonRPCProtocol.VERSION:
             logger.warning('Unknown message "%s"', message)
+            self._discard_batched_response(message)
             return
 
         if self._shutdown and getattr(message, "method", "") != EXIT:
             logger.warning("Server shutting down. No more requests!")
+            self._discard_batched_response(message)
             return
 
         if hasattr(message, "method"):
+            uri = self._document_uri(message)
+            if uri is not None:
+                self._dispatch_in_order(uri, message)
+                return
+
             if hasattr(message, "id"):
                 logger.debug("Request message received.")
                 self._handle_request(message.id, message.method, message.params)
@@ -373,35 +948,314 @@ class JsonRPCProtocol(asyncio.Protocol):
                 logger.debug("Response message received.")
                 self._handle_response(message.id, message.result)
 
+    def _document_uri(self, message) -> Optional[str]:
+        """Return the uri of the document the given request or notification is
+        about, if messages about the same document should be handled in order of
+        arrival (see :meth:`_dispatch_in_order`)."""
+        return None
+
+    def _dispatch_in_order(self, uri: str, message):
+        """Handle the given message once all earlier messages about the same
+        document have been handled, including any work their handlers started in a
+        thread, process or task.
+
+        Messages about different documents are still handled concurrently.
+        """
+        msg_id = getattr(message, "id", None)
+        if msg_id is not None:
+            # Allow the request to be cancelled while it waits for its turn
+            self._cancellation_tokens[msg_id] = CancellationToken(msg_id)
+
+            # A newer request supersedes the previous one as soon as it arrives,
+            # rather than once it is its turn.
+            policy = self.fm.supersede_policies.get(message.method)
+            if policy is not None:
+                self._track_request(msg_id, message.method, message.params, policy)
+
+        self.document_actors.submit(uri, partial(self._handle_in_order, message))
+
+    async def _handle_in_order(self, message):
+        msg_id = getattr(message, "id", None)
+        if msg_id is not None:
+            token = self._cancellation_tokens.pop(msg_id, None)
+            if msg_id in self._superseded:
+                # Answered while it was waiting for its turn
+                with self._supersede_lock:
+                    self._superseded.discard(msg_id)
+                return
+
+            if token is not None and token.cancelled:
+                logger.info('Cancelled request with id "%s"', msg_id)
+                error = JsonRpcRequestCancelled().to_response_error()
+                self._send_response(msg_id, None, error)
+                return
+
+        work: List[asyncio.Future] = []
+        protocol_token = current_protocol.set(self)
+        work_token = _ordered_work.set(work)
+        try:
+            if msg_id is not None:
+                logger.debug("Request message received.")
+                self._handle_request(msg_id, message.method, message.params)
+            else:
+                logger.debug("Notification message received.")
+                self._handle_notification(message.method, message.params)
+        finally:
+            _ordered_work.reset(work_token)
+            current_protocol.reset(protocol_token)
+
+        if work:
+            await asyncio.gather(*work, return_exceptions=True)
+
+    def _add_ordered_work(self, future: Union[asyncio.Future, Future]):
+        """Have the message being handled in order wait for the given work, see
+        :meth:`_dispatch_in_order`."""
+        work = _ordered_work.get()
+        if work is None:
+            return
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Started from a thread, rather than while dispatching the message
+            return
+
+        if not isinstance(future, asyncio.Future):
+            future = asyncio.wrap_future(future, loop=self._server.loop)
+
+        work.append(future)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Context manager that sends all messages sent by the current thread or
+        task within it as a single JSON-RPC batch.
+
+        .. note::
+
+           Batches are part of the JSON-RPC specification, but not the Language Server
+           Protocol, so only use this when the other side is known to support them
+           e.g. another *pygls* based server or client.
+
+        Example
+        -------
+        ::
+
+           with ls.batch():
+               for uri, diagnostics in results.items():
+                   ls.publish_diagnostics(uri, diagnostics)
+        """
+        batch = _send_batch.get()
+        if batch is not None and batch.protocol is self and not batch.closed:
+            # Nested batch, the outermost batch will send the messages.
+            yield
+            return
+
+        batch = _SendBatch(self)
+        token = _send_batch.set(batch)
+        try:
+            yield
+        finally:
+            _send_batch.reset(token)
+
+            # Tasks started within the batch still see it, once it has been sent
+            # their messages are sent as usual.
+            batch.closed = True
+            messages = batch.messages
+            if len(messages) == 1:
+                self._send_data(messages[0])
+            elif len(messages) > 1:
+                self._send_data(messages)
+
     def _send_data(self, data):
         """Sends data to the client."""
         if not data:
             return
 
+        batch = _send_batch.get()
+        if batch is not None and batch.protocol is self and not batch.closed:
+            batch.messages.append(data)
+            return
+
         if self.transport is None:
             logger.error("Unable to send data, no available transport!")
             return
 
+        if not self._wait_until_writable():
+            logger.error("Unable to send data, the connection has been lost!")
+            return
+
         try:
-            body = json.dumps(data, default=self._serialize_message)
-            logger.info("Sending data: %s", body)
+            # Transports connecting two protocols in the same process take the
+            # messages as they are, see `InProcessTransport`.
+            write_message = getattr(self.transport, "write_message", None)
+            if write_message is not None:
+                write_message(data)
+                return
 
             if self._send_only_body:
+                body = self.codec.dumps(data, default=self._serialize_message)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Sending data: %s", body.decode(self.CHARSET))
+
                 # Mypy/Pyright seem to think `write()` wants `"bytes | bytearray | memoryview"`
                 # But runtime errors with anything but `str`.
-                self.transport.write(body)  # type: ignore
+                with self._write_lock:
+                    self.transport.write(body.decode(self.CHARSET))  # type: ignore
                 return
 
+            codec = self._send_codec or self.codec
+
+            # Large bodies are encoded a chunk at a time and buffered in a spool,
+            # since the Content-Length has to be sent before the body.
+            chunks = codec.iterdumps(
+                self._envelope(data), default=self._serialize_message
+            )
+            body = next(chunks, b"")
+            spool = None
+            for chunk in chunks:
+                if spool is None:
+                    spool = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+                    spool.write(body)
+
+                spool.write(chunk)
+
+            length = len(body) if spool is None else spool.tell()
+            if logger.isEnabledFor(logging.INFO):
+                if codec is not self.codec:
+                    logger.info("Sending data: %s (%s)", data, codec.name)
+                elif spool is None:
+                    logger.info("Sending data: %s", body.decode(self.CHARSET))
+                else:
+                    logger.info(
+                        "Sending data: %s... (%d bytes)",
+                        body[:1024].decode(self.CHARSET, errors="replace"),
+                        length,
+                    )
+
+            content_type = f"{self.CONTENT_TYPE}; charset={self.CHARSET}"
+            if codec is not self.codec:
+                content_type = codec.content_type
+
+            encoding_headers = ""
+            if self.preferred_codec is not None:
+                encoding_headers = f"Accept: {self.preferred_codec.content_type}\r\n"
+
+            compression = self.compression
+            if compression is not None:
+                encoding_headers += (
+                    f"Accept-Encoding: {compression.accept_encoding}\r\n"
+                )
+
+                encoding = self._send_encoding
+                if encoding is not None and length >= compression.threshold:
+                    if spool is not None:
+                        spool.seek(0)
+                        body = spool.read()
+                        spool.close()
+                        spool = None
+
+                    body = compression.compress(body, encoding)
+                    length = len(body)
+                    encoding_headers += f"Content-Encoding: {encoding}\r\n"
+
             header = (
-                f"Content-Length: {len(body)}\r\n"
-                f"Content-Type: {self.CONTENT_TYPE}; charset={self.CHARSET}\r\n\r\n"
+                f"Content-Length: {length}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"{encoding_headers}\r\n"
             ).encode(self.CHARSET)
 
-            self.transport.write(header + body.encode(self.CHARSET))
+            if spool is None:
+                with self._write_lock:
+                    self.transport.write(header + body)
+                return
+
+            write_file = getattr(self.transport, "write_file", None)
+            if write_file is not None:
+                # The transport reads the body from the spool as it writes it, so
+                # only a chunk of it is in memory at a time.
+                with self._write_lock:
+                    write_file(header, spool)
+                return
+
+            with spool, self._write_lock:
+                self.transport.write(header)
+                spool.seek(0)
+                while chunk := spool.read(CHUNK_SIZE):
+                    self.transport.write(chunk)
         except Exception as error:
             logger.exception("Error sending data", exc_info=True)
             self._server._report_server_error(error, JsonRpcInternalError)
 
+    def _wait_until_writable(self) -> bool:
+        """Block the calling thread while the transport has paused writing.
+
+        The event loop itself is never blocked, since it may be required to
+        drain the transport's buffer.
+
+        Returns ``False`` if the connection has been lost in the meantime.
+        """
+        if not self._write_allowed.is_set():
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                self._write_allowed.wait()
+
+        return not self._connection_lost
+
+    def _track_request(self, msg_id, method_name, params, policy):
+        """Supersede the request still being handled for the same method and
+        document (if any) and keep track of the given one."""
+        uri = getattr(getattr(params, "text_document", None), "uri", None)
+        key = (method_name, uri)
+
+        previous = self._latest_requests.get(key)
+        if previous is not None and previous != msg_id:
+            self._supersede_request(previous, policy)
+
+        with self._supersede_lock:
+            self._latest_requests[key] = msg_id
+            self._request_keys[msg_id] = key
+
+    def _supersede_document(self, uri: str):
+        """Supersede all requests still being handled for the given document, e.g.
+        since it has changed."""
+        for (method_name, key_uri), msg_id in list(self._latest_requests.items()):
+            if key_uri == uri:
+                policy = self.fm.supersede_policies.get(method_name, SUPERSEDE_CANCEL)
+                self._supersede_request(msg_id, policy)
+
+    def _supersede_request(self, msg_id, policy: str):
+        """Answer the given request with an error straight away and cancel its
+        handler, the response the handler eventually produces is dropped."""
+        with self._supersede_lock:
+            key = self._request_keys.pop(msg_id, None)
+            if key is None:
+                # Already answered
+                return
+
+            if self._latest_requests.get(key) == msg_id:
+                del self._latest_requests[key]
+
+            self._superseded.add(msg_id)
+
+        logger.info('Request with id "%s" has been superseded', msg_id)
+        if policy == SUPERSEDE_CANCEL:
+            error: JsonRpcException = JsonRpcRequestCancelled(
+                f'Request with id "{msg_id}" has been superseded'
+            )
+        else:
+            error = JsonRpcContentModified()
+
+        self._respond(msg_id, error=error.to_response_error())
+
+        future = self._request_futures.get(msg_id)
+        if future is not None:
+            future.cancel()
+
+        token = self._cancellation_tokens.get(msg_id)
+        if token is not None:
+            token.cancel()
+
     def _send_response(
         self, msg_id, result=None, error: Union[ResponseError, None] = None
     ):
@@ -412,7 +1266,22 @@ class JsonRPCProtocol(asyncio.Protocol):
             result(any): Result returned by handler
             error(any): Error returned by handler
         """
-
+        if self._request_keys or self._superseded:
+            with self._supersede_lock:
+                if msg_id in self._superseded:
+                    # Already answered, see `_supersede_request`
+                    self._superseded.discard(msg_id)
+                    self._result_types.pop(msg_id, None)
+                    return
+
+                key = self._request_keys.pop(msg_id, None)
+                if key is not None and self._latest_requests.get(key) == msg_id:
+                    del self._latest_requests[key]
+
+        self._respond(msg_id, result, error)
+
+    def _respond(self, msg_id, result=None, error: Union[ResponseError, None] = None):
+        """Send the response to the given request."""
         if error is not None:
             response = ResponseErrorMessage(id=msg_id, error=error)
 
@@ -422,12 +1291,31 @@ class JsonRPCProtocol(asyncio.Protocol):
                 id=msg_id, result=result, jsonrpc=JsonRPCProtocol.VERSION
             )
 
+        batch = self._response_batches.pop(msg_id, None)
+        if batch is not None:
+            responses = batch.add(msg_id, response)
+            if responses:
+                self._send_data(responses)
+
+            return
+
         self._send_data(response)
 
     def connection_lost(self, exc):
         """Method from base class, called when connection is lost, in which case we
         want to shutdown the server's process as well.
+
+        If this protocol is one of many sessions, only the session is closed.
         """
+        # The transport will never drain now, don't leave anyone waiting for it.
+        self._connection_lost = True
+        self._release_writers()
+
+        if self._is_session:
+            logger.info("Connection to the client is lost! Closing the session.")
+            self._server._close_session(self)
+            return
+
         logger.error("Connection to the client is lost! Shutting down the server.")
         sys.exit(1)
 
@@ -437,6 +1325,52 @@ class JsonRPCProtocol(asyncio.Protocol):
     ):
         """Method from base class, called when connection is established"""
         self.transport = transport
+        self._connection_lost = False
+
+        # Clients have no loop of their own, but are always connected from theirs.
+        self._loop = getattr(self._server, "loop", None)
+        if self._loop is None:
+            try:
+                self._loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+
+    def pause_writing(self):
+        """Method from base class, called when the transport's buffer goes over
+        its high water mark."""
+        logger.debug("Transport buffer is full, pausing writes")
+        self._write_allowed.clear()
+
+    def resume_writing(self):
+        """Method from base class, called when the transport's buffer drains
+        below its low water mark."""
+        logger.debug("Transport buffer has drained, resuming writes")
+        self._release_writers()
+
+    def _release_writers(self):
+        """Wake up all threads and coroutines waiting for the transport to drain."""
+        self._write_allowed.set()
+
+        waiters, self._drain_waiters = self._drain_waiters, []
+        for waiter in waiters:
+            try:
+                waiter.get_loop().call_soon_threadsafe(_release_waiter, waiter)
+            except RuntimeError:
+                # The waiter's event loop has been closed.
+                pass
+
+    async def drain(self):
+        """Wait until the transport is ready to accept more data.
+
+        Coroutines sending a large number of messages can ``await`` this to
+        avoid growing the transport's buffer without limit.
+
+        Returns straight away once the connection has been lost.
+        """
+        while not self._write_allowed.is_set() and not self._connection_lost:
+            waiter = asyncio.get_running_loop().create_future()
+            self._drain_waiters.append(waiter)
+            await waiter
 
     def data_received(self, data: bytes):
         try:
@@ -449,38 +1383,114 @@ class JsonRPCProtocol(asyncio.Protocol):
         """Method from base class, called when server receives the data"""
         logger.debug("Received %r", data)
 
-        while len(data):
-            # Append the incoming chunk to the message buffer
-            self._message_buf.append(data)
-
-            # Look for the body of the message
-            message = b"".join(self._message_buf)
-            found = JsonRPCProtocol.MESSAGE_PATTERN.fullmatch(message)
+        buf = self._message_buf
+        # Only scan the new data (plus a few bytes of overlap) for the end of headers.
+        scan_from = max(self._message_pos, len(buf) - len(self.HEADER_SEPARATOR) + 1)
+        buf += data
 
-            body = found.group("body") if found else b""
-            length = int(found.group("length")) if found else 1
-
-            if len(body) < length:
-                # Message is incomplete; bail until more data arrives
-                return
+        try:
+            while True:
+                if self._content_length is None:
+                    header_end = buf.find(self.HEADER_SEPARATOR, scan_from)
+                    if header_end == -1:
+                        # Headers are incomplete; bail until more data arrives
+                        return
+
+                    headers = bytes(buf[self._message_pos : header_end])
+                    self._message_pos = header_end + len(self.HEADER_SEPARATOR)
+                    self._process_headers(headers)
+                    if self._content_length is None:
+                        logger.error("Ignoring message without Content-Length header")
+                        scan_from = self._message_pos
+                        continue
+
+                body_start = self._message_pos
+                body_end = body_start + self._content_length
+                if len(buf) < body_end:
+                    # Message is incomplete; bail until more data arrives
+                    return
+
+                # Message is complete; extract the body and reset the framing state
+                # for the next message, before handing the body off for parsing.
+                body = bytes(buf[body_start:body_end])
+                self._message_pos = scan_from = body_end
+                self._content_length = None
+
+                encoding, self._content_encoding = self._content_encoding, None
+                if encoding is not None:
+                    try:
+                        body = self._decompress(body, encoding)
+                    except Exception as error:
+                        logger.exception("Unable to decompress message", exc_info=True)
+                        self._server._report_server_error(error, JsonRpcInternalError)
+                        continue
+
+                # Parse the body
+                codec, self._content_codec = self._content_codec, None
+                self._procedure_handler(self._decode_message(body, codec))
+        finally:
+            # Drop everything that has already been consumed from the buffer.
+            if self._message_pos:
+                del buf[: self._message_pos]
+                self._message_pos = 0
+
+    def _process_headers(self, headers: bytes):
+        """Update the framing state from the headers of the next message."""
+        self._content_length = None
+        self._content_encoding = None
+        self._content_codec = None
+
+        for line in headers.split(b"\r\n"):
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            if name == b"content-length":
+                self._content_length = int(value.strip())
+            elif name == b"content-encoding":
+                encoding = value.strip().decode(self.CHARSET).lower()
+                self._content_encoding = None if encoding == "identity" else encoding
+            elif name == b"accept-encoding" and self.compression is not None:
+                self._send_encoding = self.compression.negotiate(
+                    value.decode(self.CHARSET)
+                )
+            elif name == b"content-type" and self.preferred_codec is not None:
+                if _media_type(value) == _media_type(self.preferred_codec.content_type):
+                    self._content_codec = self.preferred_codec
+            elif name == b"accept" and self.preferred_codec is not None:
+                accepted = {_media_type(item) for item in value.split(b",")}
+                if _media_type(self.preferred_codec.content_type) in accepted:
+                    self._send_codec = self.preferred_codec
 
-            # Message is complete;
-            # extract the body and any remaining data,
-            # and reset the buffer for the next message
-            body, data = body[:length], body[length:]
-            self._message_buf = []
+    def _decompress(self, body: bytes, encoding: str) -> bytes:
+        """Decompress the body of a message sent with a ``Content-Encoding``."""
+        if self.compression is not None:
+            return self.compression.decompress(body, encoding)
 
-            # Parse the body
-            self._procedure_handler(
-                json.loads(
-                    body.decode(self.CHARSET), object_hook=self._deserialize_message
-                )
-            )
+        return decompress(body, encoding)
 
     def get_message_type(self, method: str) -> Optional[Type]:
         """Return the type definition of the message associated with the given method."""
         return None
 
+    def get_priority(self, method_name: Optional[str], params: Any = None) -> str:
+        """Return the priority class of a call to the handler of the given method.
+
+        Defaults to the ``priority`` the feature was registered with, or
+        ``PRIORITY_NORMAL``. Override this method to pick a priority per call
+        based on its params.
+        """
+        if method_name is None:
+            return PRIORITY_NORMAL
+
+        return self.fm.priorities.get(method_name, PRIORITY_NORMAL)
+
+    def get_debounce_key(self, method_name: str, params: Any = None) -> Hashable:
+        """Return the key calls to a debounced handler are collapsed by, calls with
+        different keys are debounced independently.
+
+        Defaults to the uri of the text document the params refer to (if any).
+        """
+        return getattr(getattr(params, "text_document", None), "uri", None)
+
     def get_result_type(self, method: str) -> Optional[Type]:
         """Return the type definition of the result associated with the given method."""
         return None
@@ -497,15 +1507,23 @@ class JsonRPCProtocol(asyncio.Protocol):
 
         self._send_data(notification)
 
-    def send_request(self, method, params=None, callback=None, msg_id=None):
+    def send_request(
+        self, method, params=None, callback=None, msg_id=None, timeout=None
+    ):
         """Sends a JSON RPC request to the client.
 
         Args:
             method(str): The method name of the message to send
             params(any): The payload of the message
+            timeout(float): Optional, number of seconds to wait for the response.
+                Defaults to :attr:`request_timeouts` for the method, or else
+                :attr:`request_timeout`
 
         Returns:
             Future that will be resolved once a response has been received
+
+        If no response is received in time, the request is cancelled and the future
+        fails with :class:`~pygls.exceptions.RequestTimeoutError`.
         """
 
         if msg_id is None:
@@ -534,12 +1552,22 @@ class JsonRPCProtocol(asyncio.Protocol):
 
         self._request_futures[msg_id] = future
         self._result_types[msg_id] = self.get_result_type(method)
+        self._sent_requests[msg_id] = method
+        self._requests_sent += 1
+        self._requests_peak = max(self._requests_peak, len(self._sent_requests))
+        future.add_done_callback(partial(self._forget_request, msg_id))
+
+        if timeout is None:
+            timeout = self.request_timeouts.get(method, self.request_timeout)
+
+        if timeout is not None:
+            self._start_deadline(msg_id, timeout)
 
         self._send_data(request)
 
         return future
 
-    def send_request_async(self, method, params=None, msg_id=None):
+    def send_request_async(self, method, params=None, msg_id=None, timeout=None):
         """Calls `send_request` and wraps `concurrent.futures.Future` with
         `asyncio.Future` so it can be used with `await` keyword.
 
@@ -547,14 +1575,101 @@ class JsonRPCProtocol(asyncio.Protocol):
             method(str): The method name of the message to send
             params(any): The payload of the message
             msg_id(str|int): Optional, message id
+            timeout(float): Optional, number of seconds to wait for the response
 
         Returns:
             `asyncio.Future` that can be awaited
         """
         return asyncio.wrap_future(
-            self.send_request(method, params=params, msg_id=msg_id)
+            self.send_request(method, params=params, msg_id=msg_id, timeout=timeout)
+        )
+
+    @property
+    def outstanding_requests(self) -> int:
+        """Number of requests sent to the other side still waiting for a
+        response."""
+        return len(self._sent_requests)
+
+    def request_stats(self) -> RequestStats:
+        """Return the gauges and counters of the requests sent to the other
+        side."""
+        by_method: Dict[str, int] = {}
+        for method in list(self._sent_requests.values()):
+            by_method[method] = by_method.get(method, 0) + 1
+
+        return RequestStats(
+            outstanding=sum(by_method.values()),
+            by_method=by_method,
+            peak=self._requests_peak,
+            sent=self._requests_sent,
+            timed_out=self._requests_timed_out,
+        )
+
+    def _start_deadline(self, msg_id, timeout: float):
+        """Give up on the given request if it is not answered within ``timeout``
+        seconds.
+
+        Requests may be sent from other threads, in which case the timer is started
+        on the event loop the connection is served on.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if self._loop is None:
+                logger.warning(
+                    'Not connected, request with id "%s" will not time out', msg_id
+                )
+                return
+
+            self._loop.call_soon_threadsafe(self._set_deadline, msg_id, timeout)
+            return
+
+        self._set_deadline(msg_id, timeout)
+
+    def _set_deadline(self, msg_id, timeout: float):
+        if msg_id not in self._sent_requests:
+            # Already answered
+            return
+
+        loop = asyncio.get_running_loop()
+        self._request_deadlines[msg_id] = loop.call_later(
+            timeout, self._request_timed_out, msg_id, timeout
+        )
+
+    def _request_timed_out(self, msg_id, timeout: float):
+        """Fail the given request and ask the other side to stop working on it."""
+        self._request_deadlines.pop(msg_id, None)
+        method = self._sent_requests.get(msg_id)
+        future = self._request_futures.pop(msg_id, None)
+        if method is None or future is None or future.done():
+            return
+
+        logger.warning(
+            'Request "%s" with id "%s" timed out after %ss', method, msg_id, timeout
         )
+        self._requests_timed_out += 1
+        future.set_exception(RequestTimeoutError(method, msg_id, timeout))
+
+        if not self._shutdown and self.transport is not None:
+            self.notify(CANCEL_REQUEST, CancelParams(id=msg_id))
 
-    def thread(self):
+    def _forget_request(self, msg_id, future: Future):
+        """Drop the book keeping of a request once it has completed, one way or
+        another."""
+        if self._request_futures.get(msg_id) is future:
+            del self._request_futures[msg_id]
+
+        self._result_types.pop(msg_id, None)
+        self._sent_requests.pop(msg_id, None)
+
+        deadline = self._request_deadlines.pop(msg_id, None)
+        if deadline is not None:
+            deadline.cancel()
+
+    def thread(self, pool: str = POOL_DEFAULT, max_concurrency: Optional[int] = None):
         """Decorator that mark function to execute it in a thread."""
-        return self.fm.thread()
+        return self.fm.thread(pool, max_concurrency)
+
+    def process(self):
+        """Decorator that mark function to execute it in a separate process."""
+        return self.fm.process()
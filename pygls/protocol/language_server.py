@@ -19,11 +19,14 @@ import asyncio
 import json
 import logging
 import sys
+import time
 from concurrent.futures import Future
 from functools import lru_cache
 from itertools import zip_longest
 from typing import (
+    Any,
     Callable,
+    Iterator,
     List,
     Optional,
     Type,
@@ -51,12 +54,15 @@ from lsprotocol.types import (
     TEXT_DOCUMENT_DID_CLOSE,
     TEXT_DOCUMENT_DID_OPEN,
     TEXT_DOCUMENT_PUBLISH_DIAGNOSTICS,
+    TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL,
+    TEXT_DOCUMENT_SEMANTIC_TOKENS_RANGE,
     WINDOW_LOG_MESSAGE,
     WINDOW_SHOW_DOCUMENT,
     WINDOW_SHOW_MESSAGE,
     WINDOW_WORK_DONE_PROGRESS_CANCEL,
     WORKSPACE_APPLY_EDIT,
     WORKSPACE_CONFIGURATION,
+    WORKSPACE_DIAGNOSTIC,
     WORKSPACE_DID_CHANGE_WORKSPACE_FOLDERS,
     WORKSPACE_EXECUTE_COMMAND,
     WORKSPACE_SEMANTIC_TOKENS_REFRESH,
@@ -79,6 +85,8 @@ from lsprotocol.types import (
     MessageType,
     PublishDiagnosticsParams,
     RegistrationParams,
+    SemanticTokens,
+    SemanticTokensPartialResult,
     SetTraceParams,
     ShowDocumentParams,
     ShowMessageParams,
@@ -89,7 +97,10 @@ from lsprotocol.types import (
     InitializeResultServerInfoType,
     WorkspaceConfigurationParams,
     WorkDoneProgressCancelParams,
+    WorkspaceDiagnosticReport,
+    WorkspaceDiagnosticReportPartialResult,
 )
+from pygls.process import WorkspaceSnapshot
 from pygls.protocol.json_rpc import JsonRPCProtocol
 from pygls.protocol.lsp_meta import LSPMeta
 from pygls.uris import from_fs_path
@@ -101,6 +112,42 @@ F = TypeVar("F", bound=Callable)
 logger = logging.getLogger(__name__)
 
 
+def _get_hook(converter, type_: Type, structure: bool) -> Callable:
+    """Return the converter's (un)structure hook for the given type, generating it
+    if necessary."""
+    if structure:
+        if hasattr(converter, "get_structure_hook"):
+            return converter.get_structure_hook(type_)
+
+        return converter._structure_func.dispatch(type_)
+
+    if hasattr(converter, "get_unstructure_hook"):
+        return converter.get_unstructure_hook(type_)
+
+    return converter._unstructure_func.dispatch(type_)
+
+
+# Methods whose (partial) results hold the items yielded by generator handlers in a
+# field, rather than being a list of items, see `JsonRPCProtocol._collect_results`
+PARTIAL_RESULT_TYPES = {
+    WORKSPACE_DIAGNOSTIC: (
+        WorkspaceDiagnosticReportPartialResult,
+        WorkspaceDiagnosticReport,
+        "items",
+    ),
+    TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL: (
+        SemanticTokensPartialResult,
+        SemanticTokens,
+        "data",
+    ),
+    TEXT_DOCUMENT_SEMANTIC_TOKENS_RANGE: (
+        SemanticTokensPartialResult,
+        SemanticTokens,
+        "data",
+    ),
+}
+
+
 def lsp_method(method_name: str) -> Callable[[F], F]:
     def decorator(f: F) -> F:
         f.method_name = method_name  # type: ignore[attr-defined]
@@ -163,6 +210,46 @@ class LanguageServerProtocol(JsonRPCProtocol, metaclass=LSPMeta):
     def get_result_type(self, method: str) -> Optional[Type]:
         return METHOD_TO_TYPES.get(method, (None, None))[1]
 
+    def _document_uri(self, message) -> Optional[str]:
+        if not getattr(self._server, "_ordered_documents", False):
+            return None
+
+        return getattr(getattr(message.params, "text_document", None), "uri", None)
+
+    def _dispatch_in_order(self, uri: str, message):
+        # Changes supersede requests as soon as they arrive, rather than once it is
+        # their turn.
+        if message.method == TEXT_DOCUMENT_DID_CHANGE and self._latest_requests:
+            self._supersede_document(uri)
+
+        super()._dispatch_in_order(uri, message)
+
+    def _workspace_snapshot(self, params) -> WorkspaceSnapshot:
+        """Return a snapshot of the document the request is for, if it is open."""
+        uri = getattr(getattr(params, "text_document", None), "uri", None)
+        if uri is None or self._workspace is None:
+            return WorkspaceSnapshot({})
+
+        document = self._workspace.text_documents.get(uri)
+        if document is None:
+            return WorkspaceSnapshot({})
+
+        return WorkspaceSnapshot.of([document])
+
+    def _partial_result(self, method_name: Optional[str], items: List[Any]) -> Any:
+        if method_name not in PARTIAL_RESULT_TYPES:
+            return items
+
+        partial_type, _, field = PARTIAL_RESULT_TYPES[method_name]
+        return partial_type(**{field: items})
+
+    def _final_result(self, method_name: Optional[str], items: List[Any]) -> Any:
+        if method_name not in PARTIAL_RESULT_TYPES:
+            return items
+
+        _, result_type, field = PARTIAL_RESULT_TYPES[method_name]
+        return result_type(**{field: items})
+
     def apply_edit(
         self, edit: WorkspaceEdit, label: Optional[str] = None
     ) -> WorkspaceApplyEditResponse:
@@ -181,10 +268,16 @@ class LanguageServerProtocol(JsonRPCProtocol, metaclass=LSPMeta):
 
     @lsp_method(EXIT)
     def lsp_exit(self, *args) -> None:
-        """Stops the server process."""
+        """Stops the server process.
+
+        If this protocol is one of many sessions, only the connection is closed.
+        """
         if self.transport is not None:
             self.transport.close()
 
+        if self._is_session:
+            return
+
         sys.exit(0 if self._shutdown else 1)
 
     @lsp_method(INITIALIZE)
@@ -231,11 +324,59 @@ class LanguageServerProtocol(JsonRPCProtocol, metaclass=LSPMeta):
 
         self.trace = TraceValues.Off
 
+        if getattr(self._server, "_warm_up_hooks", False):
+            asyncio.ensure_future(self.warm_up_hooks())
+
         return InitializeResult(
             capabilities=self.server_capabilities,
             server_info=self.server_info,
         )
 
+    def _iter_warm_up_types(self) -> Iterator[Type]:
+        """Yield the message and response types of all registered methods."""
+        methods = {**self.fm.builtin_features, **self.fm.features}.keys()
+        seen = set()
+
+        for method in methods:
+            for type_ in (self.get_message_type(method), self.get_result_type(method)):
+                if type_ is None or type_ in seen:
+                    continue
+
+                seen.add(type_)
+                yield type_
+
+    async def warm_up_hooks(self) -> int:
+        """Generate the converter's structure and unstructure hooks for the
+        messages of all registered methods.
+
+        ``cattrs`` generates these hooks lazily, the first time a type is seen, which
+        adds a delay to the first request of each kind. Calling this ahead of time
+        moves that cost off the critical path. One type is handled per iteration of
+        the event loop so that incoming messages are not held up.
+
+        Returns
+        -------
+        int
+           The number of types processed.
+        """
+        start = time.perf_counter()
+        count = 0
+
+        for type_ in self._iter_warm_up_types():
+            try:
+                _get_hook(self._converter, type_, structure=True)
+                _get_hook(self._converter, type_, structure=False)
+            except Exception:
+                logger.debug("Unable to generate hooks for %s", type_, exc_info=True)
+
+            count += 1
+            await asyncio.sleep(0)
+
+        logger.info(
+            "Generated hooks for %d types in %.3fs", count, time.perf_counter() - start
+        )
+        return count
+
     @lsp_method(INITIALIZED)
     def lsp_initialized(self, *args) -> None:
         """Notification received when client and server are connected."""
@@ -244,7 +385,7 @@ class LanguageServerProtocol(JsonRPCProtocol, metaclass=LSPMeta):
     @lsp_method(SHUTDOWN)
     def lsp_shutdown(self, *args) -> None:
         """Request from client which asks server to shutdown."""
-        for future in self._request_futures.values():
+        for future in list(self._request_futures.values()):
             future.cancel()
 
         self._shutdown = True
@@ -257,6 +398,9 @@ class LanguageServerProtocol(JsonRPCProtocol, metaclass=LSPMeta):
         """Updates document's content.
         (Incremental(from server capabilities); not configurable for now)
         """
+        if self._latest_requests:
+            self._supersede_document(params.text_document.uri)
+
         for change in params.content_changes:
             self.workspace.update_text_document(params.text_document, change)
 
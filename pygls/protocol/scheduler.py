@@ -0,0 +1,646 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+"""Scheduling of the work done by handlers, see :class:`WorkerPools`,
+:class:`DocumentActors` and :class:`Debouncer`."""
+import asyncio
+import collections
+import heapq
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures import wait as futures_wait
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+)
+
+import attrs
+
+from pygls.constants import (
+    POOL_DEFAULT,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_NORMAL,
+)
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BACKGROUND)
+"""The priority classes, from highest to lowest."""
+
+
+@attrs.define
+class PriorityStats:
+    """Queue metrics for one priority class of a :class:`PriorityThreadPool`."""
+
+    submitted: int = 0
+    """Number of tasks submitted."""
+
+    started: int = 0
+    """Number of tasks a worker has started on."""
+
+    cancelled: int = 0
+    """Number of tasks cancelled before a worker started on them."""
+
+    total_wait: float = 0.0
+    """Total time (in seconds) started tasks spent in the queue."""
+
+    max_wait: float = 0.0
+    """Longest time (in seconds) a started task spent in the queue."""
+
+    @property
+    def queued(self) -> int:
+        """Number of tasks waiting for a worker."""
+        return self.submitted - self.started - self.cancelled
+
+    @property
+    def mean_wait(self) -> float:
+        """Average time (in seconds) started tasks spent in the queue."""
+        if self.started == 0:
+            return 0.0
+
+        return self.total_wait / self.started
+
+
+@attrs.define
+class PoolStats:
+    """A snapshot of the activity of a :class:`PriorityThreadPool`."""
+
+    size: int
+    """Maximum number of worker threads."""
+
+    workers: int
+    """Number of worker threads started so far."""
+
+    active: int
+    """Number of workers running a task."""
+
+    priorities: Dict[str, PriorityStats]
+    """Queue metrics of each priority class."""
+
+    @property
+    def queued(self) -> int:
+        """Number of tasks waiting for a worker."""
+        return sum(stats.queued for stats in self.priorities.values())
+
+    @property
+    def mean_wait(self) -> float:
+        """Average time (in seconds) started tasks spent in the queue."""
+        started = sum(stats.started for stats in self.priorities.values())
+        if started == 0:
+            return 0.0
+
+        return sum(stats.total_wait for stats in self.priorities.values()) / started
+
+    @property
+    def max_wait(self) -> float:
+        """Longest time (in seconds) a started task spent in the queue."""
+        return max(stats.max_wait for stats in self.priorities.values())
+
+
+class PoolFuture(Future):
+    """The future returned by :meth:`PriorityThreadPool.apply_async`.
+
+    Also provides the methods of :class:`multiprocessing.pool.AsyncResult`, which
+    ``Server.thread_pool`` used to return.
+    """
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Return the result once it is available, or raise the exception of the
+        task. Raises :class:`multiprocessing.TimeoutError` if the task has not
+        finished within ``timeout`` seconds."""
+        try:
+            return self.result(timeout)
+        except FuturesTimeoutError:
+            raise multiprocessing.TimeoutError() from None
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait until the task has finished, or ``timeout`` seconds."""
+        futures_wait([self], timeout)
+
+    def ready(self) -> bool:
+        """Return ``True`` if the task has finished."""
+        return self.done()
+
+    def successful(self) -> bool:
+        """Return ``True`` if the task has finished without raising an exception.
+
+        Raises :class:`ValueError` if it has not finished yet.
+        """
+        if not self.done():
+            raise ValueError(f"{self!r} not ready")
+
+        return not self.cancelled() and self.exception() is None
+
+
+@attrs.define
+class _WorkItem:
+    future: PoolFuture
+    func: Callable
+    args: Tuple
+    kwds: Dict[str, Any]
+    priority: str
+    callback: Optional[Callable[[Any], None]]
+    error_callback: Optional[Callable[[BaseException], None]]
+    enqueued: float
+    key: Optional[str] = None
+    order: Tuple[int, int] = (0, 0)
+
+
+def default_size() -> int:
+    """The default number of worker threads of a pool, as for
+    :class:`~concurrent.futures.ThreadPoolExecutor`."""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+class PriorityThreadPool(Executor):
+    """A pool of threads running the tasks submitted to it in order of priority.
+
+    Tasks are queued in one of the :data:`PRIORITIES` classes and workers always
+    pick the oldest task of the highest class, so that e.g. a completion request
+    marked ``interactive`` does not wait behind a workspace wide ``background``
+    sweep. Running tasks are never interrupted.
+
+    Tasks may be given a ``key`` and a ``limit``, in which case no more than
+    ``limit`` tasks with the same key run at once. Workers skip over tasks that are
+    held back, rather than waiting for them.
+
+    Worker threads are started as they are needed, up to ``processes`` of them.
+
+    Parameters
+    ----------
+    processes
+       The maximum number of worker threads, see :func:`default_size`
+
+    name
+       The name of the pool, used to name its threads
+    """
+
+    def __init__(self, processes: Optional[int] = None, name: str = POOL_DEFAULT):
+        self._size = processes or default_size()
+        self._name = name
+        self._queue: "queue.PriorityQueue[Tuple[int, int, Optional[_WorkItem]]]" = (
+            queue.PriorityQueue()
+        )
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._stats = {priority: PriorityStats() for priority in PRIORITIES}
+        self._closed = False
+
+        self._workers: List[threading.Thread] = []
+        self._idle = 0  # Workers waiting for a task
+        self._active = 0  # Workers running a task
+
+        # Tasks held back by their concurrency limit, see `apply_async`
+        self._limits: Dict[str, int] = {}
+        self._running: Dict[str, int] = collections.defaultdict(int)
+        self._held: Dict[str, List[Tuple[Tuple[int, int], _WorkItem]]] = {}
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def size(self) -> int:
+        """The maximum number of worker threads."""
+        return self._size
+
+    def apply_async(
+        self,
+        func: Callable,
+        args: Tuple = (),
+        kwds: Optional[Dict[str, Any]] = None,
+        callback: Optional[Callable[[Any], None]] = None,
+        error_callback: Optional[Callable[[BaseException], None]] = None,
+        priority: str = PRIORITY_NORMAL,
+        key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> PoolFuture:
+        """Queue ``func(*args, **kwds)`` to be run by a worker.
+
+        Like :meth:`multiprocessing.pool.ThreadPool.apply_async`, ``callback`` is
+        called with the result or ``error_callback`` with the exception raised, in
+        the worker thread. The returned future can be used to cancel the task
+        before a worker has started on it, and also has the methods of the
+        :class:`~multiprocessing.pool.AsyncResult` returned by ``ThreadPool``.
+
+        If a ``limit`` is given, at most that many tasks with the same ``key`` are
+        run at once.
+        """
+        if priority not in self._stats:
+            raise ValueError(f'Unknown priority "{priority}"')
+
+        if self._closed:
+            raise RuntimeError("Cannot submit tasks to a pool that has been shut down")
+
+        item = _WorkItem(
+            future=PoolFuture(),
+            func=func,
+            args=args,
+            kwds=kwds or {},
+            priority=priority,
+            callback=callback,
+            error_callback=error_callback,
+            enqueued=time.perf_counter(),
+            key=key,
+            order=(PRIORITIES.index(priority), next(self._counter)),
+        )
+        with self._lock:
+            self._stats[priority].submitted += 1
+            if key is not None:
+                if limit is None:
+                    self._limits.pop(key, None)
+                else:
+                    self._limits[key] = limit
+
+            # Start another worker unless there are enough idle ones
+            waiting = self._queue.qsize() + 1
+            if waiting > self._idle and len(self._workers) < self._size:
+                worker = threading.Thread(
+                    target=self._work,
+                    name=f"pygls-{self._name}-{len(self._workers)}",
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+
+        self._queue.put((*item.order, item))
+        return item.future
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        """Queue ``fn(*args, **kwargs)`` with normal priority, see
+        :class:`concurrent.futures.Executor`."""
+        return self.apply_async(fn, args, kwargs)
+
+    def stats(self) -> Dict[str, PriorityStats]:
+        """Return a copy of the current metrics of each priority class."""
+        with self._lock:
+            return {
+                priority: attrs.evolve(stats) for priority, stats in self._stats.items()
+            }
+
+    def pool_stats(self) -> PoolStats:
+        """Return a snapshot of the activity of the pool."""
+        with self._lock:
+            return PoolStats(
+                size=self._size,
+                workers=len(self._workers),
+                active=self._active,
+                priorities={
+                    priority: attrs.evolve(stats)
+                    for priority, stats in self._stats.items()
+                },
+            )
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = True) -> None:
+        """Stop the workers once they have finished their current task.
+
+        Unless ``cancel_futures`` is ``False``, tasks still in the queue are
+        cancelled, otherwise they are run first.
+        """
+        self._closed = True
+
+        if cancel_futures:
+            while True:
+                try:
+                    _, _, item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if item is not None:
+                    self._cancel(item)
+
+            with self._lock:
+                held = [item for items in self._held.values() for _, item in items]
+                self._held.clear()
+
+            for item in held:
+                self._cancel(item)
+
+        with self._lock:
+            workers = list(self._workers)
+
+        for _ in workers:
+            self._queue.put((len(PRIORITIES), next(self._counter), None))
+
+        if wait:
+            for worker in workers:
+                if worker is not threading.current_thread():
+                    worker.join()
+
+    def _cancel(self, item: _WorkItem):
+        item.future.cancel()
+        with self._lock:
+            self._stats[item.priority].cancelled += 1
+
+    def _take(self, item: _WorkItem) -> bool:
+        """Return ``True`` if the worker may start on the given item now, or hold it
+        back until a task with the same key has finished."""
+        if item.key is None:
+            return True
+
+        with self._lock:
+            limit = self._limits.get(item.key)
+            if limit is not None and self._running[item.key] >= limit:
+                heapq.heappush(self._held.setdefault(item.key, []), (item.order, item))
+                return False
+
+            self._running[item.key] += 1
+            return True
+
+    def _release(self, item: _WorkItem):
+        """Called once the given item has finished."""
+        if item.key is None:
+            return
+
+        with self._lock:
+            self._running[item.key] -= 1
+
+        self._wake(item.key)
+
+    def _wake(self, key: str):
+        """Queue the oldest task held back by the given key again, if it may run."""
+        with self._lock:
+            held = self._held.get(key)
+            limit = self._limits.get(key)
+            if not held or (limit is not None and self._running[key] >= limit):
+                return
+
+            _, item = heapq.heappop(held)
+            if not held:
+                del self._held[key]
+
+        self._queue.put((*item.order, item))
+
+    def _work(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+
+            _, _, item = self._queue.get()
+            with self._lock:
+                self._idle -= 1
+
+            if item is None:
+                return
+
+            if item.future.cancelled():
+                with self._lock:
+                    self._stats[item.priority].cancelled += 1
+
+                # It may have been holding back another task
+                if item.key is not None:
+                    self._wake(item.key)
+                continue
+
+            if not self._take(item):
+                continue
+
+            try:
+                self._run(item)
+            finally:
+                self._release(item)
+
+    def _run(self, item: _WorkItem):
+        if not item.future.set_running_or_notify_cancel():
+            with self._lock:
+                self._stats[item.priority].cancelled += 1
+            return
+
+        wait = time.perf_counter() - item.enqueued
+        with self._lock:
+            stats = self._stats[item.priority]
+            stats.started += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+            self._active += 1
+
+        try:
+            result = item.func(*item.args, **item.kwds)
+        except BaseException as exc:
+            error: Optional[BaseException] = exc
+        else:
+            error = None
+        finally:
+            # So that the stats are up to date by the time the future is done
+            with self._lock:
+                self._active -= 1
+
+        # As for `ThreadPool`, callbacks are called before the result is ready
+        if error is not None:
+            if item.error_callback is not None:
+                self._run_callback(item.error_callback, error)
+            item.future.set_exception(error)
+        else:
+            if item.callback is not None:
+                self._run_callback(item.callback, result)
+            item.future.set_result(result)
+
+    def _run_callback(self, callback, value):
+        try:
+            callback(value)
+        except Exception:
+            logger.exception("Error in thread pool callback")
+
+
+class WorkerPools:
+    """The named thread pools of a server.
+
+    Handlers marked with ``thread`` run in the ``default`` pool unless they name
+    another one. Pools are created the first time they are used, with the size
+    given here or :func:`default_size` threads.
+
+    Parameters
+    ----------
+    sizes
+       The maximum number of worker threads of each pool, by name
+    """
+
+    def __init__(self, sizes: Optional[Dict[str, Optional[int]]] = None):
+        self._sizes = dict(sizes or {})
+        self._pools: Dict[str, PriorityThreadPool] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> PriorityThreadPool:
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                pool = PriorityThreadPool(self._sizes.get(name), name=name)
+                self._pools[name] = pool
+
+            return pool
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._pools
+
+    def configure(self, name: str, size: Optional[int]) -> None:
+        """Set the maximum number of worker threads of the given pool, which must
+        not have been used yet."""
+        with self._lock:
+            if name in self._pools:
+                raise RuntimeError(f'Pool "{name}" has already been started')
+
+            self._sizes[name] = size
+
+    def stats(self) -> Dict[str, PoolStats]:
+        """Return a snapshot of the activity of each pool started so far."""
+        with self._lock:
+            pools = list(self._pools.values())
+
+        return {pool.name: pool.pool_stats() for pool in pools}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down all of the pools, cancelling the tasks still queued."""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+
+class DocumentActors:
+    """Runs the work submitted for each document one piece at a time, in the order
+    it was submitted, while the work for different documents is interleaved.
+
+    Each document with work pending has its own task on the event loop (its
+    *actor*) awaiting the work one after another. The actor stops once it has run
+    out of work.
+    """
+
+    def __init__(self):
+        self._mailboxes: Dict[str, Deque[Callable[[], Awaitable[Any]]]] = {}
+
+    @property
+    def active(self) -> int:
+        """Number of documents with work pending."""
+        return len(self._mailboxes)
+
+    @property
+    def queued(self) -> int:
+        """Number of pieces of work pending, including those being run."""
+        return sum(len(mailbox) for mailbox in self._mailboxes.values())
+
+    def submit(self, key: str, work: Callable[[], Awaitable[Any]]) -> None:
+        """Await ``work()`` once all of the work submitted for ``key`` before it has
+        finished."""
+        mailbox = self._mailboxes.get(key)
+        if mailbox is not None:
+            mailbox.append(work)
+            return
+
+        self._mailboxes[key] = collections.deque([work])
+        asyncio.ensure_future(self._run(key))
+
+    async def _run(self, key: str):
+        mailbox = self._mailboxes[key]
+        try:
+            while mailbox:
+                try:
+                    await mailbox[0]()
+                except Exception:
+                    logger.exception('Error handling message for "%s"', key)
+                finally:
+                    mailbox.popleft()
+        finally:
+            del self._mailboxes[key]
+
+
+@attrs.define
+class DebounceStats:
+    """Counters describing the calls to a debounced handler, see :class:`Debouncer`."""
+
+    calls: int = 0
+    """Number of times the handler has been triggered."""
+
+    runs: int = 0
+    """Number of times the handler has actually been called."""
+
+    superseded: int = 0
+    """Number of pending calls replaced by a later one before they ran."""
+
+    @property
+    def saved(self) -> int:
+        """Number of calls to the handler saved by debouncing."""
+        return self.superseded
+
+
+class Debouncer:
+    """Delays calls to handlers, collapsing a burst of calls with the same key into
+    a single call with the latest arguments.
+
+    A call only runs once ``delay`` seconds have passed without another call with
+    the same key, any call still pending is dropped in favour of the new one. Must
+    be used from within the event loop.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple[str, Hashable], asyncio.TimerHandle] = {}
+        self._stats: Dict[str, DebounceStats] = {}
+
+    @property
+    def pending(self) -> int:
+        """Number of calls waiting to run."""
+        return len(self._pending)
+
+    def call(
+        self, name: str, key: Hashable, delay: float, fn: Callable[[], Any]
+    ) -> None:
+        """Call ``fn()`` after ``delay`` seconds, unless another call is made for
+        the same ``name`` and ``key`` in the meantime."""
+        stats = self._stats.setdefault(name, DebounceStats())
+        stats.calls += 1
+
+        previous = self._pending.pop((name, key), None)
+        if previous is not None:
+            previous.cancel()
+            stats.superseded += 1
+
+        loop = asyncio.get_running_loop()
+        self._pending[(name, key)] = loop.call_later(delay, self._run, name, key, fn)
+
+    def cancel(self) -> None:
+        """Drop all of the calls still pending."""
+        for handle in self._pending.values():
+            handle.cancel()
+
+        self._pending.clear()
+
+    def stats(self) -> Dict[str, DebounceStats]:
+        """Return a copy of the counters of each debounced handler, by name."""
+        return {name: attrs.evolve(stats) for name, stats in self._stats.items()}
+
+    def _run(self, name: str, key: Hashable, fn: Callable[[], Any]):
+        del self._pending[(name, key)]
+        self._stats[name].runs += 1
+        try:
+            fn()
+        except Exception:
+            logger.exception('Error in debounced handler "%s"', name)
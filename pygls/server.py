@@ -15,25 +15,37 @@
 # limitations under the License.                                           #
 ############################################################################
 import asyncio
-import json
+import collections
 import logging
+import multiprocessing
+import os
 import re
+import stat
 import sys
-from concurrent.futures import Future, ThreadPoolExecutor
-from threading import Event
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from threading import Condition, Event, Lock, Thread, current_thread
 from typing import (
+    IO,
     Any,
     Callable,
+    ContextManager,
+    Deque,
+    Dict,
     List,
     Optional,
+    Set,
     TextIO,
+    Tuple,
     Type,
     TypeVar,
     Union,
 )
 
+import attrs
 import cattrs
-from pygls import IS_PYODIDE
+from pygls import IS_PYODIDE, IS_WIN
 from pygls.lsp import ConfigCallbackType, ShowDocumentCallbackType
 from pygls.exceptions import (
     FeatureNotificationError,
@@ -56,12 +68,23 @@ from lsprotocol.types import (
     WorkspaceEdit,
     WorkspaceConfigurationParams,
 )
+from pygls.constants import POOL_DEFAULT
+from pygls.loop import LoopFactory, create_event_loop
 from pygls.progress import Progress
-from pygls.protocol import JsonRPCProtocol, LanguageServerProtocol, default_converter
+from pygls.protocol import (
+    CancellationToken,
+    Codec,
+    Compression,
+    JsonRPCProtocol,
+    LanguageServerProtocol,
+    default_converter,
+)
+from pygls.protocol.codec import CHUNK_SIZE
+from pygls.protocol.json_rpc import current_cancellation_token, current_protocol
 from pygls.workspace import Workspace
 
 if not IS_PYODIDE:
-    from multiprocessing.pool import ThreadPool
+    from pygls.protocol.scheduler import PriorityThreadPool, WorkerPools
 
 
 logger = logging.getLogger(__name__)
@@ -116,23 +139,414 @@ async def aio_readline(loop, executor, stop_event, rfile, proxy):
             content_length = 0
 
 
+def _remove_socket_file(path: str):
+    """Remove the Unix socket file at the given path, if it still exists."""
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except OSError:
+        logger.debug("Unable to remove socket file: %s", path, exc_info=True)
+
+
+class PipeReaderProtocol(asyncio.Protocol):
+    """Protocol which forwards data read from a pipe to the given proxy.
+
+    The ``done`` future is resolved once the pipe reaches EOF or is closed.
+    """
+
+    READ_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, proxy: Callable[[bytes], None], done: asyncio.Future):
+        self.proxy = proxy
+        self.done = done
+
+    def data_received(self, data: bytes):
+        self.proxy(data)
+
+    def connection_lost(self, exc: Optional[Exception]):
+        if not self.done.done():
+            self.done.set_result(None)
+
+
+def _is_pollable(rfile, wfile=None) -> bool:
+    """Return ``True`` if the event loop is able to watch the given file, without
+    affecting ``wfile``."""
+    if IS_WIN:
+        return False
+
+    try:
+        info = os.fstat(rfile.fileno())
+    except (AttributeError, OSError, ValueError):
+        return False
+
+    # The event loop makes the file non-blocking, which affects every file sharing
+    # its file description. Character devices (e.g. a tty) and sockets are pollable
+    # too, but are often passed as both stdin and stdout, which must stay blocking.
+    if not stat.S_ISFIFO(info.st_mode):
+        return False
+
+    try:
+        out = os.fstat(wfile.fileno())
+    except (AttributeError, OSError, ValueError):
+        return True
+
+    return (info.st_dev, info.st_ino) != (out.st_dev, out.st_ino)
+
+
+def _read_in_thread(loop, stop_event, rfile, protocol: PipeReaderProtocol):
+    """Reads data from the given file, handing each chunk over to the event loop."""
+    read = getattr(rfile, "read1", rfile.read)
+
+    try:
+        while not stop_event.is_set():
+            data = read(protocol.READ_CHUNK_SIZE)
+            if not data:
+                break
+
+            loop.call_soon_threadsafe(protocol.data_received, data)
+    except (OSError, ValueError):
+        # The file has been closed from under us.
+        pass
+    finally:
+        try:
+            loop.call_soon_threadsafe(protocol.connection_lost, None)
+        except RuntimeError:
+            # The event loop has already been closed.
+            pass
+
+
+async def aio_read_pipe(loop, stop_event, rfile, proxy, wfile=None):
+    """Reads data from stdin without going through a shared thread pool.
+
+    Where possible the event loop watches the pipe directly, otherwise the data
+    is read by a dedicated daemon thread, e.g. when ``rfile`` is a socket or shares
+    its file with ``wfile``. In both cases data is passed to ``proxy`` in
+    arbitrarily sized chunks, so it must be able to reassemble messages itself, as
+    :meth:`~pygls.protocol.JsonRPCProtocol.data_received` does.
+    """
+    done = loop.create_future()
+    protocol = PipeReaderProtocol(proxy, done)
+
+    if _is_pollable(rfile, wfile):
+        transport, _ = await loop.connect_read_pipe(lambda: protocol, rfile)
+        try:
+            await done
+        finally:
+            transport.close()
+
+        return
+
+    logger.debug("Unable to watch %s from the event loop, using a thread", rfile)
+    reader = Thread(
+        name="pygls-stdin",
+        target=_read_in_thread,
+        args=(loop, stop_event, rfile, protocol),
+        daemon=True,
+    )
+    reader.start()
+    await done
+
+
+@attrs.define
+class WriterStats:
+    """Counters describing the activity of a :class:`StdOutTransportAdapter` or
+    :class:`WebSocketTransportAdapter`."""
+
+    bytes_queued: int = 0
+    """Number of bytes currently waiting to be written."""
+
+    messages_queued: int = 0
+    """Number of messages currently waiting to be written."""
+
+    bytes_written: int = 0
+    """Total number of bytes written."""
+
+    messages_written: int = 0
+    """Total number of messages written."""
+
+    flushes: int = 0
+    """Total number of (coalesced) writes."""
+
+    flush_latency_total: float = 0.0
+    """Sum of the time (in seconds) each flushed batch spent queued and being written."""
+
+    flush_latency_max: float = 0.0
+    """The longest time (in seconds) a flushed batch spent queued and being written."""
+
+
+class _SpooledMessage:
+    """A message queued by :meth:`StdOutTransportAdapter.write_file`."""
+
+    def __init__(self, header: bytes, file: IO[bytes]):
+        self.header = header
+        self.file = file
+        self.size = len(header) + file.tell()
+
+
+def _set_blocking(file) -> None:
+    """Put the file descriptor behind the given file into blocking mode."""
+    try:
+        os.set_blocking(file.fileno(), True)
+    except (AttributeError, OSError, TypeError, ValueError):
+        # Not backed by a file descriptor, or not supported on this platform
+        pass
+
+
 class StdOutTransportAdapter:
     """Protocol adapter which overrides write method.
 
-    Write method sends data to stdout.
+    Write method queues data to be sent to stdout by a dedicated writer thread, so
+    that a slow client cannot block the event loop. All messages queued within a
+    single iteration of the event loop are written before stdout is flushed once.
+
+    Once more than ``high_water_mark`` bytes are queued, the protocol's
+    ``pause_writing`` method is called, followed by ``resume_writing`` once the
+    queue has drained below ``low_water_mark`` bytes.
     """
 
-    def __init__(self, rfile, wfile):
+    HIGH_WATER_MARK = 1024 * 1024
+    LOW_WATER_MARK = 256 * 1024
+
+    def __init__(
+        self,
+        rfile,
+        wfile,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        protocol: Optional[asyncio.BaseProtocol] = None,
+        high_water_mark: Optional[int] = None,
+        low_water_mark: Optional[int] = None,
+    ):
         self.rfile = rfile
         self.wfile = wfile
+        self.stats = WriterStats()
+
+        self._loop = loop
+        self._protocol = protocol
+        self._high_water_mark = high_water_mark or self.HIGH_WATER_MARK
+        self._low_water_mark = min(
+            low_water_mark or self.LOW_WATER_MARK, self._high_water_mark
+        )
+
+        self._cond = Condition()
+        self._pending: List[Union[bytes, _SpooledMessage]] = []
+        self._pending_since: Optional[float] = None
+        self._flush_scheduled = False
+        self._queue: List[Union[bytes, _SpooledMessage]] = []
+        self._queued_since: Optional[float] = None
+        self._paused = False
+        self._closed = False
+        self._writer: Optional[Thread] = None
 
     def close(self):
+        with self._cond:
+            self._closed = True
+            self._move_pending()
+            self._cond.notify()
+
+        if self._writer is None and self._queue:
+            self._flush_pending()
+
+        writer = self._writer
+        if writer is not None and writer is not current_thread():
+            # Give the writer the chance to send any remaining messages.
+            writer.join(timeout=1)
+            if writer.is_alive():
+                logger.warning("Unable to flush all pending data to stdout")
+
+        self._set_paused(False)
         self.rfile.close()
-        self.wfile.close()
+        if writer is None or not writer.is_alive():
+            self.wfile.close()
 
     def write(self, data):
-        self.wfile.write(data)
-        self.wfile.flush()
+        self._enqueue(data, len(data))
+
+    def write_file(self, header: bytes, file: IO[bytes]):
+        """Queue a message whose body is read from the given file, positioned at
+        its end, a chunk at a time as it is written. The file is closed once the
+        message has been written.
+
+        Used for bodies too large to keep in memory, see
+        :attr:`~pygls.protocol.JsonRPCProtocol.spool_size`.
+        """
+        message = _SpooledMessage(header, file)
+        if not self._enqueue(message, message.size):
+            file.close()
+
+    def _enqueue(self, data: Union[bytes, _SpooledMessage], size: int) -> bool:
+        with self._cond:
+            if self._closed:
+                logger.error("Unable to write data, stdout has been closed")
+                return False
+
+            if not self._pending:
+                self._pending_since = time.perf_counter()
+
+            self._pending.append(data)
+            self.stats.bytes_queued += size
+            self.stats.messages_queued += 1
+
+            if self.stats.bytes_queued > self._high_water_mark:
+                self._set_paused(True)
+
+            if self._flush_scheduled:
+                return True
+
+            self._flush_scheduled = True
+
+        self._schedule_flush()
+        return True
+
+    def _schedule_flush(self):
+        """Hand pending data over to the writer thread at the end of the current
+        event loop iteration."""
+        loop = self._loop
+        try:
+            if loop is None:
+                raise RuntimeError("No event loop")
+
+            try:
+                on_loop = asyncio.get_running_loop() is loop
+            except RuntimeError:
+                on_loop = False
+
+            if on_loop:
+                loop.call_soon(self._flush_pending)
+            else:
+                loop.call_soon_threadsafe(self._flush_pending)
+        except RuntimeError:
+            # The event loop is not available, don't wait for it.
+            self._flush_pending()
+
+    def _flush_pending(self):
+        with self._cond:
+            self._move_pending()
+            self._cond.notify()
+
+        if self._writer is None:
+            self._writer = Thread(name="pygls-stdout", target=self._run, daemon=True)
+            self._writer.start()
+
+    def _move_pending(self):
+        """Move pending data onto the writer's queue, must hold ``_cond``."""
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+
+        if not self._queue:
+            self._queued_since = self._pending_since
+
+        self._queue.extend(self._pending)
+        self._pending = []
+        self._pending_since = None
+
+    def _run(self):
+        """Writer thread, writes everything queued so far before flushing."""
+        # A non-blocking stdout (e.g. sharing its file description with stdin, see
+        # `aio_read_pipe`) makes the buffered writer give up on whatever does not
+        # fit into the pipe, leaving the client with a truncated message.
+        _set_blocking(self.wfile)
+
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+
+                if not self._queue:
+                    return
+
+                messages, self._queue = self._queue, []
+                queued_since = self._queued_since or time.perf_counter()
+
+            try:
+                self._write_messages(messages)
+                self.wfile.flush()
+            except Exception:
+                logger.exception("Unable to write to stdout", exc_info=True)
+                with self._cond:
+                    self._closed = True
+                    self._pending = []
+                    self._queue = []
+                    self.stats.bytes_queued = 0
+                    self.stats.messages_queued = 0
+
+                self._set_paused(False)
+                return
+
+            latency = time.perf_counter() - queued_since
+            with self._cond:
+                stats = self.stats
+                stats.flushes += 1
+                stats.flush_latency_total += latency
+                stats.flush_latency_max = max(stats.flush_latency_max, latency)
+
+    def _write_messages(self, messages: List[Union[bytes, _SpooledMessage]]):
+        """Write the given messages, reading spooled bodies a chunk at a time."""
+        batch: List[bytes] = []
+        for message in messages:
+            if not isinstance(message, _SpooledMessage):
+                batch.append(message)
+                continue
+
+            self._write_batch(batch)
+            batch = []
+
+            with message.file:
+                self.wfile.write(message.header)
+                self._written(len(message.header))
+
+                message.file.seek(0)
+                for chunk in iter(partial(message.file.read, CHUNK_SIZE), b""):
+                    self.wfile.write(chunk)
+                    self._written(len(chunk))
+
+            self._written(0, messages=1)
+
+        self._write_batch(batch)
+
+    def _write_batch(self, batch: List[bytes]):
+        if not batch:
+            return
+
+        self.wfile.writelines(batch)
+        self._written(sum(len(data) for data in batch), messages=len(batch))
+
+    def _written(self, size: int, messages: int = 0):
+        """Update the stats once data has been written, resuming the protocol
+        once enough of the queue has drained."""
+        with self._cond:
+            stats = self.stats
+            stats.bytes_queued -= size
+            stats.messages_queued -= messages
+            stats.bytes_written += size
+            stats.messages_written += messages
+
+            if stats.bytes_queued <= self._low_water_mark:
+                self._set_paused(False)
+
+    def _set_paused(self, paused: bool):
+        """Notify the protocol when the writer crosses one of its water marks."""
+        if self._paused == paused:
+            return
+
+        self._paused = paused
+        _notify_protocol(self._loop, self._protocol, paused)
+
+
+def _notify_protocol(loop, protocol, paused: bool):
+    """Call the protocol's ``pause_writing`` or ``resume_writing`` method from the
+    event loop, if there is one."""
+    if protocol is None:
+        return
+
+    callback = protocol.pause_writing if paused else protocol.resume_writing
+    try:
+        if loop is None:
+            raise RuntimeError("No event loop")
+
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        callback()
 
 
 class PyodideTransportAdapter:
@@ -153,22 +567,194 @@ class PyodideTransportAdapter:
 
 
 class WebSocketTransportAdapter:
-    """Protocol adapter which calls write method.
+    """Protocol adapter which overrides write method.
+
+    Write method queues data to be sent over the WebSocket by a single writer
+    task, so messages are sent in the order they were written.
+
+    Once more than ``high_water_mark`` bytes are queued, the protocol's
+    ``pause_writing`` method is called, followed by ``resume_writing`` once the
+    queue has drained below ``low_water_mark`` bytes.
 
-    Write method sends data via the WebSocket interface.
+    If ``combine_messages`` is ``True``, messages that are queued together are
+    sent as a single JSON-RPC batch, up to ``max_frame_size`` bytes per frame.
+    Only enable this for clients that accept batches.
     """
 
-    def __init__(self, ws, loop):
+    HIGH_WATER_MARK = 1024 * 1024
+    LOW_WATER_MARK = 256 * 1024
+    MAX_FRAME_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        ws,
+        loop,
+        protocol: Optional[asyncio.BaseProtocol] = None,
+        high_water_mark: Optional[int] = None,
+        low_water_mark: Optional[int] = None,
+        combine_messages: bool = False,
+        max_frame_size: Optional[int] = None,
+    ):
         self._ws = ws
         self._loop = loop
+        self._protocol = protocol
+        self._high_water_mark = high_water_mark or self.HIGH_WATER_MARK
+        self._low_water_mark = min(
+            low_water_mark or self.LOW_WATER_MARK, self._high_water_mark
+        )
+        self._combine_messages = combine_messages
+        self._max_frame_size = max_frame_size or self.MAX_FRAME_SIZE
+        self.stats = WriterStats()
+
+        self._lock = Lock()
+        self._queue: Deque[Tuple[Any, float]] = collections.deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._paused = False
+        self._closed = False
 
     def close(self) -> None:
-        """Stop the WebSocket server."""
-        self._ws.close()
+        """Close the WebSocket, once any queued messages have been sent."""
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+
+        self._call_soon(self._start_writer)
 
     def write(self, data: Any) -> None:
-        """Create a task to write specified data into a WebSocket."""
-        asyncio.ensure_future(self._ws.send(data))
+        """Queue the given data to be sent over the WebSocket."""
+        with self._lock:
+            if self._closed:
+                logger.error("Unable to write data, the WebSocket has been closed")
+                return
+
+            self._queue.append((data, time.perf_counter()))
+            self.stats.bytes_queued += len(data)
+            self.stats.messages_queued += 1
+
+            if self.stats.bytes_queued > self._high_water_mark:
+                self._set_paused(True)
+
+            if len(self._queue) > 1:
+                # The writer has already been woken up.
+                return
+
+        self._call_soon(self._start_writer)
+
+    def _call_soon(self, callback):
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+
+        try:
+            if on_loop:
+                self._loop.call_soon(callback)
+            else:
+                self._loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            logger.debug("Unable to reach the event loop", exc_info=True)
+
+    def _start_writer(self):
+        """Wake up the writer task, starting it if necessary."""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+
+        self._wakeup.set()
+
+        if self._writer is None:
+            self._writer = self._loop.create_task(self._run())
+
+    def _next_frame(self) -> Tuple[Any, int, int, float]:
+        """Take the next frame to send off the queue, must hold ``_lock``.
+
+        Returns the frame, the number of messages in it, their total size and when
+        the oldest one was queued.
+        """
+        data, queued_at = self._queue.popleft()
+        messages = [data]
+        size = len(data)
+
+        if self._combine_messages:
+            while self._queue:
+                next_size = len(self._queue[0][0])
+                if size + next_size >= self._max_frame_size:
+                    break
+
+                messages.append(self._queue.popleft()[0])
+                size += next_size
+
+        if len(messages) == 1:
+            return data, 1, size, queued_at
+
+        frame: Any
+        if isinstance(data, str):
+            frame = "[" + ",".join(messages) + "]"
+        else:
+            frame = b"[" + b",".join(messages) + b"]"
+
+        return frame, len(messages), size, queued_at
+
+    async def _run(self):
+        """Writer task, sends queued messages one frame at a time."""
+        assert self._wakeup is not None
+
+        while True:
+            with self._lock:
+                if not self._queue:
+                    if self._closed:
+                        break
+
+                    self._wakeup.clear()
+                    frame = None
+                else:
+                    frame, count, size, queued_at = self._next_frame()
+
+            if frame is None:
+                await self._wakeup.wait()
+                continue
+
+            try:
+                await self._ws.send(frame)
+            except Exception:
+                logger.exception("Unable to send data over WebSocket", exc_info=True)
+                with self._lock:
+                    self._closed = True
+                    self._queue.clear()
+                    self.stats.bytes_queued = 0
+                    self.stats.messages_queued = 0
+
+                break
+
+            latency = time.perf_counter() - queued_at
+            with self._lock:
+                stats = self.stats
+                stats.bytes_queued -= size
+                stats.messages_queued -= count
+                stats.bytes_written += len(frame)
+                stats.messages_written += count
+                stats.flushes += 1
+                stats.flush_latency_total += latency
+                stats.flush_latency_max = max(stats.flush_latency_max, latency)
+
+                if stats.bytes_queued <= self._low_water_mark:
+                    self._set_paused(False)
+
+        self._set_paused(False)
+        try:
+            await self._ws.close()
+        except Exception:
+            logger.debug("Unable to close WebSocket", exc_info=True)
+
+    def _set_paused(self, paused: bool):
+        """Notify the protocol when the queue crosses one of its water marks."""
+        if self._paused == paused:
+            return
+
+        self._paused = paused
+        _notify_protocol(self._loop, self._protocol, paused)
 
 
 class Server:
@@ -186,7 +772,42 @@ class Server:
        The asyncio event loop
 
     max_workers
-       Maximum number of workers for `ThreadPool` and `ThreadPoolExecutor`
+       Maximum number of worker threads of the default pool, see
+       :func:`~pygls.protocol.scheduler.default_size`
+
+    codec
+       The :class:`~pygls.protocol.Codec` used to encode and decode messages.
+       Defaults to :class:`~pygls.protocol.JsonCodec`
+
+    preferred_codec
+       If given, a codec (e.g. :class:`~pygls.protocol.MessagePackCodec`) to use
+       instead of ``codec`` with clients that accept it, see
+       :attr:`~pygls.protocol.JsonRPCProtocol.preferred_codec`
+
+    compression
+       If given, compress large messages sent to clients that accept it, see
+       :class:`~pygls.protocol.Compression`
+
+    max_processes
+       Maximum number of worker processes for handlers marked with ``process``,
+       defaults to the number of CPUs
+
+    pools
+       Maximum number of worker threads of other named pools handlers marked with
+       ``thread`` can run in, see :attr:`pools`
+
+    request_timeout
+       If given, the number of seconds to wait for the client to answer a request
+       before giving up on it, see
+       :meth:`~pygls.protocol.JsonRPCProtocol.send_request`
+
+    request_timeouts
+       The number of seconds to wait for the client to answer requests of the
+       given methods, in place of ``request_timeout``
+
+    loop_factory
+       If no ``loop`` is given, the event loop implementation to create one with,
+       e.g. ``"uvloop"``. See :func:`~pygls.loop.create_event_loop`
 
     """
 
@@ -195,23 +816,35 @@ class Server:
         protocol_cls: Type[JsonRPCProtocol],
         converter_factory: Callable[[], cattrs.Converter],
         loop: Optional[asyncio.AbstractEventLoop] = None,
-        max_workers: int = 2,
+        max_workers: Optional[int] = None,
         sync_kind: TextDocumentSyncKind = TextDocumentSyncKind.Incremental,
+        codec: Optional[Codec] = None,
+        preferred_codec: Optional[Codec] = None,
+        compression: Optional[Compression] = None,
+        max_processes: Optional[int] = None,
+        pools: Optional[Dict[str, Optional[int]]] = None,
+        request_timeout: Optional[float] = None,
+        request_timeouts: Optional[Dict[str, Optional[float]]] = None,
+        loop_factory: Optional[LoopFactory] = None,
     ):
         if not issubclass(protocol_cls, asyncio.Protocol):
             raise TypeError("Protocol class should be subclass of asyncio.Protocol")
 
-        self._max_workers = max_workers
+        self._pool_sizes = {POOL_DEFAULT: max_workers, **(pools or {})}
         self._server = None
         self._stop_event: Optional[Event] = None
-        self._thread_pool: Optional[ThreadPool] = None
-        self._thread_pool_executor: Optional[ThreadPoolExecutor] = None
+        self._pools: Optional[WorkerPools] = None
+        self._max_processes = max_processes
+        self._process_pool: Optional[ProcessPoolExecutor] = None
 
         if sync_kind is not None:
             self.text_document_sync_kind = sync_kind
 
+        if loop is not None and loop_factory is not None:
+            raise ValueError("Only one of `loop` and `loop_factory` can be given")
+
         if loop is None:
-            loop = asyncio.new_event_loop()
+            loop = create_event_loop(loop_factory)
             asyncio.set_event_loop(loop)
             self._owns_loop = True
         else:
@@ -221,6 +854,91 @@ class Server:
 
         # TODO: Will move this to `LanguageServer` soon
         self.lsp = protocol_cls(self, converter_factory())  # type: ignore
+        if codec is not None:
+            self.lsp.codec = codec
+
+        self.lsp.preferred_codec = preferred_codec
+        self.lsp.compression = compression
+        self.lsp.request_timeout = request_timeout
+        self.lsp.request_timeouts = dict(request_timeouts or {})
+
+        self._sessions: Set[JsonRPCProtocol] = set()
+
+    @property
+    def lsp(self):
+        """The protocol instance handling the current message.
+
+        When serving many clients, this is the session of the client whose message
+        is being handled, otherwise it is the server's main protocol instance.
+        """
+        protocol = current_protocol.get()
+        if protocol is not None and protocol._server is self:
+            return protocol
+
+        return self._lsp
+
+    @lsp.setter
+    def lsp(self, protocol):
+        self._lsp = protocol
+
+    @property
+    def cancellation_token(self) -> Optional[CancellationToken]:
+        """The cancellation token of the request being handled by the current
+        thread, if it is handled by a function marked with ``thread``.
+
+        Example
+        -------
+        ::
+
+           @ls.feature('workspace/symbol')
+           @ls.thread()
+           def symbols(ls, params):
+               for path in paths:
+                   ls.cancellation_token.raise_if_cancelled()
+                   ...
+        """
+        return current_cancellation_token.get()
+
+    @property
+    def sessions(self) -> List[JsonRPCProtocol]:
+        """The protocol instances of all connected clients, when serving many
+        clients."""
+        return list(self._sessions)
+
+    def _create_session(self) -> JsonRPCProtocol:
+        """Create a new protocol instance for a client connection.
+
+        The session shares the features, converter, codecs, compression and request
+        timeout settings of the server's main protocol instance, but has its own
+        workspace and request bookkeeping.
+        """
+        protocol = type(self._lsp)(self, self._lsp._converter)
+        protocol.codec = self._lsp.codec
+        protocol.preferred_codec = self._lsp.preferred_codec
+        protocol.compression = self._lsp.compression
+        protocol.request_timeout = self._lsp.request_timeout
+        protocol.request_timeouts = self._lsp.request_timeouts
+        protocol.fm.share_features(self._lsp.fm)
+        protocol._is_session = True
+
+        self._sessions.add(protocol)
+        logger.info("Opened session, %d session(s) active", len(self._sessions))
+        return protocol
+
+    def _close_session(self, protocol: JsonRPCProtocol):
+        """Discard the given session, cancelling any of its in-flight requests."""
+        if protocol not in self._sessions:
+            return
+
+        self._sessions.discard(protocol)
+        for future in list(protocol._request_futures.values()):
+            future.cancel()
+
+        for token in list(protocol._cancellation_tokens.values()):
+            token.cancel()
+
+        protocol.debouncer.cancel()
+        logger.info("Closed session, %d session(s) active", len(self._sessions))
 
     def shutdown(self):
         """Shutdown server."""
@@ -229,12 +947,17 @@ class Server:
         if self._stop_event is not None:
             self._stop_event.set()
 
-        if self._thread_pool:
-            self._thread_pool.terminate()
-            self._thread_pool.join()
+        for session in list(self._sessions):
+            if session.transport is not None:
+                session.transport.close()
 
-        if self._thread_pool_executor:
-            self._thread_pool_executor.shutdown()
+            self._close_session(session)
+
+        if self._pools:
+            self._pools.shutdown()
+
+        if self._process_pool:
+            self._process_pool.shutdown(wait=False)
 
         if self._server:
             self._server.close()
@@ -244,31 +967,43 @@ class Server:
             logger.info("Closing the event loop.")
             self.loop.close()
 
+    def _stop_reader(self, reader: asyncio.Task):
+        """Cancel the given reader task, giving it the chance to clean up."""
+        if reader.done() or self.loop.is_closed():
+            return
+
+        reader.cancel()
+        try:
+            self.loop.run_until_complete(reader)
+        except (asyncio.CancelledError, Exception):
+            pass
+
     def start_io(self, stdin: Optional[TextIO] = None, stdout: Optional[TextIO] = None):
         """Starts IO server."""
         logger.info("Starting IO server")
 
         self._stop_event = Event()
+        rfile = stdin or sys.stdin.buffer
+        wfile = stdout or sys.stdout.buffer
         transport = StdOutTransportAdapter(
-            stdin or sys.stdin.buffer, stdout or sys.stdout.buffer
+            rfile, wfile, loop=self.loop, protocol=self.lsp
         )
         self.lsp.connection_made(transport)  # type: ignore[arg-type]
 
-        try:
-            self.loop.run_until_complete(
-                aio_readline(
-                    self.loop,
-                    self.thread_pool_executor,
-                    self._stop_event,
-                    stdin or sys.stdin.buffer,
-                    self.lsp.data_received,
-                )
+        reader = self.loop.create_task(
+            aio_read_pipe(
+                self.loop, self._stop_event, rfile, self.lsp.data_received, wfile
             )
+        )
+
+        try:
+            self.loop.run_until_complete(reader)
         except BrokenPipeError:
             logger.error("Connection to the client is lost! Shutting down the server.")
         except (KeyboardInterrupt, SystemExit):
             pass
         finally:
+            self._stop_reader(reader)
             self.shutdown()
 
     def start_pyodide(self):
@@ -280,13 +1015,20 @@ class Server:
         self.lsp.connection_made(transport)  # type: ignore[arg-type]
         self.lsp._send_only_body = True  # Don't send headers within the payload
 
-    def start_tcp(self, host: str, port: int) -> None:
-        """Starts TCP server."""
+    def start_tcp(self, host: str, port: int, multi_client: bool = False) -> None:
+        """Starts TCP server.
+
+        If ``multi_client`` is ``True``, each connection is served by its own
+        session with its own workspace, see :attr:`sessions`. Otherwise all
+        connections share the same protocol instance.
+        """
         logger.info("Starting TCP server on %s:%s", host, port)
 
+        protocol_factory = self._create_session if multi_client else self.lsp
+
         self._stop_event = Event()
         self._server = self.loop.run_until_complete(  # type: ignore[assignment]
-            self.loop.create_server(self.lsp, host, port)
+            self.loop.create_server(protocol_factory, host, port)
         )
         try:
             self.loop.run_forever()
@@ -295,9 +1037,50 @@ class Server:
         finally:
             self.shutdown()
 
-    def start_ws(self, host: str, port: int) -> None:
-        """Starts WebSocket server."""
+    def start_unix(self, path: str, multi_client: bool = False) -> None:
+        """Starts a server listening on a Unix domain socket at the given path.
+
+        Messages use the same framing as :meth:`start_io` and :meth:`start_tcp`.
+        The socket file is removed when the server is shut down. Not available on
+        Windows.
+
+        If ``multi_client`` is ``True``, each connection is served by its own
+        session with its own workspace, see :attr:`sessions`. Otherwise all
+        connections share the same protocol instance.
+        """
+        logger.info("Starting Unix socket server on %s", path)
+
+        protocol_factory = self._create_session if multi_client else self.lsp
+
+        self._stop_event = Event()
+        self._server = self.loop.run_until_complete(  # type: ignore[assignment]
+            self.loop.create_unix_server(protocol_factory, path)
+        )
+        try:
+            self.loop.run_forever()
+        except (KeyboardInterrupt, SystemExit):
+            pass
+        finally:
+            try:
+                self.shutdown()
+            finally:
+                _remove_socket_file(path)
+
+    def start_ws(self, host: str, port: int, multi_client: bool = False) -> None:
+        """Starts WebSocket server.
+
+        If ``multi_client`` is ``True``, each connection is served by its own
+        session with its own workspace, see :attr:`sessions`. Otherwise all
+        connections share the same protocol instance.
+
+        If the server was given a :class:`~pygls.protocol.Compression` instance,
+        its ``level`` is used for the WebSocket's permessage-deflate extension,
+        which is negotiated by the WebSocket handshake.
+        """
         try:
+            from websockets.extensions.permessage_deflate import (
+                ServerPerMessageDeflateFactory,
+            )
             from websockets.server import serve
         except ImportError:
             logger.error("Run `pip install pygls[ws]` to install `websockets`.")
@@ -310,15 +1093,35 @@ class Server:
 
         async def connection_made(websocket, _):
             """Handle new connection wrapped in the WebSocket."""
-            self.lsp.transport = WebSocketTransportAdapter(websocket, self.loop)
-            async for message in websocket:
-                self.lsp._procedure_handler(
-                    json.loads(message, object_hook=self.lsp._deserialize_message)
+            if multi_client:
+                protocol = self._create_session()
+                protocol._send_only_body = True
+            else:
+                protocol = self.lsp
+
+            transport = WebSocketTransportAdapter(websocket, self.loop, protocol)
+            protocol.transport = transport
+            try:
+                async for message in websocket:
+                    protocol._procedure_handler(protocol._decode_message(message))
+            finally:
+                transport.close()
+                if multi_client:
+                    self._close_session(protocol)
+
+        extensions = None
+        compression = self.lsp.compression
+        if compression is not None:
+            extensions = [
+                ServerPerMessageDeflateFactory(
+                    compress_settings={"level": compression.level}
                 )
+            ]
 
-        start_server = serve(connection_made, host, port, loop=self.loop)
-        self._server = start_server.ws_server  # type: ignore[assignment]
-        self.loop.run_until_complete(start_server)
+        start_server = serve(
+            connection_made, host, port, loop=self.loop, extensions=extensions
+        )
+        self._server = self.loop.run_until_complete(start_server)
 
         try:
             self.loop.run_forever()
@@ -331,22 +1134,39 @@ class Server:
     if not IS_PYODIDE:
 
         @property
-        def thread_pool(self) -> ThreadPool:
-            """Returns thread pool instance (lazy initialization)."""
-            if not self._thread_pool:
-                self._thread_pool = ThreadPool(processes=self._max_workers)
+        def pools(self) -> WorkerPools:
+            """Returns the named thread pools handlers marked with ``thread`` run
+            in (lazy initialization)."""
+            if not self._pools:
+                self._pools = WorkerPools(self._pool_sizes)
 
-            return self._thread_pool
+            return self._pools
 
         @property
-        def thread_pool_executor(self) -> ThreadPoolExecutor:
-            """Returns thread pool instance (lazy initialization)."""
-            if not self._thread_pool_executor:
-                self._thread_pool_executor = ThreadPoolExecutor(
-                    max_workers=self._max_workers
+        def thread_pool(self) -> PriorityThreadPool:
+            """Returns the default thread pool, used to run handlers marked with
+            ``thread`` (lazy initialization)."""
+            return self.pools[POOL_DEFAULT]
+
+        @property
+        def thread_pool_executor(self) -> PriorityThreadPool:
+            """Returns the default thread pool, as a
+            :class:`~concurrent.futures.Executor` (lazy initialization)."""
+            return self.pools[POOL_DEFAULT]
+
+        @property
+        def process_pool(self) -> ProcessPoolExecutor:
+            """Returns the process pool used to run handlers marked with
+            ``process`` (lazy initialization)."""
+            if not self._process_pool:
+                # Forking a process that is running threads can leave locks held
+                # in the child, which then deadlocks.
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self._max_processes,
+                    mp_context=multiprocessing.get_context("spawn"),
                 )
 
-            return self._thread_pool_executor
+            return self._process_pool
 
 
 class LanguageServer(Server):
@@ -372,7 +1192,8 @@ class LanguageServer(Server):
        subclass of it.
 
     max_workers
-       Maximum number of workers for ``ThreadPool`` and ``ThreadPoolExecutor``
+       Maximum number of worker threads of the default pool, see
+       :func:`~pygls.protocol.scheduler.default_size`
 
     text_document_sync_kind
        Text document synchronization method
@@ -388,6 +1209,52 @@ class LanguageServer(Server):
 
     notebook_document_sync
        Advertise :lsp:`NotebookDocument` support to the client.
+
+    codec
+       The :class:`~pygls.protocol.Codec` used to encode and decode messages, e.g.
+       :func:`~pygls.protocol.fast_json_codec`. Defaults to
+       :class:`~pygls.protocol.JsonCodec`
+
+    preferred_codec
+       If given, a codec (e.g. :class:`~pygls.protocol.MessagePackCodec`) to use
+       instead of ``codec`` with clients that accept it, see
+       :attr:`~pygls.protocol.JsonRPCProtocol.preferred_codec`
+
+    compression
+       If given, compress large messages sent to clients that accept it, see
+       :class:`~pygls.protocol.Compression`
+
+    warm_up_hooks
+       If ``True``, generate the converter hooks for all registered features in
+       the background once the server has been initialized, rather than on first
+       use. See :meth:`~pygls.protocol.LanguageServerProtocol.warm_up_hooks`
+
+    max_processes
+       Maximum number of worker processes for handlers marked with ``process``,
+       defaults to the number of CPUs
+
+    pools
+       Maximum number of worker threads of other named pools handlers marked with
+       ``thread`` can run in, see :attr:`pools`
+
+    ordered_documents
+       If ``True``, messages about the same text document are handled one at a
+       time in order of arrival, while messages about different documents are
+       handled concurrently. See
+       :meth:`~pygls.protocol.JsonRPCProtocol._dispatch_in_order`
+
+    request_timeout
+       If given, the number of seconds to wait for the client to answer a request
+       before giving up on it, see
+       :meth:`~pygls.protocol.JsonRPCProtocol.send_request`
+
+    request_timeouts
+       The number of seconds to wait for the client to answer requests of the
+       given methods, in place of ``request_timeout``
+
+    loop_factory
+       If no ``loop`` is given, the event loop implementation to create one with,
+       e.g. ``"uvloop"``. See :func:`~pygls.loop.create_event_loop`
     """
 
     lsp: LanguageServerProtocol
@@ -409,7 +1276,17 @@ class LanguageServer(Server):
         converter_factory=default_converter,
         text_document_sync_kind: TextDocumentSyncKind = TextDocumentSyncKind.Incremental,
         notebook_document_sync: Optional[NotebookDocumentSyncOptions] = None,
-        max_workers: int = 2,
+        max_workers: Optional[int] = None,
+        codec: Optional[Codec] = None,
+        preferred_codec: Optional[Codec] = None,
+        compression: Optional[Compression] = None,
+        warm_up_hooks: bool = False,
+        max_processes: Optional[int] = None,
+        pools: Optional[Dict[str, Optional[int]]] = None,
+        ordered_documents: bool = False,
+        request_timeout: Optional[float] = None,
+        request_timeouts: Optional[Dict[str, Optional[float]]] = None,
+        loop_factory: Optional[LoopFactory] = None,
     ):
         if not issubclass(protocol_cls, LanguageServerProtocol):
             raise TypeError(
@@ -420,8 +1297,23 @@ class LanguageServer(Server):
         self.version = version
         self._text_document_sync_kind = text_document_sync_kind
         self._notebook_document_sync = notebook_document_sync
+        self._warm_up_hooks = warm_up_hooks
+        self._ordered_documents = ordered_documents
         self.process_id: Optional[Union[int, None]] = None
-        super().__init__(protocol_cls, converter_factory, loop, max_workers)
+        super().__init__(
+            protocol_cls,
+            converter_factory,
+            loop,
+            max_workers,
+            codec=codec,
+            preferred_codec=preferred_codec,
+            compression=compression,
+            max_processes=max_processes,
+            pools=pools,
+            request_timeout=request_timeout,
+            request_timeouts=request_timeouts,
+            loop_factory=loop_factory,
+        )
 
     def apply_edit(
         self, edit: WorkspaceEdit, label: Optional[str] = None
@@ -435,6 +1327,14 @@ class LanguageServer(Server):
         """Sends apply edit request to the client. Should be called with `await`"""
         return self.lsp.apply_edit_async(edit, label)
 
+    def batch(self) -> ContextManager[None]:
+        """Context manager that sends all messages sent within it as a single JSON-RPC
+        batch.
+
+        See :meth:`~pygls.protocol.JsonRPCProtocol.batch`
+        """
+        return self.lsp.batch()
+
     def command(self, command_name: str) -> Callable[[F], F]:
         """Decorator used to register custom commands.
 
@@ -457,9 +1357,25 @@ class LanguageServer(Server):
         self,
         feature_name: str,
         options: Optional[Any] = None,
+        supersede: Optional[str] = None,
+        priority: Optional[str] = None,
+        debounce: Optional[float] = None,
     ) -> Callable[[F], F]:
         """Decorator used to register LSP features.
 
+        Pass ``supersede=SUPERSEDE_CANCEL`` (or ``SUPERSEDE_CONTENT_MODIFIED``) from
+        :mod:`pygls.constants` to stop working on a request once a newer request
+        for the same method and document arrives, or the document changes.
+
+        Pass ``priority=PRIORITY_INTERACTIVE`` (or ``PRIORITY_BACKGROUND``) to have
+        threaded handlers start before (or after) other threaded handlers waiting
+        for a free thread, see :meth:`~pygls.protocol.JsonRPCProtocol.get_priority`.
+
+        Pass ``debounce=0.5`` to call the handler of a notification only once the
+        notifications about a document have stopped for half a second, with the
+        params of the latest one. See
+        :meth:`~pygls.protocol.JsonRPCProtocol.get_debounce_key`.
+
         Example
         -------
         ::
@@ -468,7 +1384,7 @@ class LanguageServer(Server):
            def completions(ls, params: CompletionParams):
                return CompletionList(is_incomplete=False, items=[CompletionItem("Completion 1")])
         """
-        return self.lsp.fm.feature(feature_name, options)
+        return self.lsp.fm.feature(feature_name, options, supersede, priority, debounce)
 
     def get_configuration(
         self,
@@ -592,9 +1508,53 @@ class LanguageServer(Server):
 
         self.show_message(self.default_error_message, msg_type=MessageType.Error)
 
-    def thread(self) -> Callable[[F], F]:
-        """Decorator that mark function to execute it in a thread."""
-        return self.lsp.thread()
+    def thread(
+        self, pool: str = POOL_DEFAULT, max_concurrency: Optional[int] = None
+    ) -> Callable[[F], F]:
+        """Decorator that mark function to execute it in a thread.
+
+        The function runs in the named thread ``pool`` (see :attr:`pools`) and, if
+        given, no more than ``max_concurrency`` calls to it run at once. Calls held
+        back by their limit do not take up a thread while they wait.
+
+        Example
+        -------
+        ::
+
+           ls = LanguageServer('example', 'v1', pools={'indexing': 1})
+
+           @ls.feature('workspace/symbol')
+           @ls.thread(pool='indexing')
+           def workspace_symbol(ls, params: WorkspaceSymbolParams):
+               ...
+        """
+        return self.lsp.thread(pool, max_concurrency)
+
+    def process(self) -> Callable[[F], F]:
+        """Decorator that mark function to execute it in a separate process.
+
+        Useful for CPU bound handlers (e.g. linting or formatting), which would
+        otherwise compete for the GIL. The function must be defined at the top
+        level of a module, so that it can be sent to the worker process, and its
+        params and result must be picklable. Worker processes are started with the
+        ``spawn`` method, so the server must only be started under
+        ``if __name__ == "__main__":``.
+
+        Instead of the language server, the function is passed a
+        :class:`~pygls.process.ServerSnapshot` holding a copy of the document the
+        request is for.
+
+        Example
+        -------
+        ::
+
+           @ls.feature('textDocument/formatting')
+           @ls.process()
+           def formatting(ls, params: DocumentFormattingParams):
+               document = ls.workspace.get_text_document(params.text_document.uri)
+               ...
+        """
+        return self.lsp.process()
 
     def unregister_capability(
         self,
@@ -24,6 +24,8 @@ from lsprotocol import types, converters
 
 from pygls import uris, IS_PYODIDE
 from pygls.feature_manager import FeatureManager
+from pygls.lsp.client import BaseLanguageClient
+from pygls.server import LanguageServer
 from pygls.workspace import Workspace
 
 from .ls_setup import (
@@ -120,3 +122,40 @@ def workspace(tmpdir):
         uris.from_fs_path(str(tmpdir)),
         sync_kind=types.TextDocumentSyncKind.Incremental,
     )
+
+
+@pytest.fixture
+async def make_server():
+    """Returns a function creating language servers which run on the test's event
+    loop."""
+    loop = asyncio.get_running_loop()
+
+    def fn(**kwargs):
+        return LanguageServer("pygls-test", "v1", loop=loop, **kwargs)
+
+    return fn
+
+
+@pytest.fixture
+async def connect_client():
+    """Returns a function connecting a client to the given server in process,
+    optionally initializing it. The clients are stopped at the end of the test."""
+    clients = []
+
+    async def fn(server, client=None, initialize=False):
+        client = client or BaseLanguageClient("pygls-test", "v1")
+        clients.append(client)
+
+        await client.start_in_process(server)
+        if initialize:
+            await client.initialize_async(
+                types.InitializeParams(capabilities=types.ClientCapabilities())
+            )
+
+        return client
+
+    yield fn
+
+    for client in clients:
+        if not client.stopped:
+            await client.stop()
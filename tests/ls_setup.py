@@ -15,7 +15,6 @@
 # limitations under the License.                                           #
 ############################################################################
 import asyncio
-import json
 import os
 import threading
 
@@ -63,8 +62,7 @@ class PyodideTestTransportAdapter:
         ...
 
     def write(self, data):
-        object_hook = self.dest.lsp._deserialize_message
-        self.dest.lsp._procedure_handler(json.loads(data, object_hook=object_hook))
+        self.dest.lsp._procedure_handler(self.dest.lsp._decode_message(data))
 
 
 class PyodideClientServer:
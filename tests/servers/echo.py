@@ -0,0 +1,16 @@
+"""This server echoes the params of ``test/echo`` requests back, on the event loop
+implementation given as its first argument."""
+import sys
+
+from pygls.server import LanguageServer
+
+server = LanguageServer("echo-server", "v1", loop_factory=sys.argv[1])
+
+
+@server.feature("test/echo")
+def echo(ls, params):
+    return {"value": params.value}
+
+
+if __name__ == "__main__":
+    server.start_io()
@@ -17,13 +17,17 @@
 import asyncio
 import pathlib
 import sys
+from threading import Thread
 from typing import Union
 
 import pytest
-from pygls import IS_PYODIDE
+from lsprotocol import types
+from pygls import IS_PYODIDE, IS_WIN
 
 from pygls.client import JsonRPCClient
-from pygls.exceptions import JsonRpcException, PyglsError
+from pygls.exceptions import JsonRpcException, JsonRpcRequestCancelled, PyglsError
+from pygls.lsp.client import BaseLanguageClient
+from pygls.server import LanguageServer
 
 
 SERVERS = pathlib.Path(__file__).parent / "servers"
@@ -100,3 +104,159 @@ async def test_client_large_responses():
     assert len(result.numbers) == 100_000
 
     await client.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+@pytest.mark.skipif(IS_WIN, reason="Unix sockets are not available on Windows.")
+async def test_client_unix_socket(tmp_path):
+    """Ensure that the client can talk to a server over a Unix domain socket."""
+
+    path = str(tmp_path / "pygls.sock")
+    server = LanguageServer("pygls-test", "v1", loop=asyncio.new_event_loop())
+
+    @server.feature("test/echo")
+    def echo(ls, params):
+        return {"value": params.value}
+
+    server_thread = Thread(target=server.start_unix, args=(path,))
+    server_thread.daemon = True
+    server_thread.start()
+
+    while server._server is None:
+        await asyncio.sleep(0.1)
+
+    client = JsonRPCClient()
+    await client.start_unix(path)
+
+    result = await client.protocol.send_request_async("test/echo", {"value": 42})
+    assert result.value == 42
+
+    # The server shuts down when its only client disconnects.
+    await client.stop()
+    server_thread.join(timeout=5)
+
+    assert not pathlib.Path(path).exists()
+
+
+def _in_process_server():
+    server = LanguageServer("pygls-test", "v1", loop=asyncio.get_running_loop())
+    items = types.CompletionList(
+        is_incomplete=False, items=[types.CompletionItem(label="example")]
+    )
+
+    @server.feature(types.TEXT_DOCUMENT_COMPLETION)
+    def completion(ls, params):
+        return items
+
+    @server.feature("test/echo")
+    def echo(ls, params):
+        return {"value": params.value}
+
+    @server.feature("test/error")
+    def error(ls, params):
+        raise ValueError("Something went wrong")
+
+    @server.feature("test/wait")
+    async def wait(ls, params):
+        await asyncio.sleep(10)
+
+    return server, items
+
+
+COMPLETION_PARAMS = types.CompletionParams(
+    text_document=types.TextDocumentIdentifier(uri="file:///example.py"),
+    position=types.Position(line=0, character=0),
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("deep_copy", [False, True])
+async def test_client_in_process(deep_copy):
+    """Ensure that messages are passed between client and server without being
+    serialized, where possible."""
+
+    server, items = _in_process_server()
+    client = BaseLanguageClient("pygls-test", "v1")
+    await client.start_in_process(server, deep_copy=deep_copy)
+
+    result = await client.text_document_completion_async(COMPLETION_PARAMS)
+    assert result == items
+    assert (result is items) != deep_copy
+
+    assert len(server.sessions) == 1
+    await client.stop()
+    assert len(server.sessions) == 0
+
+
+@pytest.mark.asyncio
+async def test_client_in_process_custom_method():
+    """Ensure that messages for unknown methods are seen just as they would be over
+    any other transport."""
+
+    server, _ = _in_process_server()
+    client = JsonRPCClient()
+    await client.start_in_process(server)
+
+    result = await client.protocol.send_request_async("test/echo", {"value": 42})
+    assert result.value == 42
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_client_in_process_errors():
+    server, _ = _in_process_server()
+    client = JsonRPCClient()
+    await client.start_in_process(server)
+
+    with pytest.raises(JsonRpcException, match="Something went wrong"):
+        await client.protocol.send_request_async("test/error", {})
+
+    future = client.protocol.send_request_async("test/wait", {}, msg_id="wait")
+    await asyncio.sleep(0.1)
+    client.protocol.notify(types.CANCEL_REQUEST, types.CancelParams(id="wait"))
+
+    with pytest.raises(JsonRpcRequestCancelled):
+        await future
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+async def test_client_in_process_cancel_thread():
+    """Ensure that threaded handlers can stop early once cancelled, and that
+    handlers which have not started yet are never called."""
+    server = LanguageServer(
+        "pygls-test", "v1", loop=asyncio.get_running_loop(), max_workers=1
+    )
+    called = []
+
+    @server.feature("test/wait")
+    @server.thread()
+    def wait(ls, params):
+        called.append(params.name)
+        while not ls.cancellation_token.wait(0.01):
+            pass
+
+        ls.cancellation_token.raise_if_cancelled()
+
+    client = JsonRPCClient()
+    await client.start_in_process(server)
+
+    first = client.protocol.send_request_async("test/wait", {"name": "a"}, msg_id=1)
+    second = client.protocol.send_request_async("test/wait", {"name": "b"}, msg_id=2)
+    await asyncio.sleep(0.1)
+
+    client.protocol.notify(types.CANCEL_REQUEST, types.CancelParams(id=2))
+    client.protocol.notify(types.CANCEL_REQUEST, types.CancelParams(id=1))
+
+    for future in [first, second]:
+        with pytest.raises(JsonRpcRequestCancelled):
+            await asyncio.wait_for(future, timeout=5)
+
+    assert called == ["a"]
+    assert all(session._cancellation_tokens == {} for session in server.sessions)
+
+    await client.stop()
@@ -0,0 +1,367 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import io
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from lsprotocol.types import (
+    CompletionItem,
+    CompletionItemKind,
+    TextDocumentCompletionResponse,
+)
+
+from pygls.protocol import (
+    Codec,
+    JsonCodec,
+    JsonRPCProtocol,
+    MessagePackCodec,
+    OrjsonCodec,
+    _msgpack,
+    default_converter,
+    fast_json_codec,
+)
+from pygls.protocol.codec import CHUNK_SIZE
+from pygls.server import LanguageServer
+
+try:
+    import orjson  # noqa: F401
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+
+CODECS = [
+    pytest.param(JsonCodec, id="json"),
+    pytest.param(
+        OrjsonCodec,
+        id="orjson",
+        marks=pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed"),
+    ),
+]
+
+
+def test_codec_requires_dumps_and_loads():
+    class DumpsOnly(Codec):
+        def dumps(self, obj, default=None):
+            return b""
+
+    with pytest.raises(TypeError):
+        DumpsOnly()
+
+
+@pytest.mark.parametrize("codec_cls", CODECS)
+def test_codec_round_trip(codec_cls):
+    codec = codec_cls()
+    obj = {"a": [1, 2.5, None, True], "b": {"c": "😋 unicode"}}
+
+    data = codec.dumps(obj)
+    assert isinstance(data, bytes)
+    assert json.loads(data) == obj
+    assert codec.loads(data) == obj
+
+
+@pytest.mark.parametrize("codec_cls", CODECS)
+@pytest.mark.parametrize(
+    "obj, expected",
+    [
+        ({1: "a", "b": {2: None}}, {"1": "a", "b": {"2": None}}),
+        ({"id": 2**64, "label": "😋"}, {"id": 2**64, "label": "😋"}),
+    ],
+)
+def test_codec_dumps_beyond_orjson(codec_cls, obj, expected):
+    """Ensure that objects orjson is unable to encode on its own, e.g. with non-str
+    keys or integers wider than 64 bits, are encoded as the json module would."""
+    codec = codec_cls()
+
+    assert json.loads(codec.dumps(obj)) == expected
+    assert b"".join(codec.iterdumps([obj] * 2000)) == codec.dumps([obj] * 2000)
+
+
+@pytest.mark.parametrize("codec_cls", CODECS)
+def test_codec_object_hook(codec_cls):
+    """Ensure the object hook is applied to every object, innermost first."""
+    codec = codec_cls()
+    seen = []
+
+    def hook(obj):
+        seen.append(sorted(obj.keys()))
+        return len(seen)
+
+    result = codec.loads(b'{"a": {"b": 1}, "c": [{"d": 2}]}', object_hook=hook)
+
+    assert result == 3
+    assert seen == [["b"], ["d"], ["a", "c"]]
+
+
+@pytest.mark.parametrize("codec_cls", CODECS)
+def test_serialize_response_message_with_codec(codec_cls):
+    buffer = io.StringIO()
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.codec = codec_cls()
+    protocol._send_only_body = True
+    protocol.connection_made(buffer)
+
+    protocol._result_types["1"] = TextDocumentCompletionResponse
+    protocol._send_response(
+        "1", result=[CompletionItem(label="one", kind=CompletionItemKind.Class)]
+    )
+
+    assert json.loads(buffer.getvalue()) == {
+        "jsonrpc": "2.0",
+        "id": "1",
+        "result": [{"label": "one", "kind": 7}],
+    }
+
+
+@pytest.mark.parametrize("codec_cls", CODECS)
+def test_data_received_with_codec(codec_cls):
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.codec = codec_cls()
+
+    received = []
+    protocol._procedure_handler = received.append
+
+    body = b'{"jsonrpc": "2.0", "method": "test", "params": {"a": "\xf0\x9f\x98\x8b"}}'
+    protocol.data_received(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+
+    assert len(received) == 1
+    assert received[0].params.a == "😋"
+
+
+@pytest.mark.parametrize("codec_cls", CODECS)
+@pytest.mark.parametrize(
+    "obj",
+    [
+        {"jsonrpc": "2.0", "id": 1, "result": None},
+        {"result": {"data": list(range(5000))}, "t": (1, 2)},
+        [{"label": str(i), "kind": [1, 2, 3]} for i in range(10000)],
+    ],
+)
+def test_codec_iterdumps(codec_cls, obj):
+    """Ensure that encoding an object in chunks gives the same result."""
+    codec = codec_cls()
+    chunks = list(codec.iterdumps(obj))
+
+    assert b"".join(chunks) == codec.dumps(obj)
+    assert all(len(chunk) >= CHUNK_SIZE for chunk in chunks[:-1])
+
+
+@pytest.mark.parametrize("spool_size", [0, 1024 * 1024])
+def test_send_large_message(spool_size):
+    """Ensure that large messages are sent correctly, whether their body is spooled
+    in memory or on disk."""
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.spool_size = spool_size
+    protocol.connection_made(io.BytesIO())
+
+    items = [CompletionItem(label="0", kind=CompletionItemKind.Class)]
+    protocol._result_types["1"] = TextDocumentCompletionResponse
+    protocol._send_response("1", result=items * 10000)
+
+    data = protocol.transport.getvalue()
+    header, _, body = data.partition(b"\r\n\r\n")
+    assert header.startswith(b"Content-Length: %d\r\n" % len(body))
+    assert len(body) > CHUNK_SIZE
+    assert json.loads(body)["result"] == [{"label": "0", "kind": 7}] * 10000
+
+
+class SlowTransport(io.BytesIO):
+    """Gives other threads the chance to write while a message is being written."""
+
+    def write(self, data):
+        time.sleep(0.0001)
+        return super().write(data)
+
+
+def _frames(data: bytes):
+    while data:
+        header, _, data = data.partition(b"\r\n\r\n")
+        length = int(header.split(b"\r\n")[0].split(b": ")[1])
+        body, data = data[:length], data[length:]
+        yield json.loads(body)
+
+
+def test_send_messages_from_threads():
+    """Ensure that messages sent from other threads don't end up in the middle of
+    a large message written in chunks."""
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.connection_made(SlowTransport())
+
+    items = [CompletionItem(label="0", kind=CompletionItemKind.Class)]
+    protocol._result_types["1"] = TextDocumentCompletionResponse
+
+    def notify(n):
+        for i in range(20):
+            protocol.notify("test/notify", {"n": n, "i": i})
+
+    threads = [threading.Thread(target=notify, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+
+    protocol._send_response("1", result=items * 20000)
+    for thread in threads:
+        thread.join()
+
+    frames = list(_frames(protocol.transport.getvalue()))
+    assert len(frames) == 81
+    assert [f for f in frames if "result" in f][0]["result"] == [
+        {"label": "0", "kind": 7}
+    ] * 20000
+
+
+def test_language_server_codec():
+    server = LanguageServer("pygls-test", "v1", codec=fast_json_codec())
+    assert isinstance(server.lsp.codec, (JsonCodec, OrjsonCodec))
+
+    server = LanguageServer("pygls-test", "v1")
+    assert isinstance(server.lsp.codec, JsonCodec)
+
+
+def _pure_msgpack_codec():
+    codec = MessagePackCodec()
+    codec._packb = _msgpack.packb
+    codec._unpackb = _msgpack.unpackb
+    return codec
+
+
+MSGPACK_CODECS = [
+    pytest.param(
+        MessagePackCodec,
+        id="msgpack",
+        marks=pytest.mark.skipif(not MSGPACK_AVAILABLE, reason="msgpack not installed"),
+    ),
+    pytest.param(_pure_msgpack_codec, id="pure-python"),
+]
+
+MSGPACK_VALUES = [
+    None,
+    True,
+    False,
+    0,
+    127,
+    128,
+    -1,
+    -32,
+    -33,
+    2**16,
+    -(2**31),
+    2**64 - 1,
+    1.5,
+    "",
+    "😋 unicode",
+    "x" * 300,
+    "y" * 70000,
+    list(range(-200, 1000, 3)),
+    list(range(70000)),
+    {"a": [1, 2.5, None, True], "b": {"c": "d"}},
+    {str(i): i for i in range(20)},
+]
+
+
+@pytest.mark.parametrize("codec_factory", MSGPACK_CODECS)
+@pytest.mark.parametrize("value", MSGPACK_VALUES)
+def test_msgpack_round_trip(codec_factory, value):
+    codec = codec_factory()
+    assert codec.loads(codec.dumps(value)) == value
+
+
+@pytest.mark.skipif(not MSGPACK_AVAILABLE, reason="msgpack not installed")
+@pytest.mark.parametrize("value", MSGPACK_VALUES)
+def test_msgpack_interop(value):
+    """Ensure the pure Python implementation is compatible with the ``msgpack``
+    package."""
+    assert _msgpack.unpackb(msgpack.packb(value)) == value
+    assert msgpack.unpackb(_msgpack.packb(value), strict_map_key=False) == value
+
+
+@pytest.mark.parametrize("codec_factory", MSGPACK_CODECS)
+def test_msgpack_object_hook(codec_factory):
+    """Ensure the object hook is applied to every map, innermost first."""
+    codec = codec_factory()
+    seen = []
+
+    def hook(obj):
+        seen.append(sorted(obj.keys()))
+        return len(seen)
+
+    data = codec.dumps({"a": {"b": 1}, "c": [{"d": 2}]})
+    assert codec.loads(data, object_hook=hook) == 3
+    assert seen == [["b"], ["d"], ["a", "c"]]
+
+
+def _connect(preferred_codec=None):
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.preferred_codec = preferred_codec
+    protocol.connection_made(io.BytesIO())
+    protocol._procedure_handler = Mock()
+    return protocol
+
+
+def _send(sender, receiver, params):
+    sender.transport = io.BytesIO()
+    sender.notify("test/notification", params)
+
+    data = sender.transport.getvalue()
+    receiver.data_received(data)
+    return data
+
+
+@pytest.mark.parametrize("codec_factory", MSGPACK_CODECS)
+def test_preferred_codec_is_negotiated(codec_factory):
+    """Ensure that the preferred codec is only used once the other side has said it
+    accepts it."""
+    client = _connect(codec_factory())
+    server = _connect(codec_factory())
+    params = {"data": list(range(300))}
+
+    data = _send(client, server, params)
+    assert b"Accept: application/msgpack\r\n" in data
+    assert b"Content-Type: application/vscode-jsonrpc" in data
+    assert server._procedure_handler.call_args.args[0].params.data == params["data"]
+
+    data = _send(server, client, params)
+    assert b"Content-Type: application/msgpack\r\n" in data
+    assert client._procedure_handler.call_args.args[0].params.data == params["data"]
+
+    data = _send(client, server, params)
+    assert b"Content-Type: application/msgpack\r\n" in data
+    assert server._procedure_handler.call_args.args[0].params.data == params["data"]
+
+
+def test_preferred_codec_not_accepted():
+    """Ensure that JSON is still sent to a peer without a preferred codec."""
+    client = _connect()
+    server = _connect(MessagePackCodec())
+
+    _send(server, client, {"a": 1})
+    _send(client, server, {"a": 1})
+    data = _send(server, client, {"a": 1})
+
+    assert b"Content-Type: application/vscode-jsonrpc" in data
+    assert client._procedure_handler.call_args.args[0].params.a == 1
@@ -0,0 +1,116 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import io
+from unittest.mock import Mock
+
+import pytest
+
+from pygls.protocol import Compression, JsonRPCProtocol, default_converter
+from pygls.protocol.compression import compress, decompress
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_compress_round_trip(encoding):
+    data = b"hello, world! " * 100
+
+    compressed = compress(data, encoding)
+    assert len(compressed) < len(data)
+    assert decompress(compressed, encoding) == data
+
+
+def test_unsupported_encoding():
+    with pytest.raises(ValueError):
+        compress(b"data", "br")
+
+    with pytest.raises(ValueError):
+        Compression(encodings=["br"])
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip", "gzip"),
+        ("deflate, gzip", "gzip"),
+        ("DEFLATE", "deflate"),
+        ("gzip;q=0, deflate", "deflate"),
+        ("br", None),
+        ("", None),
+    ],
+)
+def test_negotiate(accept_encoding, expected):
+    assert Compression().negotiate(accept_encoding) == expected
+
+
+def _connect(compression=None):
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.compression = compression
+    protocol.connection_made(io.BytesIO())
+    protocol._procedure_handler = Mock()
+    return protocol
+
+
+def _send(sender, receiver, params):
+    sender.transport = io.BytesIO()
+    sender.notify("test/notification", params)
+
+    data = sender.transport.getvalue()
+    receiver.data_received(data)
+    return data
+
+
+def test_compression_is_negotiated():
+    """Ensure that messages are only compressed once the other side has accepted
+    it, and only if they exceed the threshold."""
+
+    client = _connect(Compression(threshold=100))
+    server = _connect(Compression(threshold=100))
+    large = "x" * 1000
+
+    # The server doesn't know the client accepts compression yet.
+    data = _send(server, client, large)
+    assert b"Accept-Encoding: gzip, deflate\r\n" in data
+    assert b"Content-Encoding" not in data
+
+    _send(client, server, "hello")
+
+    data = _send(server, client, large)
+    assert b"Content-Encoding: gzip\r\n" in data
+    assert len(data) < len(large)
+    assert client._procedure_handler.call_args.args[0].params == large
+
+    data = _send(server, client, "small")
+    assert b"Content-Encoding" not in data
+
+    stats = server.compression.stats
+    assert stats.messages_compressed == 1
+    assert stats.ratio < 0.1
+    assert client.compression.stats.messages_decompressed == 1
+
+
+def test_compression_requires_both_sides():
+    """Ensure that a server doesn't compress messages for clients that have not
+    opted in."""
+
+    client = _connect()
+    server = _connect(Compression(threshold=100))
+
+    data = _send(client, server, "hello")
+    assert b"Accept-Encoding" not in data
+
+    data = _send(server, client, "x" * 1000)
+    assert b"Content-Encoding" not in data
+    assert client._procedure_handler.call_args.args[0].params == "x" * 1000
@@ -0,0 +1,122 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import asyncio
+
+import pytest
+from lsprotocol import types
+
+from pygls.exceptions import ValidationError
+from pygls.lsp.client import BaseLanguageClient
+from pygls.protocol import Debouncer
+from pygls.server import LanguageServer
+
+
+@pytest.mark.asyncio
+async def test_debouncer():
+    debouncer = Debouncer()
+    calls = []
+
+    for n in range(5):
+        debouncer.call("test", "a", 0.05, lambda n=n: calls.append(("a", n)))
+
+    debouncer.call("test", "b", 0.05, lambda: calls.append(("b", 0)))
+    assert debouncer.pending == 2
+
+    await asyncio.sleep(0.1)
+    assert sorted(calls) == [("a", 4), ("b", 0)]
+
+    stats = debouncer.stats()["test"]
+    assert (stats.calls, stats.runs, stats.saved) == (6, 2, 4)
+
+    debouncer.call("test", "a", 0.05, lambda: calls.append(("a", 5)))
+    debouncer.cancel()
+    await asyncio.sleep(0.1)
+    assert len(calls) == 2
+
+
+def test_debounce_validation():
+    server = LanguageServer("pygls-test", "v1")
+
+    with pytest.raises(ValidationError):
+
+        @server.feature(types.TEXT_DOCUMENT_HOVER, debounce=0.5)
+        def hover(ls, params):
+            pass
+
+    with pytest.raises(ValidationError):
+
+        @server.feature(types.TEXT_DOCUMENT_DID_SAVE, debounce=-1)
+        def did_save(ls, params):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_debounce_did_change():
+    """Ensure that a burst of changes to a document results in a single call, which
+    sees the latest version of the document."""
+    server = LanguageServer("pygls-test", "v1", loop=asyncio.get_running_loop())
+    calls = []
+
+    @server.feature(types.TEXT_DOCUMENT_DID_CHANGE, debounce=0.05)
+    def did_change(ls, params: types.DidChangeTextDocumentParams):
+        document = ls.workspace.get_text_document(params.text_document.uri)
+        calls.append((params.text_document.version, document.source))
+
+    client = BaseLanguageClient("pygls-test", "v1")
+    await client.start_in_process(server)
+    await client.initialize_async(
+        types.InitializeParams(capabilities=types.ClientCapabilities())
+    )
+
+    for uri in ["file:///a.py", "file:///b.py"]:
+        client.text_document_did_open(
+            types.DidOpenTextDocumentParams(
+                text_document=types.TextDocumentItem(
+                    uri=uri, language_id="python", version=0, text=""
+                )
+            )
+        )
+
+    for version in range(1, 6):
+        client.text_document_did_change(
+            types.DidChangeTextDocumentParams(
+                text_document=types.VersionedTextDocumentIdentifier(
+                    uri="file:///a.py", version=version
+                ),
+                content_changes=[
+                    types.TextDocumentContentChangeEvent_Type2(text=str(version))
+                ],
+            )
+        )
+
+    client.text_document_did_change(
+        types.DidChangeTextDocumentParams(
+            text_document=types.VersionedTextDocumentIdentifier(
+                uri="file:///b.py", version=1
+            ),
+            content_changes=[types.TextDocumentContentChangeEvent_Type2(text="b")],
+        )
+    )
+
+    await asyncio.sleep(0.2)
+    assert sorted(calls) == [(1, "b"), (5, "5")]
+
+    (session,) = server.sessions
+    stats = session.debouncer.stats()[types.TEXT_DOCUMENT_DID_CHANGE]
+    assert (stats.calls, stats.runs, stats.saved) == (6, 2, 4)
+
+    await client.stop()
@@ -0,0 +1,152 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import asyncio
+import threading
+import time
+
+import pytest
+from lsprotocol import types
+
+from pygls import IS_PYODIDE
+from pygls.exceptions import JsonRpcRequestCancelled
+from pygls.protocol.scheduler import DocumentActors
+
+pytestmark = pytest.mark.skipif(
+    IS_PYODIDE, reason="threads are not available in pyodide."
+)
+
+
+@pytest.mark.asyncio
+async def test_document_actors():
+    actors = DocumentActors()
+    order = []
+
+    async def work(key, n, delay):
+        await asyncio.sleep(delay)
+        order.append((key, n))
+
+    done = asyncio.Event()
+    actors.submit("a", lambda: work("a", 1, 0.05))
+    actors.submit("b", lambda: work("b", 1, 0))
+    actors.submit("a", lambda: work("a", 2, 0))
+    actors.submit("a", done.wait)
+
+    assert actors.active == 2
+    assert actors.queued == 4
+
+    await asyncio.sleep(0.1)
+    assert order == [("b", 1), ("a", 1), ("a", 2)]
+    assert actors.active == 1
+
+    done.set()
+    await asyncio.sleep(0)
+    assert actors.active == 0
+
+
+def _hover_params(uri):
+    return types.HoverParams(
+        text_document=types.TextDocumentIdentifier(uri=uri),
+        position=types.Position(line=0, character=0),
+    )
+
+
+@pytest.fixture
+def server(make_server):
+    server = make_server(max_workers=4, ordered_documents=True)
+    barrier = threading.Barrier(2, timeout=5)
+
+    @server.feature(types.TEXT_DOCUMENT_HOVER)
+    @server.thread()
+    def hover(ls, params):
+        uri = params.text_document.uri
+        if uri.endswith("wait.py"):
+            barrier.wait()
+        else:
+            time.sleep(0.1)
+
+        document = ls.workspace.get_text_document(uri)
+        return types.Hover(contents=f"{document.version}:{document.source}")
+
+    return server
+
+
+@pytest.fixture
+async def client(server, connect_client):
+    client = await connect_client(server, initialize=True)
+
+    for uri in ["file:///a.py", "file:///a_wait.py", "file:///b_wait.py"]:
+        client.text_document_did_open(
+            types.DidOpenTextDocumentParams(
+                text_document=types.TextDocumentItem(
+                    uri=uri, language_id="python", version=1, text="one"
+                )
+            )
+        )
+
+    return client
+
+
+@pytest.mark.asyncio
+async def test_ordered_per_document(client):
+    """Ensure that a change waits for a threaded handler working on the same
+    document."""
+    hover = asyncio.ensure_future(
+        client.text_document_hover_async(_hover_params("file:///a.py"))
+    )
+    await asyncio.sleep(0)
+    client.text_document_did_change(
+        types.DidChangeTextDocumentParams(
+            text_document=types.VersionedTextDocumentIdentifier(
+                uri="file:///a.py", version=2
+            ),
+            content_changes=[types.TextDocumentContentChangeEvent_Type2(text="two")],
+        )
+    )
+
+    assert (await hover).contents == "1:one"
+
+    result = await client.text_document_hover_async(_hover_params("file:///a.py"))
+    assert result.contents == "2:two"
+
+
+@pytest.mark.asyncio
+async def test_parallel_across_documents(client):
+    """Ensure that handlers working on different documents run at the same time,
+    they would otherwise never get past the barrier."""
+    results = await asyncio.gather(
+        client.text_document_hover_async(_hover_params("file:///a_wait.py")),
+        client.text_document_hover_async(_hover_params("file:///b_wait.py")),
+    )
+    assert [result.contents for result in results] == ["1:one", "1:one"]
+
+
+@pytest.mark.asyncio
+async def test_cancel_while_waiting(server, client):
+    first = client.protocol.send_request_async(
+        types.TEXT_DOCUMENT_HOVER, _hover_params("file:///a.py")
+    )
+    second = client.protocol.send_request_async(
+        types.TEXT_DOCUMENT_HOVER, _hover_params("file:///a.py"), msg_id="second"
+    )
+    client.protocol.notify(types.CANCEL_REQUEST, types.CancelParams(id="second"))
+
+    assert (await first).contents == "1:one"
+    with pytest.raises(JsonRpcRequestCancelled):
+        await second
+
+    (session,) = server.sessions
+    assert session.document_actors.active == 0
@@ -780,3 +780,21 @@ def test_register_workspace_diagnostics(feature_manager: FeatureManager):
     ).build()
 
     assert expected == actual
+
+
+def test_share_features(feature_manager):
+    other = FeatureManager(None, feature_manager.converter)
+
+    @feature_manager.feature(lsp.TEXT_DOCUMENT_COMPLETION)
+    def completion():
+        pass
+
+    other.share_features(feature_manager)
+
+    @feature_manager.command("cmd")
+    def cmd():
+        pass
+
+    assert other.features[lsp.TEXT_DOCUMENT_COMPLETION] is completion
+    assert other.commands["cmd"] is cmd
+    assert other.builtin_features == {}
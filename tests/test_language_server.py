@@ -14,14 +14,17 @@
 # See the License for the specific language governing permissions and      #
 # limitations under the License.                                           #
 ############################################################################
+import asyncio
 import pathlib
 from time import sleep
+from unittest.mock import AsyncMock
 
 import pytest
 
 from pygls import IS_PYODIDE
 from lsprotocol.types import (
     INITIALIZE,
+    TEXT_DOCUMENT_COMPLETION,
     TEXT_DOCUMENT_DID_OPEN,
     WORKSPACE_EXECUTE_COMMAND,
 )
@@ -30,6 +33,8 @@ from lsprotocol.types import (
     DidOpenTextDocumentParams,
     ExecuteCommandParams,
     InitializeParams,
+    TextDocumentCompletionRequest,
+    TextDocumentCompletionResponse,
     TextDocumentItem,
 )
 from pygls.protocol import LanguageServerProtocol
@@ -142,3 +147,31 @@ def test_forbid_custom_protocol_not_derived_from_lsp():
 
     with pytest.raises(TypeError):
         LanguageServer("pygls-test", "v1", protocol_cls=CustomProtocol)
+
+
+def test_warm_up_hooks():
+    """Ensure that hooks are generated for the types of registered features."""
+    server = LanguageServer("test", "v1")
+
+    @server.feature(TEXT_DOCUMENT_COMPLETION)
+    def completion(ls, params):
+        return None
+
+    types = list(server.lsp._iter_warm_up_types())
+    assert TextDocumentCompletionRequest in types
+    assert TextDocumentCompletionResponse in types
+
+    count = server.loop.run_until_complete(server.lsp.warm_up_hooks())
+    assert count == len(types)
+
+
+def test_warm_up_hooks_after_initialize():
+    server = LanguageServer("test", "v1", warm_up_hooks=True)
+    server.lsp.warm_up_hooks = AsyncMock(return_value=0)
+
+    async def initialize():
+        _initialize_server(server)
+        await asyncio.sleep(0)
+
+    server.loop.run_until_complete(initialize())
+    server.lsp.warm_up_hooks.assert_awaited_once()
@@ -0,0 +1,249 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import asyncio
+import json
+import pathlib
+import sys
+from threading import Thread
+
+import pytest
+
+import pygls.loop
+from pygls import IS_PYODIDE, IS_WIN
+from pygls.client import JsonRPCClient, aio_readline
+from pygls.loop import create_event_loop
+from pygls.server import LanguageServer
+
+try:
+    import uvloop  # type: ignore
+
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+try:
+    import websockets
+
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+SERVERS = pathlib.Path(__file__).parent / "servers"
+
+LOOP_FACTORIES = [
+    "asyncio",
+    pytest.param(
+        "uvloop",
+        marks=pytest.mark.skipif(not UVLOOP_AVAILABLE, reason="uvloop not installed"),
+    ),
+]
+
+
+def _default_loop_type():
+    loop = asyncio.new_event_loop()
+    loop.close()
+    return type(loop)
+
+
+DEFAULT_LOOP_TYPE = _default_loop_type()
+
+# Large enough to be sent in many chunks, and to fill the transport's buffer
+LARGE = "x" * 4_000_000
+
+
+def test_create_event_loop():
+    loop = create_event_loop()
+    assert type(loop) is DEFAULT_LOOP_TYPE
+    loop.close()
+
+    policy = asyncio.DefaultEventLoopPolicy
+    loop = create_event_loop(policy)
+    assert isinstance(loop, asyncio.AbstractEventLoop)
+    loop.close()
+
+    with pytest.raises(ValueError):
+        create_event_loop("tokio")
+
+    with pytest.raises(TypeError):
+        create_event_loop(lambda: None)  # type: ignore[arg-type,return-value]
+
+
+@pytest.mark.skipif(not UVLOOP_AVAILABLE, reason="uvloop not installed")
+def test_create_uvloop():
+    loop = create_event_loop("uvloop")
+    assert isinstance(loop, uvloop.Loop)
+    loop.close()
+
+
+def test_create_uvloop_fallback(monkeypatch):
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+
+    loop = create_event_loop("uvloop")
+    assert type(loop) is DEFAULT_LOOP_TYPE
+    loop.close()
+
+
+def test_server_loop_factory():
+    loop = asyncio.new_event_loop()
+    with pytest.raises(ValueError):
+        LanguageServer("pygls-test", "v1", loop=loop, loop_factory="asyncio")
+
+    loop.close()
+
+
+def test_run():
+    async def main():
+        return type(asyncio.get_running_loop())
+
+    loop_type = pygls.loop.run(main(), loop_factory=asyncio.new_event_loop)
+    assert loop_type is DEFAULT_LOOP_TYPE
+
+
+def _echo_server(loop_factory):
+    server = LanguageServer("pygls-test", "v1", loop_factory=loop_factory)
+
+    @server.feature("test/echo")
+    def echo(ls, params):
+        return {"value": params.value}
+
+    return server
+
+
+async def _port(server) -> int:
+    """Wait until the server is listening, returns its port."""
+    while True:
+        try:
+            return server._server.sockets[0].getsockname()[1]
+        except (AttributeError, IndexError):
+            await asyncio.sleep(0.05)
+
+
+def _start(server, method, *args):
+    thread = Thread(target=getattr(server, method), args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+async def _round_trips(client: JsonRPCClient):
+    """Send a burst of small requests and a large one, checking every reply."""
+    results = await asyncio.gather(
+        *[
+            client.protocol.send_request_async("test/echo", {"value": n})
+            for n in range(200)
+        ],
+        client.protocol.send_request_async("test/echo", {"value": LARGE}),
+    )
+
+    assert [result.value for result in results[:-1]] == list(range(200))
+    assert results[-1].value == LARGE
+
+
+@pytest.mark.skipif(IS_PYODIDE, reason="Subprocesses are not available on pyodide.")
+@pytest.mark.parametrize("loop_factory", LOOP_FACTORIES)
+def test_io(loop_factory):
+    async def main():
+        client = JsonRPCClient()
+        await client.start_io(sys.executable, str(SERVERS / "echo.py"), loop_factory)
+        await _round_trips(client)
+        await client.stop()
+
+    pygls.loop.run(main(), loop_factory=loop_factory)
+
+
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+@pytest.mark.parametrize("loop_factory", LOOP_FACTORIES)
+def test_tcp(loop_factory):
+    server = _echo_server(loop_factory)
+    thread = _start(server, "start_tcp", "127.0.0.1", 0)
+
+    async def main():
+        port = await _port(server)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        client = JsonRPCClient()
+        client.protocol.connection_made(writer)  # type: ignore[arg-type]
+        reading = asyncio.ensure_future(
+            aio_readline(client._stop_event, reader, client.protocol.data_received)
+        )
+
+        # A message split into single bytes still arrives as one message
+        body = json.dumps(
+            {"jsonrpc": "2.0", "id": 1, "method": "test/echo", "params": {"value": 1}}
+        ).encode()
+        future = client.protocol._request_futures[1] = asyncio.Future()
+        for byte in f"Content-Length: {len(body)}\r\n\r\n".encode() + body:
+            writer.write(bytes([byte]))
+            await writer.drain()
+
+        assert (await future).value == 1
+
+        await _round_trips(client)
+
+        writer.close()
+        await asyncio.wait_for(reading, 5)
+
+    pygls.loop.run(main(), loop_factory=loop_factory)
+    thread.join(timeout=5)
+
+
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+@pytest.mark.skipif(IS_WIN, reason="Unix sockets are not available on Windows.")
+@pytest.mark.parametrize("loop_factory", LOOP_FACTORIES)
+def test_unix(loop_factory, tmp_path):
+    path = str(tmp_path / "pygls.sock")
+    server = _echo_server(loop_factory)
+    thread = _start(server, "start_unix", path)
+
+    async def main():
+        while server._server is None:
+            await asyncio.sleep(0.05)
+
+        client = JsonRPCClient()
+        await client.start_unix(path)
+        await _round_trips(client)
+        await client.stop()
+
+    pygls.loop.run(main(), loop_factory=loop_factory)
+    thread.join(timeout=5)
+
+
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+@pytest.mark.skipif(not WEBSOCKETS_AVAILABLE, reason="websockets not installed")
+@pytest.mark.parametrize("loop_factory", LOOP_FACTORIES)
+def test_ws(loop_factory):
+    server = _echo_server(loop_factory)
+    thread = _start(server, "start_ws", "127.0.0.1", 0)
+
+    async def main():
+        port = await _port(server)
+        uri = f"ws://127.0.0.1:{port}"
+        async with websockets.connect(uri, max_size=None) as websocket:
+            # The server accepts messages of up to 1 MiB by default
+            for n in [1, LARGE[:500_000]]:
+                request = {
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "method": "test/echo",
+                    "params": {"value": n},
+                }
+                await websocket.send(json.dumps(request))
+                response = json.loads(await websocket.recv())
+                assert response["result"] == {"value": n}
+
+    pygls.loop.run(main(), loop_factory=loop_factory)
+    server.loop.call_soon_threadsafe(server.loop.stop)
+    thread.join(timeout=5)
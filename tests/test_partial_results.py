@@ -0,0 +1,175 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import asyncio
+
+import pytest
+from lsprotocol import types
+
+from pygls import IS_PYODIDE
+from pygls.exceptions import JsonRpcRequestCancelled
+from pygls.lsp.client import BaseLanguageClient
+
+
+def _location(line):
+    return types.Location(
+        uri="file:///example.py",
+        range=types.Range(
+            start=types.Position(line=line, character=0),
+            end=types.Position(line=line, character=1),
+        ),
+    )
+
+
+@pytest.fixture
+def server(make_server):
+    server = make_server()
+
+    @server.feature(types.TEXT_DOCUMENT_REFERENCES)
+    async def references(ls, params):
+        for line in range(0, 6, 2):
+            await asyncio.sleep(0)
+            yield [_location(line), _location(line + 1)]
+
+    @server.feature(types.TEXT_DOCUMENT_IMPLEMENTATION)
+    @server.thread()
+    def implementation(ls, params):
+        yield [_location(0)]
+        yield [_location(1)]
+
+    @server.feature(types.TEXT_DOCUMENT_TYPE_DEFINITION)
+    @server.thread()
+    def type_definition(ls, params):
+        line = 0
+        while True:
+            ls.cancellation_token.wait(0.01)
+            yield [_location(line)]
+            line += 1
+
+    @server.feature(types.WORKSPACE_DIAGNOSTIC)
+    def workspace_diagnostic(ls, params):
+        yield [
+            types.WorkspaceFullDocumentDiagnosticReport(
+                uri="file:///example.py", version=None, items=[]
+            )
+        ]
+
+    return server
+
+
+@pytest.fixture
+async def client(server, connect_client):
+    client = BaseLanguageClient("pygls-test", "v1")
+    client.partial_results = []
+
+    @client.feature(types.PROGRESS)
+    def progress(ls, params):
+        ls.partial_results.append(params)
+
+    return await connect_client(server, client)
+
+
+def _references_params(token=None):
+    return types.ReferenceParams(
+        text_document=types.TextDocumentIdentifier(uri="file:///example.py"),
+        position=types.Position(line=0, character=0),
+        context=types.ReferenceContext(include_declaration=True),
+        partial_result_token=token,
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_generator_partial_results(client):
+    """Ensure that the batches yielded by an async generator are sent as partial
+    results, when the client asks for them."""
+    result = await client.text_document_references_async(_references_params("token"))
+    assert result == []
+
+    partial_results = client.partial_results
+    assert [p.token for p in partial_results] == ["token"] * 3
+    assert [len(p.value) for p in partial_results] == [2, 2, 2]
+    assert [loc for p in partial_results for loc in p.value] == [
+        _location(line) for line in range(6)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_generator_without_token(client):
+    """Ensure that all batches are sent in the final result, if the client did not
+    send a partial result token."""
+    result = await client.text_document_references_async(_references_params())
+    assert result == [_location(line) for line in range(6)]
+    assert client.partial_results == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+async def test_thread_generator_partial_results(client):
+    params = types.ImplementationParams(
+        text_document=types.TextDocumentIdentifier(uri="file:///example.py"),
+        position=types.Position(line=0, character=0),
+        partial_result_token=1,
+    )
+    result = await client.text_document_implementation_async(params)
+    assert result == []
+
+    # Partial results must arrive before the final response.
+    assert [len(p.value) for p in client.partial_results] == [1, 1]
+
+    params.partial_result_token = None
+    result = await client.text_document_implementation_async(params)
+    assert result == [_location(0), _location(1)]
+
+
+@pytest.mark.asyncio
+async def test_generator_partial_result_types(client):
+    """Ensure that batches are wrapped in the partial result type of the method,
+    where it is not a list."""
+    params = types.WorkspaceDiagnosticParams(previous_result_ids=[])
+    params.partial_result_token = "token"
+    result = await client.workspace_diagnostic_async(params)
+    assert result == types.WorkspaceDiagnosticReport(items=[])
+    value = client.partial_results[0].value
+    assert isinstance(value, types.WorkspaceDiagnosticReportPartialResult)
+    assert value.items[0].uri == "file:///example.py"
+
+    params.partial_result_token = None
+    result = await client.workspace_diagnostic_async(params)
+    assert [item.uri for item in result.items] == ["file:///example.py"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+async def test_thread_generator_cancelled(client):
+    """Ensure that a threaded generator is stopped once its request is cancelled."""
+    params = types.TypeDefinitionParams(
+        text_document=types.TextDocumentIdentifier(uri="file:///example.py"),
+        position=types.Position(line=0, character=0),
+        partial_result_token="token",
+    )
+    future = client.protocol.send_request_async(
+        types.TEXT_DOCUMENT_TYPE_DEFINITION, params, msg_id="defs"
+    )
+    await asyncio.sleep(0.1)
+    client.protocol.notify(types.CANCEL_REQUEST, types.CancelParams(id="defs"))
+
+    with pytest.raises(JsonRpcRequestCancelled):
+        await asyncio.wait_for(future, timeout=5)
+
+    sent = len(client.partial_results)
+    assert sent > 0
+    await asyncio.sleep(0.1)
+    assert len(client.partial_results) == sent
@@ -0,0 +1,126 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import asyncio
+import os
+
+import pytest
+from lsprotocol import types
+
+from pygls import IS_PYODIDE
+from pygls.exceptions import JsonRpcInternalError, ProcessDecoratorError
+from pygls.process import ServerSnapshot
+from pygls.server import LanguageServer
+
+pytestmark = pytest.mark.skipif(
+    IS_PYODIDE, reason="processes are not available in pyodide."
+)
+
+
+def hover(ls, params):
+    assert isinstance(ls, ServerSnapshot)
+    document = ls.workspace.get_text_document(params.text_document.uri)
+    return types.Hover(
+        contents=f"{os.getpid()}:{document.version}:{len(document.source.split())}"
+    )
+
+
+def pid(params):
+    return os.getpid()
+
+
+def fail(params):
+    raise ValueError("Something went wrong")
+
+
+def record(ls, params):
+    assert isinstance(ls, ServerSnapshot)
+    with open(params.path, "w") as f:
+        f.write(str(os.getpid()))
+
+
+@pytest.fixture
+def server(make_server):
+    server = make_server(max_processes=1)
+    server.feature(types.TEXT_DOCUMENT_HOVER)(server.process()(hover))
+    server.process()(server.feature("test/pid")(pid))
+    server.feature("test/fail")(server.process()(fail))
+    server.feature("test/record")(server.process()(record))
+
+    yield server
+
+    server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_handler(server, connect_client):
+    """Ensure that handlers marked with ``process`` run in another process, with a
+    snapshot of the document."""
+    client = await connect_client(server, initialize=True)
+
+    client.text_document_did_open(
+        types.DidOpenTextDocumentParams(
+            text_document=types.TextDocumentItem(
+                uri="file:///example.py",
+                language_id="python",
+                version=3,
+                text="one two three",
+            )
+        )
+    )
+    result = await client.text_document_hover_async(
+        types.HoverParams(
+            text_document=types.TextDocumentIdentifier(uri="file:///example.py"),
+            position=types.Position(line=0, character=0),
+        )
+    )
+
+    worker_pid, version, words = result.contents.split(":")
+    assert int(worker_pid) != os.getpid()
+    assert (version, words) == ("3", "3")
+
+    # Decorator order does not matter
+    assert await client.protocol.send_request_async("test/pid", {}) == int(worker_pid)
+
+    with pytest.raises(JsonRpcInternalError, match="Something went wrong"):
+        await client.protocol.send_request_async("test/fail", {})
+
+
+@pytest.mark.asyncio
+async def test_process_notification(server, connect_client, tmp_path):
+    """Ensure that notification handlers marked with ``process`` run in another
+    process too."""
+    client = await connect_client(server, initialize=True)
+    path = tmp_path / "pid"
+
+    client.protocol.notify("test/record", {"path": str(path)})
+    for _ in range(500):
+        if path.exists() and path.read_text():
+            break
+
+        await asyncio.sleep(0.02)
+
+    assert int(path.read_text()) != os.getpid()
+
+
+def test_process_decorator_requires_function():
+    server = LanguageServer("pygls-test", "v1")
+
+    with pytest.raises(ProcessDecoratorError):
+
+        @server.process()
+        async def handler(ls, params):
+            pass
@@ -14,8 +14,10 @@
 # See the License for the specific language governing permissions and      #
 # limitations under the License.                                           #
 ############################################################################
+import asyncio
 import io
 import json
+import threading
 from concurrent.futures import Future
 from pathlib import Path
 from typing import Optional
@@ -24,7 +26,11 @@ from unittest.mock import Mock
 import attrs
 import pytest
 
-from pygls.exceptions import JsonRpcException, JsonRpcInvalidParams
+from pygls.exceptions import (
+    JsonRpcException,
+    JsonRpcInvalidParams,
+    JsonRpcInvalidRequest,
+)
 from lsprotocol.types import (
     PROGRESS,
     TEXT_DOCUMENT_COMPLETION,
@@ -42,6 +48,8 @@ from lsprotocol.types import (
     WorkDoneProgressBegin,
 )
 from pygls.protocol import (
+    _dict_to_object,
+    CancellationToken,
     default_converter,
     JsonRPCProtocol,
     JsonRPCRequestMessage,
@@ -658,3 +666,265 @@ def test_ignore_unknown_notification(client_server):
 
     # Remove mock
     server.lsp._execute_notification = fn
+
+
+def test_data_received_fragmented_messages():
+    """Ensure that messages split at arbitrary boundaries are reassembled
+    correctly."""
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol._procedure_handler = Mock()
+
+    data = b"".join(dummy_message("x" * 10_000 + str(i)) for i in range(3))
+    for idx in range(0, len(data), 7):
+        protocol.data_received(data[idx : idx + 7])
+
+    params = [c.args[0].params for c in protocol._procedure_handler.call_args_list]
+    assert params == ["x" * 10_000 + str(i) for i in range(3)]
+    assert len(protocol._message_buf) == 0
+
+
+def test_data_received_waits_for_full_content_length():
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol._procedure_handler = Mock()
+
+    data = dummy_message()
+    protocol.data_received(data[:-1])
+    assert not protocol._procedure_handler.called
+
+    protocol.data_received(data[-1:] + data[:10])
+    assert protocol._procedure_handler.call_count == 1
+    assert protocol._message_buf == data[:10]
+
+
+async def test_drain_waits_for_resume_writing():
+    protocol = JsonRPCProtocol(None, default_converter())
+    await protocol.drain()
+
+    protocol.pause_writing()
+    drain = asyncio.ensure_future(protocol.drain())
+    await asyncio.sleep(0)
+    assert not drain.done()
+
+    protocol.resume_writing()
+    await asyncio.wait_for(drain, timeout=1)
+
+
+async def test_connection_lost_releases_writers():
+    """Ensure that neither threads nor coroutines waiting for the transport to
+    drain are left waiting once the connection is lost."""
+    protocol = JsonRPCProtocol(Mock(), default_converter())
+    protocol._is_session = True
+    transport = Mock(spec=["write", "close"])
+    protocol.connection_made(transport)  # type: ignore[arg-type]
+
+    protocol.pause_writing()
+    drain = asyncio.ensure_future(protocol.drain())
+    sender = threading.Thread(target=protocol.notify, args=("test", {}), daemon=True)
+    sender.start()
+    await asyncio.sleep(0.1)
+    assert sender.is_alive()
+    assert not drain.done()
+
+    protocol.connection_lost(None)
+    sender.join(timeout=1)
+    assert not sender.is_alive()
+    await asyncio.wait_for(drain, timeout=1)
+
+    assert not transport.write.called
+    protocol._server._close_session.assert_called_once_with(protocol)
+
+
+def test_decode_message_structures_envelope_only(protocol):
+    """Ensure that only the top level message is passed to ``_deserialize_message``
+    when decoding a message."""
+
+    body = json.dumps(
+        {
+            "jsonrpc": "2.0",
+            "method": EXAMPLE_NOTIFICATION,
+            "params": {"fieldA": "test_a", "fieldB": {"innerField": "test_inner"}},
+        }
+    )
+
+    deserialize = Mock(wraps=protocol._deserialize_message)
+    protocol._deserialize_message = deserialize
+    result = protocol._decode_message(body.encode("utf-8"))
+
+    deserialize.assert_called_once()
+    assert isinstance(result, ExampleNotification)
+    assert isinstance(result.params.field_b, ExampleParams.InnerType)
+    assert result.params.field_b.inner_field == "test_inner"
+
+
+def test_dict_to_object_reuses_record_types():
+    first = _dict_to_object({"a": 1, "b": {"c": [{"d": 2}, 3]}})
+    second = _dict_to_object({"a": 4, "b": {"c": []}})
+
+    assert first.a == 1
+    assert first.b.c[0].d == 2
+    assert first.b.c[1] == 3
+    assert type(first) is type(second)
+    assert type(first.b) is type(second.b)
+
+
+def test_dict_to_object_type_name():
+    obj = _dict_to_object({"type_name": "Example", "class": 1, "inner": {"x": 2}})
+
+    assert type(obj).__name__ == "Example"
+    assert type(obj.inner).__name__ == "Example"
+    assert obj._0 == 1
+    assert obj.inner.x == 2
+
+
+def test_handle_batch_sends_responses_as_batch():
+    buffer = io.StringIO()
+
+    protocol = ExampleProtocol(None, default_converter())
+    protocol._send_only_body = True
+    protocol.connection_made(buffer)
+    protocol.fm.features[EXAMPLE_REQUEST] = lambda params: params.field_a
+    notifications = []
+    protocol.fm.features[EXAMPLE_NOTIFICATION] = notifications.append
+
+    body = json.dumps(
+        [
+            {
+                "jsonrpc": "2.0",
+                "id": str(i),
+                "method": EXAMPLE_REQUEST,
+                "params": {"fieldA": f"result {i}"},
+            }
+            for i in range(3)
+        ]
+        + [
+            {
+                "jsonrpc": "2.0",
+                "method": EXAMPLE_NOTIFICATION,
+                "params": {"fieldA": "notification"},
+            }
+        ]
+    )
+    protocol._procedure_handler(protocol._decode_message(body))
+
+    assert len(notifications) == 1
+    assert json.loads(buffer.getvalue()) == [
+        {"jsonrpc": "2.0", "id": str(i), "result": f"result {i}"} for i in range(3)
+    ]
+    assert protocol._response_batches == {}
+
+
+@pytest.mark.asyncio
+async def test_batch_per_task():
+    """Ensure that messages sent by other tasks while one is awaiting within a batch
+    are not added to its batch."""
+    buffer = io.StringIO()
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol._send_only_body = True
+    protocol.connection_made(buffer)
+
+    async def batched():
+        with protocol.batch():
+            protocol.notify(EXAMPLE_NOTIFICATION, {"a": 1})
+            await asyncio.sleep(0.05)
+            protocol.notify(EXAMPLE_NOTIFICATION, {"a": 2})
+
+    async def other():
+        await asyncio.sleep(0.01)
+        protocol.notify(EXAMPLE_NOTIFICATION, {"a": 3})
+        assert json.loads(buffer.getvalue())["params"] == {"a": 3}
+
+    await asyncio.gather(batched(), other())
+
+
+def test_handle_batch_with_invalid_members():
+    """Ensure that invalid members of a batch are answered with an error, next to
+    the responses to the valid ones."""
+    buffer = io.StringIO()
+
+    protocol = ExampleProtocol(None, default_converter())
+    protocol._send_only_body = True
+    protocol.connection_made(buffer)
+    protocol.fm.features[EXAMPLE_REQUEST] = lambda params: params.field_a
+
+    body = json.dumps(
+        [
+            {
+                "jsonrpc": "2.0",
+                "id": "1",
+                "method": EXAMPLE_REQUEST,
+                "params": {"fieldA": "result"},
+            },
+            {"jsonrpc": "2.0", "id": "2", "method": EXAMPLE_REQUEST, "params": {}},
+            1,
+            {"foo": "bar"},
+        ]
+    )
+    protocol._procedure_handler(protocol._decode_message(body))
+
+    responses = json.loads(buffer.getvalue())
+    assert responses[-1] == {"jsonrpc": "2.0", "id": "1", "result": "result"}
+    assert [(r["id"], r["error"]["code"]) for r in responses[:-1]] == [
+        ("2", JsonRpcInvalidParams.CODE),
+        (None, JsonRpcInvalidRequest.CODE),
+        (None, JsonRpcInvalidRequest.CODE),
+    ]
+    assert protocol._response_batches == {}
+
+
+def test_handle_batch_of_invalid_members():
+    buffer = io.StringIO()
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol._send_only_body = True
+    protocol.connection_made(buffer)
+
+    protocol._procedure_handler(protocol._decode_message("[1, 2]"))
+
+    assert [r["error"]["code"] for r in json.loads(buffer.getvalue())] == [
+        JsonRpcInvalidRequest.CODE,
+        JsonRpcInvalidRequest.CODE,
+    ]
+
+
+def test_batch_sends_messages_together():
+    buffer = io.StringIO()
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol._send_only_body = True
+    protocol.connection_made(buffer)
+
+    with protocol.batch():
+        protocol.notify(EXAMPLE_NOTIFICATION, {"a": 1})
+
+        with protocol.batch():
+            protocol.notify(EXAMPLE_NOTIFICATION, {"a": 2})
+
+        assert buffer.getvalue() == ""
+
+    assert json.loads(buffer.getvalue()) == [
+        {"jsonrpc": "2.0", "method": EXAMPLE_NOTIFICATION, "params": {"a": 1}},
+        {"jsonrpc": "2.0", "method": EXAMPLE_NOTIFICATION, "params": {"a": 2}},
+    ]
+
+
+def test_response_does_not_cancel_request_with_same_id():
+    """Ensure that a response to a request we sent resolves its future, even when
+    it shares its id with a request we are still handling."""
+    buffer = io.StringIO()
+
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol._send_only_body = True
+    protocol.connection_made(buffer)
+
+    token = CancellationToken()
+    protocol._cancellation_tokens["1"] = token
+    future = protocol.send_request(EXAMPLE_REQUEST, {"a": 1}, msg_id="1")
+
+    protocol._procedure_handler(
+        protocol._decode_message('{"jsonrpc": "2.0", "id": "1", "result": 42}')
+    )
+
+    assert future.result(timeout=0) == 42
+    assert not token.cancelled
@@ -0,0 +1,154 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import asyncio
+
+import pytest
+
+from pygls import IS_PYODIDE
+from pygls.exceptions import RequestTimeoutError
+from pygls.lsp.client import BaseLanguageClient
+from pygls.protocol import JsonRPCProtocol, JsonRPCResponseMessage, default_converter
+
+pytestmark = pytest.mark.skipif(
+    IS_PYODIDE, reason="threads are not available in pyodide."
+)
+
+
+@pytest.fixture
+def server(request, make_server):
+    return make_server(**getattr(request, "param", {}))
+
+
+@pytest.fixture
+async def client(server, connect_client):
+    client = BaseLanguageClient("pygls-test", "v1")
+    client.cancelled = asyncio.Event()
+
+    @client.feature("test/slow")
+    async def slow(ls, params):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            ls.cancelled.set()
+            raise
+
+    @client.feature("test/fast")
+    async def fast(params):
+        return 42
+
+    return await connect_client(server, client)
+
+
+@pytest.fixture
+def session(server, client):
+    (session,) = server.sessions
+    return session
+
+
+def _assert_forgotten(session):
+    assert session.outstanding_requests == 0
+    assert session._request_futures == {}
+    assert session._result_types == {}
+    assert session._request_deadlines == {}
+
+
+@pytest.mark.asyncio
+async def test_request_timeout(client, session):
+    with pytest.raises(RequestTimeoutError) as exc_info:
+        await session.send_request_async("test/slow", {}, timeout=0.05)
+
+    assert exc_info.value.method == "test/slow"
+    _assert_forgotten(session)
+
+    # The client is asked to stop working on the request
+    await asyncio.wait_for(client.cancelled.wait(), 2)
+
+    stats = session.request_stats()
+    assert (stats.sent, stats.timed_out, stats.peak) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "server",
+    [{"request_timeout": 10, "request_timeouts": {"test/slow": 0.05}}],
+    indirect=True,
+)
+async def test_request_timeouts_per_method(session):
+    pending = [session.send_request_async("test/slow", {}) for _ in range(3)]
+    assert session.outstanding_requests == 3
+    assert session.request_stats().by_method == {"test/slow": 3}
+
+    results = await asyncio.gather(*pending, return_exceptions=True)
+    assert all(isinstance(result, RequestTimeoutError) for result in results)
+    _assert_forgotten(session)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server", [{"request_timeout": 10}], indirect=True)
+async def test_answered_request(session):
+    assert await session.send_request_async("test/fast", {}) == 42
+    _assert_forgotten(session)
+
+    stats = session.request_stats()
+    assert (stats.outstanding, stats.sent, stats.timed_out) == (0, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request(session):
+    future = session.send_request("test/slow", {})
+    future.cancel()
+    _assert_forgotten(session)
+
+
+@pytest.mark.asyncio
+async def test_request_timeout_from_thread(server, client, session):
+    @server.feature("test/ask")
+    @server.thread()
+    def ask(ls, params):
+        try:
+            ls.lsp.send_request("test/slow", {}, timeout=0.05).result(timeout=5)
+        except RequestTimeoutError:
+            return "timed out"
+
+    result = await client.protocol.send_request_async("test/ask", {})
+    assert result == "timed out"
+    _assert_forgotten(session)
+
+
+@pytest.mark.asyncio
+async def test_client_request_timeout_from_thread(server, client):
+    @server.feature("test/slow")
+    async def slow(ls, params):
+        await asyncio.sleep(10)
+
+    def ask():
+        future = client.protocol.send_request("test/slow", {}, timeout=0.05)
+        with pytest.raises(RequestTimeoutError):
+            future.result(timeout=5)
+
+    await asyncio.get_running_loop().run_in_executor(None, ask)
+    _assert_forgotten(client.protocol)
+
+
+def test_late_response():
+    protocol = JsonRPCProtocol(None, default_converter())
+    message = protocol._deserialize_message(
+        {"jsonrpc": "2.0", "id": "unknown", "result": 1}
+    )
+
+    assert isinstance(message, JsonRPCResponseMessage)
+    protocol._handle_response(message.id, message.result)
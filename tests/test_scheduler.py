@@ -0,0 +1,336 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import asyncio
+import multiprocessing
+import threading
+import time
+
+import pytest
+from lsprotocol import types
+
+from pygls import IS_PYODIDE
+from pygls.constants import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_NORMAL,
+)
+from pygls.exceptions import ValidationError
+from pygls.lsp.client import BaseLanguageClient
+from pygls.protocol import PriorityThreadPool, WorkerPools
+from pygls.server import LanguageServer
+
+pytestmark = pytest.mark.skipif(
+    IS_PYODIDE, reason="threads are not available in pyodide."
+)
+
+
+@pytest.fixture
+def pool():
+    pool = PriorityThreadPool(processes=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_priority_order(pool):
+    """Ensure that queued tasks are started in order of priority, then arrival."""
+    blocked = threading.Event()
+    pool.apply_async(blocked.wait)
+
+    order = []
+    futures = [
+        pool.apply_async(order.append, (name,), priority=priority)
+        for name, priority in [
+            ("background", PRIORITY_BACKGROUND),
+            ("normal 1", PRIORITY_NORMAL),
+            ("interactive", PRIORITY_INTERACTIVE),
+            ("normal 2", PRIORITY_NORMAL),
+        ]
+    ]
+    blocked.set()
+
+    for future in futures:
+        future.result(timeout=5)
+
+    assert order == ["interactive", "normal 1", "normal 2", "background"]
+
+    stats = pool.stats()
+    assert stats[PRIORITY_NORMAL].started == 3
+    assert stats[PRIORITY_INTERACTIVE].started == 1
+    assert stats[PRIORITY_BACKGROUND].queued == 0
+    assert (
+        stats[PRIORITY_BACKGROUND].max_wait >= stats[PRIORITY_INTERACTIVE].max_wait > 0
+    )
+
+
+def test_callbacks_and_cancel(pool):
+    blocked = threading.Event()
+    pool.apply_async(blocked.wait)
+
+    results = []
+    errors = []
+    pool.apply_async(lambda: 1, callback=results.append)
+    pool.apply_async(lambda: 1 / 0, error_callback=errors.append)
+    cancelled = pool.apply_async(results.append, (2,), priority=PRIORITY_BACKGROUND)
+
+    assert pool.stats()[PRIORITY_BACKGROUND].queued == 1
+    assert cancelled.cancel()
+
+    blocked.set()
+    pool.apply_async(lambda: None).result(timeout=5)
+
+    assert results == [1]
+    assert isinstance(errors[0], ZeroDivisionError)
+    assert pool.stats()[PRIORITY_BACKGROUND].cancelled == 1
+
+    with pytest.raises(ValueError):
+        pool.apply_async(print, priority="urgent")
+
+
+def test_async_result_methods(pool):
+    """Ensure that the results of ``apply_async`` can still be used like the
+    ``AsyncResult`` returned by ``ThreadPool``."""
+    blocked = threading.Event()
+    first = pool.apply_async(blocked.wait, (5,))
+    second = pool.apply_async(lambda: 1 / 0)
+
+    assert not first.ready()
+    with pytest.raises(ValueError):
+        first.successful()
+
+    with pytest.raises(multiprocessing.TimeoutError):
+        first.get(timeout=0.01)
+
+    blocked.set()
+    assert first.get(timeout=5) is True
+    assert first.successful()
+
+    second.wait(timeout=5)
+    assert second.ready()
+    assert not second.successful()
+    with pytest.raises(ZeroDivisionError):
+        second.get()
+
+
+def test_shutdown_cancels_queued_tasks():
+    pool = PriorityThreadPool(processes=1)
+    blocked = threading.Event()
+    running = pool.apply_async(blocked.wait, (5,))
+    queued = pool.apply_async(print)
+
+    threading.Timer(0.1, blocked.set).start()
+    pool.shutdown()
+
+    assert running.result() is True
+    assert queued.cancelled()
+
+    with pytest.raises(RuntimeError):
+        pool.apply_async(print)
+
+
+def test_concurrency_limit():
+    """Ensure that tasks held back by their limit do not block other tasks."""
+    pool = PriorityThreadPool(processes=3)
+    blocked = threading.Event()
+    running = []
+
+    def task(name):
+        running.append(name)
+        blocked.wait(5)
+
+    limited = [
+        pool.apply_async(task, (f"limited {i}",), key="limited", limit=1)
+        for i in range(3)
+    ]
+    other = pool.apply_async(task, ("other",))
+
+    # The other task overtakes the limited ones still waiting
+    deadline = time.monotonic() + 5
+    while len(running) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # Which of the limited tasks runs first depends on the workers
+    assert len(running) == 2
+    assert "other" in running
+
+    stats = pool.pool_stats()
+    assert stats.size == 3
+    assert stats.active == 2
+    assert stats.queued == 2
+
+    blocked.set()
+    for future in [*limited, other]:
+        future.result(timeout=5)
+
+    assert sorted(running) == ["limited 0", "limited 1", "limited 2", "other"]
+    assert pool.pool_stats().active == 0
+    pool.shutdown()
+
+
+def test_worker_pools():
+    pools = WorkerPools({"indexing": 1})
+    pools.configure("other", 4)
+
+    assert pools["indexing"].submit(sum, [1, 2]).result(timeout=5) == 3
+    assert pools["indexing"].size == 1
+    assert "other" not in pools
+
+    stats = pools.stats()
+    assert list(stats) == ["indexing"]
+    assert stats["indexing"].workers == 1
+    assert stats["indexing"].priorities[PRIORITY_NORMAL].started == 1
+
+    with pytest.raises(RuntimeError):
+        pools.configure("indexing", 2)
+
+    pools.shutdown()
+
+
+def test_feature_priority_validation():
+    server = LanguageServer("pygls-test", "v1")
+
+    with pytest.raises(ValidationError):
+
+        @server.feature(types.TEXT_DOCUMENT_HOVER, priority="urgent")
+        def hover(ls, params):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_feature_priority():
+    """Ensure that threaded handlers of interactive features overtake background
+    ones."""
+    server = LanguageServer(
+        "pygls-test", "v1", loop=asyncio.get_running_loop(), max_workers=1
+    )
+    blocked = threading.Event()
+    order = []
+
+    @server.feature("test/block")
+    @server.thread()
+    def block(ls, params):
+        blocked.wait(5)
+
+    @server.feature(types.WORKSPACE_DIAGNOSTIC, priority=PRIORITY_BACKGROUND)
+    @server.thread()
+    def diagnostic(ls, params):
+        order.append("diagnostic")
+        return types.WorkspaceDiagnosticReport(items=[])
+
+    @server.feature(types.TEXT_DOCUMENT_COMPLETION, priority=PRIORITY_INTERACTIVE)
+    @server.thread()
+    def completion(ls, params):
+        order.append("completion")
+        return []
+
+    client = BaseLanguageClient("pygls-test", "v1")
+    await client.start_in_process(server)
+
+    requests = asyncio.gather(
+        client.protocol.send_request_async("test/block", {}),
+        client.workspace_diagnostic_async(
+            types.WorkspaceDiagnosticParams(previous_result_ids=[])
+        ),
+        client.text_document_completion_async(
+            types.CompletionParams(
+                text_document=types.TextDocumentIdentifier(uri="file:///example.py"),
+                position=types.Position(line=0, character=0),
+            )
+        ),
+    )
+    await asyncio.sleep(0.1)
+    blocked.set()
+    await requests
+
+    assert order == ["completion", "diagnostic"]
+    assert server.thread_pool.stats()[PRIORITY_BACKGROUND].started == 1
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_thread_pool_routing():
+    """Ensure that threaded handlers run in the pool they name, within their
+    concurrency limit."""
+    server = LanguageServer(
+        "pygls-test",
+        "v1",
+        loop=asyncio.get_running_loop(),
+        pools={"indexing": 2},
+    )
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    @server.feature("test/index")
+    @server.thread(pool="indexing", max_concurrency=1)
+    def index(ls, params):
+        with lock:
+            running.append(params.n)
+            peak.append(len(running))
+
+        time.sleep(0.02)
+        with lock:
+            running.remove(params.n)
+
+        return threading.current_thread().name
+
+    client = BaseLanguageClient("pygls-test", "v1")
+    await client.start_in_process(server)
+
+    names = await asyncio.gather(
+        *[client.protocol.send_request_async("test/index", {"n": n}) for n in range(4)]
+    )
+
+    assert all(name.startswith("pygls-indexing-") for name in names)
+    assert max(peak) == 1
+    assert server.pools.stats()["indexing"].priorities[PRIORITY_NORMAL].started == 4
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_thread_command_concurrency_limit(make_server, connect_client):
+    """Ensure that the concurrency limit of a threaded command applies to it alone,
+    even though every command is run through the same method."""
+    server = make_server(max_workers=4)
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    @server.command("test.index")
+    @server.thread(max_concurrency=1)
+    def index(ls, args):
+        with lock:
+            running.append(args[0])
+            peak.append(len(running))
+
+        time.sleep(0.02)
+        with lock:
+            running.remove(args[0])
+
+    client = await connect_client(server)
+    await asyncio.gather(
+        *[
+            client.workspace_execute_command_async(
+                types.ExecuteCommandParams(command="test.index", arguments=[n])
+            )
+            for n in range(3)
+        ]
+    )
+
+    assert len(peak) == 3
+    assert max(peak) == 1
@@ -1,13 +1,24 @@
 import asyncio
+import io
 import json
 import os
-from threading import Thread
-from unittest.mock import Mock
+import select
+import socket
+import time
+from threading import Event, Thread
+from unittest.mock import AsyncMock, Mock
 
 import pytest
+from lsprotocol import types
 
-from pygls import IS_PYODIDE
-from pygls.server import LanguageServer
+from pygls import IS_PYODIDE, IS_WIN
+from pygls.protocol import JsonRPCProtocol, default_converter
+from pygls.protocol.codec import CHUNK_SIZE
+from pygls.server import (
+    LanguageServer,
+    StdOutTransportAdapter,
+    WebSocketTransportAdapter,
+)
 
 try:
     import websockets
@@ -56,6 +67,56 @@ async def test_tcp_connection_lost():
     assert server.lsp.connection_lost.called
 
 
+async def _send_initialize(writer, root_uri):
+    body = json.dumps(
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "initialize",
+            "params": {"processId": None, "rootUri": root_uri, "capabilities": {}},
+        }
+    ).encode("utf-8")
+    writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+    await writer.drain()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+async def test_tcp_multi_client():
+    """Ensure that each TCP connection gets its own session when serving many
+    clients."""
+    server = LanguageServer("pygls-test", "v1", loop=asyncio.new_event_loop())
+
+    server_thread = Thread(
+        target=server.start_tcp, args=("127.0.0.1", 0), kwargs={"multi_client": True}
+    )
+    server_thread.daemon = True
+    server_thread.start()
+
+    while server._server is None:
+        await asyncio.sleep(0.5)
+
+    port = server._server.sockets[0].getsockname()[1]
+    _, writer_a = await asyncio.open_connection("127.0.0.1", port)
+    _, writer_b = await asyncio.open_connection("127.0.0.1", port)
+
+    await _send_initialize(writer_a, "file:///a")
+    await _send_initialize(writer_b, "file:///b")
+    await asyncio.sleep(1)
+
+    sessions = server.sessions
+    assert len(sessions) == 2
+    assert {s.workspace.root_uri for s in sessions} == {"file:///a", "file:///b"}
+    assert all(s is not server.lsp for s in sessions)
+
+    writer_a.close()
+    await asyncio.sleep(1)
+
+    assert len(server.sessions) == 1
+
+    writer_b.close()
+
+
 @pytest.mark.asyncio
 @pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
 async def test_io_connection_lost():
@@ -81,6 +142,79 @@ async def test_io_connection_lost():
     server_thread.join()
 
 
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+def test_io_from_regular_file(tmp_path):
+    """Ensure that the server can read from stdin when it cannot be watched by the
+    event loop e.g. when it is redirected from a file."""
+
+    def message(id_, method, params):
+        body = json.dumps(dict(jsonrpc="2.0", id=id_, method=method, params=params))
+        return f"Content-Length: {len(body)}\r\n\r\n{body}".encode("utf-8")
+
+    stdin = tmp_path / "stdin"
+    stdin.write_bytes(
+        message(1, "initialize", dict(capabilities=dict()))
+        + message(2, "shutdown", None)
+    )
+    stdout = tmp_path / "stdout"
+
+    server = LanguageServer("pygls-test", "v1", loop=asyncio.new_event_loop())
+    with stdin.open("rb") as rfile, stdout.open("wb") as wfile:
+        server.start_io(rfile, wfile)
+
+    output = stdout.read_bytes()
+    assert b'"id": 1' in output
+    assert b'"id": 2' in output
+
+
+@pytest.mark.skipif(
+    IS_PYODIDE or IS_WIN, reason="socketpair as stdio is not available on windows."
+)
+def test_io_over_shared_socket():
+    """Ensure that large messages are written in full when stdin and stdout share a
+    single socket, which must not be made non-blocking for reading."""
+    client, server_sock = socket.socketpair()
+    stdin = os.fdopen(server_sock.detach(), "rb")
+    stdout = os.fdopen(os.dup(stdin.fileno()), "wb")
+
+    server = LanguageServer("pygls-test", "v1", loop=asyncio.new_event_loop())
+
+    @server.feature("test/echo")
+    def echo(ls, params):
+        return {"value": params.value}
+
+    server_thread = Thread(target=server.start_io, args=(stdin, stdout), daemon=True)
+    server_thread.start()
+
+    value = "x" * (8 * 1024 * 1024)
+    body = json.dumps(
+        dict(jsonrpc="2.0", id=1, method="test/echo", params=dict(value=value))
+    ).encode("utf-8")
+    Thread(
+        target=client.sendall,
+        args=(f"Content-Length: {len(body)}\r\n\r\n".encode("utf-8") + body,),
+        daemon=True,
+    ).start()
+
+    client.settimeout(10)
+    rfile = client.makefile("rb")
+    length = None
+    while True:
+        line = rfile.readline().strip()
+        if not line:
+            break
+        name, _, size = line.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(size)
+
+    response = json.loads(rfile.read(length))
+    assert response["result"]["value"] == value
+
+    rfile.close()
+    client.close()
+    server_thread.join(timeout=10)
+
+
 @pytest.mark.asyncio
 @pytest.mark.skipif(
     IS_PYODIDE or not WEBSOCKETS_AVAILABLE,
@@ -133,3 +267,230 @@ async def test_ws_server():
         await connection.send(json.dumps(msg))
 
     server_thread.join()
+
+
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+def test_stdout_writer_coalesces_messages():
+    """Ensure that messages written within a single loop iteration are sent before
+    a single flush."""
+
+    loop = asyncio.new_event_loop()
+    wfile = Mock()
+    adapter = StdOutTransportAdapter(Mock(), wfile, loop=loop)
+
+    async def send():
+        for i in range(10):
+            adapter.write(b"message %d;" % i)
+
+        # Give the writer thread a chance to run.
+        while adapter.stats.messages_written < 10:
+            await asyncio.sleep(0.01)
+
+    loop.run_until_complete(send())
+    loop.close()
+
+    messages = [b"message %d;" % i for i in range(10)]
+    wfile.writelines.assert_called_once_with(messages)
+    wfile.flush.assert_called_once_with()
+    assert adapter.stats.flushes == 1
+    assert adapter.stats.bytes_queued == 0
+    assert adapter.stats.bytes_written == sum(len(m) for m in messages)
+
+
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+def test_stdout_writer_backpressure():
+    """Ensure that the protocol is paused while the client is not reading."""
+
+    loop = asyncio.new_event_loop()
+    unblock = Event()
+    wfile = Mock()
+    wfile.writelines.side_effect = lambda data: unblock.wait()
+
+    protocol = Mock()
+    adapter = StdOutTransportAdapter(
+        Mock(),
+        wfile,
+        loop=loop,
+        protocol=protocol,
+        high_water_mark=100,
+        low_water_mark=10,
+    )
+
+    async def send():
+        adapter.write(b"x" * 60)
+        await asyncio.sleep(0.1)
+        adapter.write(b"x" * 60)
+        await asyncio.sleep(0.1)
+        assert protocol.pause_writing.called
+        assert not protocol.resume_writing.called
+
+        unblock.set()
+        while not protocol.resume_writing.called:
+            await asyncio.sleep(0.01)
+
+    loop.run_until_complete(send())
+    loop.close()
+
+    assert adapter.stats.bytes_queued == 0
+    assert adapter.stats.messages_written == 2
+
+
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+def test_stdout_writer_spooled_message():
+    """Ensure that the body of a large message is written straight from its spool, a
+    chunk at a time."""
+
+    class WFile(io.BytesIO):
+        def __init__(self):
+            super().__init__()
+            self.sizes = []
+
+        def write(self, data):
+            self.sizes.append(len(data))
+            return super().write(data)
+
+    wfile = WFile()
+    protocol = JsonRPCProtocol(None, default_converter())
+    protocol.spool_size = 0
+    adapter = StdOutTransportAdapter(Mock(), wfile, protocol=protocol)
+    protocol.connection_made(adapter)  # type: ignore[arg-type]
+
+    items = [types.CompletionItem(label="0", kind=types.CompletionItemKind.Class)]
+    protocol._result_types["1"] = types.TextDocumentCompletionResponse
+    protocol._send_response("1", result=items * 10000)
+
+    deadline = time.monotonic() + 5
+    while adapter.stats.messages_written < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    header, _, body = wfile.getvalue().partition(b"\r\n\r\n")
+    assert header.startswith(b"Content-Length: %d\r\n" % len(body))
+    assert json.loads(body)["result"] == [{"label": "0", "kind": 7}] * 10000
+
+    assert len(wfile.sizes) > 2
+    assert max(wfile.sizes) <= CHUNK_SIZE
+    assert adapter.stats.bytes_queued == 0
+
+
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+@pytest.mark.skipif(IS_WIN, reason="non-blocking pipes are not available on windows.")
+def test_stdout_writer_non_blocking_pipe():
+    """Ensure that nothing is lost while writing to a non-blocking stdout that the
+    client reads slower than it is written to."""
+
+    rfd, wfd = os.pipe()
+    os.set_blocking(wfd, False)
+    wfile = os.fdopen(wfd, "wb")
+    adapter = StdOutTransportAdapter(Mock(), wfile)
+
+    messages = [bytes([65 + i]) * 256 * 1024 for i in range(8)]
+    for message in messages:
+        adapter.write(message)
+
+    received = []
+    with os.fdopen(rfd, "rb") as rfile:
+        while sum(len(data) for data in received) < len(b"".join(messages)):
+            time.sleep(0.001)
+            readable, _, _ = select.select([rfile], [], [], 1)
+            if not readable:
+                break
+
+            received.append(rfile.read1(4096))
+
+    assert b"".join(received) == b"".join(messages)
+    adapter.close()
+
+
+def test_ws_writer_sends_in_order():
+    """Ensure that messages are sent one at a time, in the order they were
+    written."""
+
+    loop = asyncio.new_event_loop()
+    sent = []
+
+    async def send(data):
+        await asyncio.sleep(0)
+        sent.append(data)
+
+    ws = Mock(send=send, close=AsyncMock())
+    adapter = WebSocketTransportAdapter(ws, loop)
+
+    async def write():
+        for i in range(10):
+            adapter.write(f"message {i}")
+
+        adapter.close()
+        await asyncio.sleep(0)
+        await adapter._writer
+
+    loop.run_until_complete(write())
+    loop.close()
+
+    assert sent == [f"message {i}" for i in range(10)]
+    assert adapter.stats.messages_written == 10
+    assert adapter.stats.messages_queued == 0
+    assert adapter.stats.bytes_queued == 0
+    ws.close.assert_awaited_once()
+
+
+def test_ws_writer_combines_messages():
+    """Ensure that queued messages are sent as a batch, when enabled."""
+
+    loop = asyncio.new_event_loop()
+    ws = Mock(send=AsyncMock(), close=AsyncMock())
+    adapter = WebSocketTransportAdapter(
+        ws, loop, combine_messages=True, max_frame_size=20
+    )
+
+    async def write():
+        for i in range(3):
+            adapter.write(f'{{"id":{i}}}')
+
+        adapter.close()
+        await asyncio.sleep(0)
+        await adapter._writer
+
+    loop.run_until_complete(write())
+    loop.close()
+
+    frames = [call.args[0] for call in ws.send.await_args_list]
+    assert frames == ['[{"id":0},{"id":1}]', '{"id":2}']
+    assert adapter.stats.flushes == 2
+    assert adapter.stats.messages_written == 3
+    assert adapter.stats.bytes_queued == 0
+
+
+def test_ws_writer_backpressure():
+    """Ensure that the protocol is paused while the client is not reading."""
+
+    loop = asyncio.new_event_loop()
+    unblock = asyncio.Event()
+
+    async def send(data):
+        await unblock.wait()
+
+    protocol = Mock()
+    ws = Mock(send=send, close=AsyncMock())
+    adapter = WebSocketTransportAdapter(
+        ws, loop, protocol, high_water_mark=100, low_water_mark=10
+    )
+
+    async def write():
+        adapter.write("x" * 60)
+        adapter.write("x" * 60)
+        await asyncio.sleep(0.1)
+        assert adapter.stats.messages_queued == 2
+        assert protocol.pause_writing.called
+        assert not protocol.resume_writing.called
+
+        unblock.set()
+        while not protocol.resume_writing.called:
+            await asyncio.sleep(0.01)
+
+        adapter.close()
+        await adapter._writer
+
+    loop.run_until_complete(write())
+    loop.close()
+
+    assert adapter.stats.messages_written == 2
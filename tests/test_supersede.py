@@ -0,0 +1,143 @@
+############################################################################
+# Copyright(c) Open Law Library. All rights reserved.                      #
+# See ThirdPartyNotices.txt in the project root for additional notices.    #
+#                                                                          #
+# Licensed under the Apache License, Version 2.0 (the "License")           #
+# you may not use this file except in compliance with the License.         #
+# You may obtain a copy of the License at                                  #
+#                                                                          #
+#     http: // www.apache.org/licenses/LICENSE-2.0                         #
+#                                                                          #
+# Unless required by applicable law or agreed to in writing, software      #
+# distributed under the License is distributed on an "AS IS" BASIS,        #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. #
+# See the License for the specific language governing permissions and      #
+# limitations under the License.                                           #
+############################################################################
+import asyncio
+
+import pytest
+from lsprotocol import types
+
+from pygls import IS_PYODIDE
+from pygls.constants import SUPERSEDE_CANCEL, SUPERSEDE_CONTENT_MODIFIED
+from pygls.exceptions import (
+    JsonRpcContentModified,
+    JsonRpcRequestCancelled,
+    ValidationError,
+)
+from pygls.server import LanguageServer
+
+
+@pytest.fixture
+def server(make_server):
+    server = make_server()
+    server.cancelled = []
+
+    @server.feature(types.TEXT_DOCUMENT_COMPLETION, supersede=SUPERSEDE_CANCEL)
+    async def completion(ls, params):
+        try:
+            await asyncio.sleep(params.position.line / 10)
+        except asyncio.CancelledError:
+            ls.cancelled.append(params.position.line)
+            raise
+
+        return [types.CompletionItem(label=str(params.position.line))]
+
+    @server.feature(types.TEXT_DOCUMENT_HOVER, supersede=SUPERSEDE_CONTENT_MODIFIED)
+    @server.thread()
+    def hover(ls, params):
+        ls.cancellation_token.wait(5)
+        ls.cancellation_token.raise_if_cancelled()
+
+    return server
+
+
+def _completion_params(uri, line):
+    return types.CompletionParams(
+        text_document=types.TextDocumentIdentifier(uri=uri),
+        position=types.Position(line=line, character=0),
+    )
+
+
+@pytest.mark.asyncio
+async def test_newer_request_supersedes_older(server, connect_client):
+    """Ensure that a request is cancelled when a newer one for the same document
+    arrives, while requests for other documents are unaffected."""
+    client = await connect_client(server)
+
+    first = asyncio.ensure_future(
+        client.text_document_completion_async(_completion_params("file:///a", 10))
+    )
+    other = asyncio.ensure_future(
+        client.text_document_completion_async(_completion_params("file:///b", 1))
+    )
+    await asyncio.sleep(0.01)
+    second = asyncio.ensure_future(
+        client.text_document_completion_async(_completion_params("file:///a", 2))
+    )
+
+    with pytest.raises(JsonRpcRequestCancelled):
+        await asyncio.wait_for(first, timeout=0.5)
+
+    assert [item.label for item in await second] == ["2"]
+    assert [item.label for item in await other] == ["1"]
+    assert server.cancelled == [10]
+
+    (session,) = server.sessions
+    assert session._latest_requests == {}
+    assert session._request_keys == {}
+    assert session._superseded == set()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(IS_PYODIDE, reason="threads are not available in pyodide.")
+async def test_did_change_supersedes_requests(server, connect_client):
+    """Ensure that changing a document supersedes the requests for it."""
+    client = await connect_client(server, initialize=True)
+
+    client.text_document_did_open(
+        types.DidOpenTextDocumentParams(
+            text_document=types.TextDocumentItem(
+                uri="file:///a", language_id="python", version=1, text="a"
+            )
+        )
+    )
+    hover = asyncio.ensure_future(
+        client.text_document_hover_async(
+            types.HoverParams(
+                text_document=types.TextDocumentIdentifier(uri="file:///a"),
+                position=types.Position(line=0, character=0),
+            )
+        )
+    )
+    await asyncio.sleep(0.1)
+
+    client.text_document_did_change(
+        types.DidChangeTextDocumentParams(
+            text_document=types.VersionedTextDocumentIdentifier(
+                uri="file:///a", version=2
+            ),
+            content_changes=[types.TextDocumentContentChangeEvent_Type2(text="b")],
+        )
+    )
+
+    with pytest.raises(JsonRpcContentModified):
+        await asyncio.wait_for(hover, timeout=1)
+
+    # Wait for the handler to notice it has been cancelled.
+    (session,) = server.sessions
+    while session._superseded:
+        await asyncio.sleep(0.01)
+
+    assert session._cancellation_tokens == {}
+
+
+def test_unknown_supersede_policy():
+    server = LanguageServer("pygls-test", "v1")
+
+    with pytest.raises(ValidationError):
+
+        @server.feature(types.TEXT_DOCUMENT_COMPLETION, supersede="sometimes")
+        def completion(ls, params):
+            pass